@@ -6,7 +6,6 @@ Usando apenas as bibliotecas que já funcionam
 
 import os
 import sys
-import pickle
 import base64
 from datetime import datetime
 from typing import List, Dict, Any
@@ -15,6 +14,7 @@ from abc import ABC, abstractmethod
 # Google APIs
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 
 # Gemini
@@ -213,8 +213,10 @@ def authenticate_google():
     """Autentica com o Google e retorna as credenciais."""
     creds = None
     if os.path.exists(TOKEN_FILE):
-        with open(TOKEN_FILE, 'rb') as token:
-            creds = pickle.load(token)
+        try:
+            creds = Credentials.from_authorized_user_file(TOKEN_FILE)
+        except ValueError:
+            creds = None  # Token antigo (pickle) ou corrompido: autoriza de novo
     
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
@@ -223,8 +225,11 @@ def authenticate_google():
             flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_FILE, SCOPES)
             creds = flow.run_local_server(port=0)
         
-        with open(TOKEN_FILE, 'wb') as token:
-            pickle.dump(creds, token)
+        # JSON gravado de forma atômica: outra execução nunca lê um token pela metade
+        temp_file = f'{TOKEN_FILE}.{os.getpid()}.tmp'
+        with open(temp_file, 'w') as token:
+            token.write(creds.to_json())
+        os.replace(temp_file, TOKEN_FILE)
     
     return creds
 
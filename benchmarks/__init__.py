@@ -0,0 +1,9 @@
+"""
+Benchmarks do Gmail AI Assistant (executar com python -m benchmarks.<nome>)
+"""
+
+import os
+
+# Os serviços falsos não têm cota: sem isto o limitador de 250 unidades/s mediria
+# a cota, não a técnica. bench_quota passa os próprios limitadores
+os.environ.setdefault('GMAIL_ASSISTANT_QUOTA', 'inf')
@@ -0,0 +1,52 @@
+"""
+Benchmark: várias contas com o AccountScheduler, variando o tamanho do pool de
+processos e o limite de etapas simultâneas por conta, com serviços falsos.
+
+Uso:
+    python -m benchmarks.bench_accounts [--accounts 16] [--emails 100] [--latency 0.05]
+"""
+
+import argparse
+import os
+
+from gmail_ai_assistant.accounts import Account, AccountRegistry, AccountScheduler
+
+from .fake_calendar import FakeCalendarService
+from .fake_gmail import FakeGmailService
+
+
+def fake_service(account: Account, api: str):
+    """Serviço falso da conta; a latência vem do ambiente para valer nos processos filhos."""
+    latency = float(os.environ['BENCH_ACCOUNTS_LATENCY'])
+    if api == 'gmail':
+        return FakeGmailService(count=account.max_emails, latency=latency)
+    return FakeCalendarService(count=account.max_events, latency=latency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--accounts', type=int, default=16, help='Número de contas')
+    parser.add_argument('--emails', type=int, default=100, help='E-mails lidos por conta')
+    parser.add_argument('--events', type=int, default=20, help='Eventos lidos por conta')
+    parser.add_argument('--latency', type=float, default=0.05, help='Latência simulada por requisição (s)')
+    args = parser.parse_args()
+    os.environ['BENCH_ACCOUNTS_LATENCY'] = str(args.latency)
+    
+    print(f"{args.accounts} contas, {args.emails} e-mails e {args.events} eventos cada "
+          f"(latência {args.latency * 1000:.0f} ms):")
+    print(f"{'processos':>10} {'etapas/conta':>13} {'tempo (s)':>10} {'contas/min':>11} {'e-mails/s':>10} "
+          f"{'erros':>6}")
+    for processes, concurrency in ((1, 1), (4, 1), (8, 1), (8, 2)):
+        registry = AccountRegistry(
+            Account(f'conta{i}', f'conta{i}.json', max_emails=args.emails, max_events=args.events,
+                    max_concurrency=concurrency)
+            for i in range(args.accounts)
+        )
+        report = AccountScheduler(registry, processes=processes, services=fake_service).run()
+        assert report.messages == args.accounts * args.emails, report.errors[:3]
+        print(f"{processes:>10} {concurrency:>13} {report.elapsed:>10.2f} {report.accounts_per_minute:>11.0f} "
+              f"{report.messages_per_second:>10.0f} {len(report.errors):>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark: anexos.
+
+1. Download de um anexo grande: decodificar tudo e gravar vs. gravação em
+   blocos (download_attachment), medindo o pico de memória com tracemalloc.
+2. Trechos de anexos de texto pequenos: uma chamada por anexo vs. lotes.
+
+Uso:
+    python -m benchmarks.bench_attachments [--size 20000000] [--messages 50]
+"""
+
+import argparse
+import base64
+import os
+import tempfile
+import time
+import tracemalloc
+
+from gmail_ai_assistant.tools import GmailTool
+
+from .fake_gmail import FakeGmailService
+
+
+def naive_download(service, attachment, path):
+    """Decodifica o anexo inteiro em memória antes de gravar."""
+    response = service.users().messages().attachments().get(
+        userId='me', messageId=attachment['message_id'], id=attachment['attachment_id']).execute()
+    with open(path, 'wb') as f:
+        f.write(base64.urlsafe_b64decode(response['data']))
+
+
+def measure(func) -> tuple:
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=20_000_000, help='Tamanho do anexo grande (bytes)')
+    parser.add_argument('--messages', type=int, default=50, help='Mensagens com anexo de texto')
+    parser.add_argument('--latency', type=float, default=0.02, help='Latência simulada por chamada (s)')
+    args = parser.parse_args()
+    
+    service = FakeGmailService(count=1, latency=0, attachment_size=args.size)
+    tool = GmailTool(service)
+    pdf = tool.execute(max_results=1)[0]['attachments'][0]
+    service.handle_attachment(messageId=pdf['message_id'], id=pdf['attachment_id'])  # gera a resposta antes
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'naive.pdf')
+        naive_time, naive_peak = measure(lambda: naive_download(service, pdf, path))
+        chunked_time, chunked_peak = measure(lambda: tool.download_attachment(pdf, directory))
+        assert os.path.getsize(os.path.join(directory, pdf['filename'])) == os.path.getsize(path) == args.size
+    print(f"Anexo de {args.size / 1e6:.0f} MB (memória além da resposta base64 já recebida):")
+    print(f"{'modo':>10} {'tempo (s)':>10} {'pico (MB)':>10}")
+    print(f"{'inteiro':>10} {naive_time:>10.3f} {naive_peak / 1e6:>10.1f}")
+    print(f"{'em blocos':>10} {chunked_time:>10.3f} {chunked_peak / 1e6:>10.1f}")
+    
+    service = FakeGmailService(count=args.messages, latency=args.latency, attachment_size=100_000)
+    print(f"\nTrechos de {args.messages} anexos CSV:")
+    print(f"{'lote':>6} {'chamadas':>9} {'tempo (s)':>10}")
+    for batch_size in (1, 50):
+        tool = GmailTool(service, batch_size=batch_size, attachment_text_bytes=2048)
+        emails = tool.execute(max_results=args.messages, batch_size=50)
+        for email in emails:
+            for attachment in email['attachments']:
+                attachment.pop('text', None)
+        service.round_trips = 0
+        start = time.perf_counter()
+        tool.load_attachment_texts(emails)
+        elapsed = time.perf_counter() - start
+        # O charset do Content-Type do anexo vale para o texto baixado depois
+        assert all(email['attachments'][1]['text'].startswith('# msg') and 'Łódź' in email['attachments'][1]['text']
+                   for email in emails)
+        print(f"{batch_size:>6} {service.round_trips:>9} {elapsed:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
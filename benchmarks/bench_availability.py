@@ -0,0 +1,106 @@
+"""
+Benchmark: consultas de disponibilidade com BusyIntervals (intervalos unidos +
+bisect) vs. varrer a lista de eventos, união de vários participantes e uma
+consulta completa via FreeBusy no serviço falso.
+
+Uso:
+    python -m benchmarks.bench_availability [--meetings 2000] [--attendees 10] [--queries 2000]
+"""
+
+import argparse
+import random
+import time
+from datetime import timedelta, timezone
+
+from gmail_ai_assistant.availability import Availability, BusyIntervals, WorkingHours
+from gmail_ai_assistant.quota import QuotaLimiter
+from gmail_ai_assistant.tools import CalendarTool
+
+from .fake_calendar import FakeCalendarService
+
+HOUR = 3600
+
+
+def random_meetings(count: int, rng: random.Random):
+    """Reuniões de 30 a 90 min espalhadas por um ano, em qualquer ordem, algumas sobrepostas."""
+    meetings = []
+    for _ in range(count):
+        start = rng.randrange(0, 365 * 24) * HOUR + rng.choice((0, 1800))
+        meetings.append((start, start + rng.choice((1800, 3600, 5400))))
+    return meetings
+
+
+def scan_is_free(meetings, start, end) -> bool:
+    return all(meeting_end <= start or meeting_start >= end for meeting_start, meeting_end in meetings)
+
+
+def scan_first_free(meetings, start, end, duration):
+    """Primeiro horário livre andando pela lista ordenada por início, como sem índice."""
+    cursor = start
+    for meeting_start, meeting_end in meetings:
+        if meeting_end <= cursor:
+            continue
+        if meeting_start >= cursor + duration:
+            break
+        cursor = max(cursor, meeting_end)
+    return (cursor, cursor + duration) if cursor + duration <= end else None
+
+
+def per_call(func, args_list) -> float:
+    """Microssegundos por chamada."""
+    start = time.perf_counter()
+    for args in args_list:
+        func(*args)
+    return (time.perf_counter() - start) / len(args_list) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--meetings', type=int, default=2000, help='Reuniões por participante (em um ano)')
+    parser.add_argument('--attendees', type=int, default=10, help='Participantes na união')
+    parser.add_argument('--queries', type=int, default=2000, help='Consultas medidas')
+    args = parser.parse_args()
+    rng = random.Random(42)
+    
+    meetings = random_meetings(args.meetings, rng)
+    by_start = sorted(meetings)
+    busy = BusyIntervals(meetings)
+    probes = [rng.randrange(0, 365 * 24 * HOUR) for _ in range(args.queries)]
+    is_free_args = [(t, t + 1800) for t in probes]
+    first_free_args = [(t, t + 7 * 24 * HOUR, 2 * HOUR) for t in probes]
+    for t, end, duration in first_free_args:
+        assert busy.first_free(t, end, duration) == scan_first_free(by_start, t, end, duration)
+    
+    print(f"{args.meetings} reuniões ({len(busy)} intervalos após a união), µs por consulta:")
+    print(f"{'consulta':>24} {'varredura':>10} {'bisect':>8}")
+    print(f"{'livre em 30 min?':>24} {per_call(lambda s, e: scan_is_free(meetings, s, e), is_free_args):>10.1f} "
+          f"{per_call(busy.is_free, is_free_args):>8.1f}")
+    print(f"{'primeiro livre de 2 h':>24} "
+          f"{per_call(lambda s, e, d: scan_first_free(by_start, s, e, d), first_free_args):>10.1f} "
+          f"{per_call(busy.first_free, first_free_args):>8.1f}")
+    
+    calendars = [BusyIntervals(random_meetings(args.meetings, rng)) for _ in range(args.attendees)]
+    start = time.perf_counter()
+    union = BusyIntervals.union(calendars)
+    union_ms = (time.perf_counter() - start) * 1000
+    year = WorkingHours(tz=timezone.utc).mask(0, 365 * 24 * HOUR)
+    start = time.perf_counter()
+    slots = BusyIntervals.union([union, year]).free_slots(0, 365 * 24 * HOUR, HOUR)
+    slots_ms = (time.perf_counter() - start) * 1000
+    print(f"\nUnião de {args.attendees} participantes ({len(union)} intervalos): {union_ms:.1f} ms; "
+          f"{len(slots)} horários livres de 1 h no expediente do ano em {slots_ms:.1f} ms")
+    
+    service = FakeCalendarService(count=24 * 7, latency=0.05, calendars=args.attendees)
+    tool = CalendarTool(service, limiter=QuotaLimiter(float('inf'), units={}))
+    window_start = service.start.timestamp()
+    window_end = (service.start + timedelta(days=7)).timestamp()
+    start = time.perf_counter()
+    slots = Availability(tool).free_slots(window_start, window_end, 900, list(service.calendars),
+                                          WorkingHours(days=range(7)))
+    elapsed = time.perf_counter() - start
+    print(f"\nSemana de {args.attendees} agendas via FreeBusy: {service.round_trips} ida(s) e volta, "
+          f"{elapsed * 1000:.0f} ms, {len(slots)} horários livres de 15 min no expediente")
+
+
+if __name__ == '__main__':
+    main()
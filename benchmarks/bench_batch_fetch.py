@@ -0,0 +1,43 @@
+"""
+Benchmark: leitura sequencial vs. em lote vs. em paralelo no GmailTool.
+
+Uso:
+    python -m benchmarks.bench_batch_fetch [--latency 0.02]
+"""
+
+import argparse
+import time
+
+from gmail_ai_assistant.tools import GmailTool
+from benchmarks.fake_gmail import FakeGmailService
+
+
+def run(count: int, latency: float, batch_size: int, workers: int = 1):
+    """Executa uma leitura e retorna (segundos, idas e voltas HTTP)."""
+    service = FakeGmailService(count=count, latency=latency)
+    # O serviço falso não tem transporte real, então pode ser compartilhado entre threads
+    tool = GmailTool(service, batch_size=batch_size, workers=workers, service_factory=lambda: service)
+    start = time.perf_counter()
+    emails = tool.execute(max_results=count)
+    elapsed = time.perf_counter() - start
+    assert len(emails) == count and all('error' not in e for e in emails)
+    return elapsed, service.round_trips
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--latency', type=float, default=0.02, help='Latência por ida e volta (s)')
+    parser.add_argument('--workers', type=int, default=4, help='Threads para o modo paralelo')
+    args = parser.parse_args()
+    
+    print(f"{'mensagens':>10} {'seq (s)':>9} {'lote (s)':>9} {'threads (s)':>12} {'lote+threads (s)':>17}")
+    for count in (10, 50, 100, 200):
+        seq_time, _ = run(count, args.latency, batch_size=1)
+        batch_time, _ = run(count, args.latency, batch_size=50)
+        threads_time, _ = run(count, args.latency, batch_size=1, workers=args.workers)
+        both_time, _ = run(count, args.latency, batch_size=25, workers=args.workers)
+        print(f"{count:>10} {seq_time:>9.3f} {batch_time:>9.3f} {threads_time:>12.3f} {both_time:>17.3f}")
+
+
+if __name__ == '__main__':
+    main()
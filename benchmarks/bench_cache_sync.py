@@ -0,0 +1,53 @@
+"""
+Benchmark: execuções repetidas do GmailTool com e sem o cache SQLite.
+
+Cada rodada simula a chegada de algumas mensagens novas e o arquivamento de
+outra, e mede as idas e voltas HTTP e o tempo de uma leitura completa.
+
+Uso:
+    python -m benchmarks.bench_cache_sync [--emails 50] [--runs 5]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from gmail_ai_assistant.cache import MessageCache
+from gmail_ai_assistant.tools import GmailTool
+from benchmarks.fake_gmail import FakeGmailService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--emails', type=int, default=50, help='E-mails lidos por execução')
+    parser.add_argument('--runs', type=int, default=5, help='Número de execuções repetidas')
+    parser.add_argument('--latency', type=float, default=0.02, help='Latência por ida e volta (s)')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = MessageCache(os.path.join(tmp, 'cache.sqlite'))
+        plain_service = FakeGmailService(count=args.emails * 2, latency=args.latency)
+        cached_service = FakeGmailService(count=args.emails * 2, latency=args.latency)
+        plain_tool = GmailTool(plain_service, batch_size=1)
+        cached_tool = GmailTool(cached_service, batch_size=1, cache=cache)
+        
+        print(f"{'execução':>9} {'sem cache (s)':>14} {'idas':>6} {'com cache (s)':>14} {'idas':>6}")
+        for run in range(1, args.runs + 1):
+            results = []
+            for service, tool in ((plain_service, plain_tool), (cached_service, cached_tool)):
+                if run > 1:
+                    service.receive(2)
+                    service.archive(service.messages[-1]['id'])
+                service.round_trips = 0
+                start = time.perf_counter()
+                emails = tool.execute(max_results=args.emails)
+                results.append((time.perf_counter() - start, service.round_trips))
+                assert all('error' not in e for e in emails)
+            (plain_time, plain_trips), (cached_time, cached_trips) = results
+            print(f"{run:>9} {plain_time:>14.3f} {plain_trips:>6} {cached_time:>14.3f} {cached_trips:>6}")
+        cache.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""
+Benchmark: um ano de várias agendas em calendar-stats. Compara a análise em
+colunas NumPy (EventColumns + calendar_stats) com as mesmas métricas em Python
+puro, evento a evento, e mede a leitura pela CalendarTool no serviço falso.
+
+Uso:
+    python -m benchmarks.bench_calendar_stats [--calendars 20] [--meetings 6] [--runs 3]
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from gmail_ai_assistant.analytics import EventColumns, calendar_stats
+from gmail_ai_assistant.availability import BusyIntervals, WorkingHours
+from gmail_ai_assistant.event_time import event_times, get_zone
+from gmail_ai_assistant.quota import QuotaLimiter
+from gmail_ai_assistant.tools import CalendarTool
+
+from .fake_calendar import FakeCalendarService
+
+ZONE = 'America/Sao_Paulo'
+OFFSET = timezone(timedelta(hours=-3))
+YEAR_START = datetime(2024, 1, 1, tzinfo=OFFSET)
+
+
+def make_year(calendars: int, meetings: int, rng: random.Random):
+    """{agenda: eventos} de 2024: reuniões nos dias úteis, convites recusados, 'disponível' e dia inteiro."""
+    organizers = [f'pessoa{i:02d}@empresa.com' for i in range(40)]
+    result = {f'agenda{number:02d}@empresa.com': [] for number in range(calendars)}
+    names = list(result)
+    for number, events in enumerate(result.values()):
+        for day in range(366):
+            start_of_day = YEAR_START + timedelta(days=day)
+            if start_of_day.weekday() == 0:
+                events.append({'id': f'{number}-{day}-folga', 'iCalUID': f'{number}-{day}-folga',
+                               'summary': 'Plantão', 'start': {'date': start_of_day.date().isoformat()},
+                               'end': {'date': (start_of_day + timedelta(days=1)).date().isoformat()}})
+            if start_of_day.weekday() >= 5:
+                continue
+            for index in range(rng.randint(meetings // 2, meetings + meetings // 2)):
+                start = start_of_day + timedelta(minutes=480 + 30 * rng.randrange(22))
+                end = start + timedelta(minutes=rng.choice((15, 30, 30, 45, 60, 90, 120)))
+                uid = f'{number}-{day}-{index}'
+                event = {
+                    'id': uid, 'iCalUID': uid, 'summary': f'Reunião {uid}',
+                    'start': {'dateTime': start.isoformat(), 'timeZone': ZONE},
+                    'end': {'dateTime': end.isoformat(), 'timeZone': ZONE},
+                    'organizer': {'email': rng.choice(organizers)},
+                    'attendees': [{'email': 'eu@empresa.com', 'self': True,
+                                   'responseStatus': 'declined' if rng.random() < 0.05 else 'accepted'}]
+                                 + [{'email': email} for email in rng.sample(organizers, rng.randint(1, 6))],
+                }
+                if rng.random() < 0.05:
+                    event['transparency'] = 'transparent'
+                events.append(event)
+                # Convites compartilhados aparecem também em outra agenda
+                if rng.random() < 0.1:
+                    result[rng.choice(names)].append(dict(event))
+    for events in result.values():
+        events.sort(key=lambda event: event_times(event, ZONE)[0])
+    return result
+
+
+def python_stats(events_by_calendar, start, end, working_hours, focus_minutes=120, gap_minutes=5):
+    """As mesmas métricas em Python, evento a evento, com BusyIntervals para o tempo livre."""
+    tz = get_zone(ZONE)
+    seen, meetings, hours_by_organizer, weekly = set(), [], {}, {}
+    for events in events_by_calendar.values():
+        for event in events:
+            key = (event.get('iCalUID'), event['start'].get('dateTime') or event['start'].get('date'))
+            if key in seen or event.get('status') == 'cancelled':
+                continue
+            seen.add(key)
+            event_start, event_end, all_day = event_times(event, ZONE)
+            declined = any(guest.get('self') and guest.get('responseStatus') == 'declined'
+                           for guest in event.get('attendees', ()))
+            if all_day or declined or event.get('transparency') == 'transparent':
+                continue
+            event_start, event_end = max(event_start, start), min(event_end, end)
+            if event_end <= event_start:
+                continue
+            meetings.append((event_start, event_end))
+            organizer = event.get('organizer', {}).get('email', '')
+            hours_by_organizer[organizer] = hours_by_organizer.get(organizer, 0) + (event_end - event_start) / 3600
+            local = datetime.fromtimestamp(event_start, tz).date()
+            monday = local - timedelta(days=local.weekday())
+            weekly[monday] = weekly.get(monday, 0) + (event_end - event_start) / 3600
+    meetings.sort()
+    
+    chains, size, reach = [], 0, float('-inf')
+    for meeting_start, meeting_end in meetings:
+        if meeting_start > reach + gap_minutes * 60:
+            chains.append(size)
+            size = 0
+        size += 1
+        reach = max(reach, meeting_end)
+    chains.append(size)
+    
+    busy = BusyIntervals(meetings)
+    gaps = [b - a for a, b in BusyIntervals.union([busy, working_hours.mask(start, end)]).free_slots(start, end)]
+    focus = sum(gap for gap in gaps if gap >= focus_minutes * 60)
+    return {
+        'meetings': len(meetings),
+        'meeting_hours': sum(b - a for a, b in meetings) / 3600,
+        'busy_hours': sum(b - a for a, b in busy) / 3600,
+        'chained_meetings': sum(size for size in chains if size >= 2),
+        'focus_hours': focus / 3600,
+        'free_hours': sum(gaps) / 3600,
+        'top_organizer': max(hours_by_organizer.items(), key=lambda item: item[1])[0],
+        'peak_week': max(weekly.values()),
+    }
+
+
+def timed(func, runs: int):
+    """(milissegundos da melhor de runs execuções, último resultado)."""
+    best, result = float('inf'), None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calendars', type=int, default=20, help='Agendas analisadas')
+    parser.add_argument('--meetings', type=int, default=6, help='Reuniões por dia útil, em média, por agenda')
+    parser.add_argument('--runs', type=int, default=3, help='Execuções por medida (vale a melhor)')
+    parser.add_argument('--latency', type=float, default=0.05, help='Latência por ida e volta no serviço falso (s)')
+    args = parser.parse_args()
+    
+    events = make_year(args.calendars, args.meetings, random.Random(42))
+    total = sum(map(len, events.values()))
+    start, end = YEAR_START.timestamp(), (YEAR_START + timedelta(days=366)).timestamp()
+    working_hours = WorkingHours(tz=get_zone(ZONE))
+    
+    columns_ms, columns = timed(lambda: EventColumns.from_calendars(events, ZONE), args.runs)
+    stats_ms, stats = timed(lambda: calendar_stats(columns, start, end, ZONE, working_hours), args.runs)
+    python_ms, expected = timed(lambda: python_stats(events, start, end, working_hours), args.runs)
+    
+    # As duas implementações precisam concordar antes de comparar tempos
+    for name in ('meeting_hours', 'busy_hours', 'focus_hours', 'free_hours'):
+        assert abs(getattr(stats, name) - expected[name]) < 1e-6, (name, getattr(stats, name), expected[name])
+    assert stats.meetings == expected['meetings'] and stats.chained_meetings == expected['chained_meetings']
+    assert stats.organizers[0][0] == expected['top_organizer']
+    assert abs(max(hours for _, hours in stats.weekly) - expected['peak_week']) < 1e-6
+    
+    print(f"{args.calendars} agendas, 2024 inteiro: {total} eventos ({stats.meetings} reuniões após "
+          f"recusas, 'disponível' e convites repetidos), ms:")
+    print(f"  Python puro, evento a evento:       {python_ms:8.1f}")
+    print(f"  EventColumns.from_calendars:        {columns_ms:8.1f}")
+    print(f"  calendar_stats (NumPy):             {stats_ms:8.1f}")
+    print(f"  colunas + estatísticas:             {columns_ms + stats_ms:8.1f}  "
+          f"({python_ms / (columns_ms + stats_ms):.1f}x)")
+    first = next(iter(events))
+    own = calendar_stats(EventColumns.from_calendars({first: events[first]}, ZONE), start, end, ZONE, working_hours)
+    print(f"\nResumo enviado ao Gemini, só {first}:\n{own.summary()}")
+    
+    # Caminho do comando: ler as agendas pela CalendarTool (em paralelo) e analisar
+    service = FakeCalendarService(count=24 * 90, latency=args.latency, calendars=args.calendars)
+    tool = CalendarTool(service, limiter=QuotaLimiter(float('inf'), units={}), calendars='selected',
+                        workers=8, service_factory=lambda: service, tz=ZONE)
+    window_start, window_end = service.start, service.start + timedelta(days=90)
+    begin = time.perf_counter()
+    fetched = tool.events_by_calendar(window_start, window_end)
+    read_s = time.perf_counter() - begin
+    result = calendar_stats(EventColumns.from_calendars(fetched, ZONE), window_start.timestamp(),
+                            window_end.timestamp(), ZONE)
+    total_s = time.perf_counter() - begin
+    tool.close()
+    print(f"\nPróximos 90 dias de {args.calendars} agendas pela CalendarTool (latência "
+          f"{args.latency * 1000:.0f} ms): leitura {read_s:.2f} s, total {total_s:.2f} s, "
+          f"{result.meetings} reuniões")
+
+
+if __name__ == '__main__':
+    main()
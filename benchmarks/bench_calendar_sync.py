@@ -0,0 +1,83 @@
+"""
+Benchmark: execuções repetidas da CalendarTool com e sem o EventCache.
+
+Cada rodada altera, cancela e cria alguns eventos; mede o tempo, as idas e
+voltas HTTP e os eventos transferidos por leitura. No fim, expira o syncToken
+(410) e mede as consultas por janela de tempo respondidas pelo cache.
+
+Uso:
+    python -m benchmarks.bench_calendar_sync [--events 2000] [--runs 5]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+from gmail_ai_assistant.cache import EventCache
+from gmail_ai_assistant.tools import CalendarTool
+
+from .fake_calendar import FakeCalendarService
+
+
+def read(service: FakeCalendarService, tool: CalendarTool, max_results: int):
+    """Uma leitura dos próximos eventos; retorna (segundos, idas e voltas, eventos transferidos)."""
+    service.round_trips = service.transferred = 0
+    start = time.perf_counter()
+    events = tool.execute(max_results=max_results)
+    elapsed = time.perf_counter() - start
+    assert len(events) == max_results and all('error' not in e for e in events), events[:1]
+    return elapsed, service.round_trips, service.transferred
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--events', type=int, default=2000, help='Eventos na agenda')
+    parser.add_argument('--runs', type=int, default=5, help='Número de execuções repetidas')
+    parser.add_argument('--max', type=int, default=2000, help='Eventos lidos por execução')
+    parser.add_argument('--latency', type=float, default=0.05, help='Latência por ida e volta (s)')
+    parser.add_argument('--queries', type=int, default=2000, help='Consultas por janela medidas')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = EventCache(os.path.join(tmp, 'cache.sqlite'))
+        plain_service = FakeCalendarService(count=args.events, latency=args.latency)
+        cached_service = FakeCalendarService(count=args.events, latency=args.latency)
+        plain_tool = CalendarTool(plain_service)
+        cached_tool = CalendarTool(cached_service, cache=cache)
+        
+        print(f"{args.events} eventos na agenda, {args.max} lidos por execução:")
+        print(f"{'execução':>9} {'sem cache (s)':>14} {'idas':>5} {'eventos':>8} "
+              f"{'com cache (s)':>14} {'idas':>5} {'eventos':>8}")
+        for run in range(1, args.runs + 1):
+            row = []
+            for service, tool in ((plain_service, plain_tool), (cached_service, cached_tool)):
+                if run > 1:
+                    service.update(run, summary=f'Reunião remarcada {run}')
+                    service.cancel(0)
+                    service.add(2)
+                row.extend(read(service, tool, args.max))
+            print(f"{run:>9} {row[0]:>14.3f} {row[1]:>5} {row[2]:>8} {row[3]:>14.3f} {row[4]:>5} {row[5]:>8}")
+        
+        plain = [event['summary'] for event in plain_tool.execute(max_results=args.max)]
+        cached = [event['summary'] for event in cached_tool.execute(max_results=args.max)]
+        assert plain == cached, 'o cache divergiu da API'
+        
+        cached_service.expire_sync_tokens()
+        elapsed, trips, transferred = read(cached_service, cached_tool, args.max)
+        print(f"syncToken expirado (410): ressincronização completa em {elapsed:.3f} s, "
+              f"{trips} idas, {transferred} eventos")
+        
+        start = time.perf_counter()
+        for i in range(args.queries):
+            day = cached_service.start + timedelta(hours=i % args.events)
+            cached_tool.cache.window(day.timestamp(), (day + timedelta(days=1)).timestamp())
+        per_query = (time.perf_counter() - start) / args.queries * 1e6
+        print(f"Consulta de um dia no cache (~24 eventos): {per_query:.0f} µs "
+              f"(pela API: ao menos uma ida e volta, {args.latency * 1000:.0f} ms)")
+        cache.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: leitura de várias agendas (calendarList) com a CalendarTool, em
+sequência e em paralelo, e a intercalação das listas já ordenadas com
+heapq.merge vs. concatenar e reordenar tudo.
+
+Uso:
+    python -m benchmarks.bench_calendars [--calendars 50] [--events 200] [--latency 0.05]
+"""
+
+import argparse
+import heapq
+import time
+from itertools import chain, islice
+
+from gmail_ai_assistant.event_time import event_times
+from gmail_ai_assistant.quota import QuotaLimiter
+from gmail_ai_assistant.tools import CalendarTool
+
+from .fake_calendar import FakeCalendarService
+
+
+def start_key(event):
+    return event_times(event)[0]
+
+
+def timed(func, runs: int = 5) -> float:
+    """Milissegundos da melhor de runs execuções."""
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calendars', type=int, default=50, help='Agendas na lista do usuário')
+    parser.add_argument('--events', type=int, default=200, help='Eventos futuros por agenda')
+    parser.add_argument('--max', type=int, default=100, help='Eventos pedidos por leitura')
+    parser.add_argument('--latency', type=float, default=0.05, help='Latência por ida e volta (s)')
+    args = parser.parse_args()
+    
+    service = FakeCalendarService(count=args.events, latency=args.latency, calendars=args.calendars)
+    # Mede o transporte, não a cota de 10 consultas/s do Calendar
+    limiter = QuotaLimiter(float('inf'), units={})
+    
+    print(f"{args.calendars} agendas selecionadas, {args.max} próximos eventos "
+          f"(latência {args.latency * 1000:.0f} ms):")
+    print(f"{'threads':>8} {'tempo (s)':>10} {'idas':>6}")
+    expected = None
+    for workers in (1, 4, 8, 16):
+        tool = CalendarTool(service, limiter=limiter, calendars='selected', workers=workers,
+                            service_factory=lambda: service)
+        service.round_trips = 0
+        start = time.perf_counter()
+        events = tool.execute(max_results=args.max)
+        elapsed = time.perf_counter() - start
+        tool.close()
+        assert len(events) == args.max and all('error' not in event for event in events), events[:1]
+        expected = expected or events
+        assert events == expected, 'a ordem mudou com o número de threads'
+        print(f"{workers:>8} {elapsed:>10.3f} {service.round_trips:>6}")
+    
+    # Cada agenda já vem ordenada por início, como a API entrega com orderBy=startTime
+    streams = [list(events) for events in service.calendars.values()]
+    total = sum(map(len, streams))
+    merged = list(heapq.merge(*streams, key=start_key))
+    assert merged == sorted(chain(*streams), key=start_key)
+    print(f"\nIntercalação de {len(streams)} listas ordenadas ({total} eventos), ms:")
+    print(f"  sorted(concatenação):           {timed(lambda: sorted(chain(*streams), key=start_key)):8.2f}")
+    print(f"  heapq.merge, tudo:              {timed(lambda: list(heapq.merge(*streams, key=start_key))):8.2f}")
+    print(f"  heapq.merge, {args.max:>4} primeiros:     "
+          f"{timed(lambda: list(islice(heapq.merge(*streams, key=start_key), args.max))):8.2f}")
+    print(f"  sorted(...)[:{args.max}]:              "
+          f"{timed(lambda: sorted(chain(*streams), key=start_key)[:args.max]):8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: decodificação com charset (mime.extract_body) vs. a versão antiga,
+que decodificava tudo como UTF-8 com errors='ignore', num corpus com charsets
+misturados.
+
+Uso:
+    python -m benchmarks.bench_charset [--messages 2000] [--body-size 4000] [--budget 4096]
+"""
+
+import argparse
+import base64
+import quopri
+import time
+
+from gmail_ai_assistant.mime import decode_text, extract_body
+
+
+TEXT = "Reunião às 10h — “orçamento” aprovado; ação: revisar o relatório de março. "
+
+# (nome, codificação dos bytes, charset declarado no Content-Type)
+VARIANTS = (
+    ('utf-8 declarado', 'utf-8', 'utf-8'),
+    ('latin-1 declarado', 'cp1252', 'iso-8859-1'),
+    ('windows-1252 declarado', 'cp1252', 'windows-1252'),
+    ('windows-1252 sem charset', 'cp1252', None),
+    ('utf-8 rotulado latin-1', 'utf-8', 'iso-8859-1'),
+)
+
+
+def legacy_decode(payload: dict) -> str:
+    """Decodificação anterior: ignora o charset e descarta o que não é UTF-8."""
+    return base64.urlsafe_b64decode(payload['body']['data']).decode('utf-8', errors='ignore')
+
+
+def make_payload(text: str, encoding: str, charset) -> dict:
+    content_type = 'text/plain' + (f'; charset="{charset}"' if charset else '')
+    data = base64.urlsafe_b64encode(text.encode(encoding)).decode('ascii')
+    return {
+        'mimeType': 'text/plain',
+        'headers': [{'name': 'Content-Type', 'value': content_type}],
+        'body': {'data': data},
+    }
+
+
+def run(func, corpus, expected: str) -> tuple:
+    start = time.perf_counter()
+    correct = sum(func(payload) == expected for payload in corpus)
+    return time.perf_counter() - start, correct
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--messages', type=int, default=2000, help='Mensagens por variante')
+    parser.add_argument('--body-size', type=int, default=4000, help='Tamanho do corpo (caracteres)')
+    parser.add_argument('--budget', type=int, default=4096, help='Limite de bytes decodificados')
+    args = parser.parse_args()
+    
+    text = (TEXT * (args.body_size // len(TEXT) + 1))[:args.body_size]
+    print(f"{'variante':>26} {'antiga (ms)':>12} {'corretas':>9} {'nova (ms)':>10} {'corretas':>9} "
+          f"{'nova+limite (ms)':>17}")
+    for name, encoding, charset in VARIANTS:
+        corpus = [make_payload(text, encoding, charset)] * args.messages
+        legacy_time, legacy_ok = run(legacy_decode, corpus, text)
+        new_time, new_ok = run(extract_body, corpus, text)
+        start = time.perf_counter()
+        for payload in corpus:
+            assert text.startswith(extract_body(payload, args.budget))
+        budget_time = time.perf_counter() - start
+        print(f"{name:>26} {legacy_time * 1000:>12.1f} {legacy_ok:>9} {new_time * 1000:>10.1f} {new_ok:>9} "
+              f"{budget_time * 1000:>17.1f}")
+    
+    # Quoted-printable (aparece no formato raw; o JSON do Gmail já vem decodificado)
+    qp = quopri.encodestring(text.encode('cp1252'))
+    start = time.perf_counter()
+    for _ in range(args.messages):
+        assert decode_text(qp, 'iso-8859-1', 'quoted-printable') == text
+    print(f"\nquoted-printable latin-1: {(time.perf_counter() - start) * 1000:.1f} ms "
+          f"para {args.messages} partes")
+
+
+if __name__ == '__main__':
+    main()
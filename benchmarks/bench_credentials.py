@@ -0,0 +1,93 @@
+"""
+Benchmark: leitura do token (pickle vs. JsonFileStore, com e sem o cache em
+memória) e quantas renovações acontecem quando várias threads ou processos
+pedem ao mesmo tempo um token perto de expirar.
+
+Uso:
+    python -m benchmarks.bench_credentials [--reads 2000] [--workers 8] [--refresh-latency 0.2]
+"""
+
+import argparse
+import os
+import pickle
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from gmail_ai_assistant.auth import CredentialProvider, JsonFileStore
+
+from .fake_auth import make_credentials, slow_refresh, write_token
+
+
+def timed(func, runs: int) -> float:
+    """Microssegundos por chamada."""
+    start = time.perf_counter()
+    for _ in range(runs):
+        func()
+    return (time.perf_counter() - start) / runs * 1e6
+
+
+def get_in_process(token_file: str, latency: float) -> int:
+    """Uma execução da CLI: pede as credenciais e retorna quantas renovações fez."""
+    with slow_refresh(latency) as counter:
+        CredentialProvider(token_file, 'credentials.json', []).get()
+    return counter.count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--reads', type=int, default=2000, help='Leituras do token por variante')
+    parser.add_argument('--workers', type=int, default=8, help='Threads/processos concorrentes')
+    parser.add_argument('--refresh-latency', type=float, default=0.2, help='Latência simulada da renovação (s)')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        pickle_file = os.path.join(directory, 'token.pickle')
+        json_file = os.path.join(directory, 'token.json')
+        with open(pickle_file, 'wb') as f:
+            pickle.dump(make_credentials(60), f)
+        write_token(json_file)
+        
+        def load_pickle():
+            with open(pickle_file, 'rb') as f:
+                pickle.load(f)
+        
+        store = JsonFileStore()
+        print(f"Leitura do token ({args.reads} vezes, µs por leitura):")
+        print(f"  pickle.load (antes):          {timed(load_pickle, args.reads):8.1f}")
+        print(f"  JSON, arquivo relido:         {timed(lambda: JsonFileStore().load(json_file), args.reads):8.1f}")
+        print(f"  JSON, cache em memória:       {timed(lambda: store.load(json_file), args.reads):8.1f}")
+        
+        # Threads: agentes diferentes da mesma conta no mesmo processo
+        write_token(json_file, minutes_left=1)
+        barrier = threading.Barrier(args.workers)
+        
+        def worker():
+            barrier.wait()
+            CredentialProvider(json_file, 'credentials.json', []).get()
+        
+        with slow_refresh(args.refresh_latency) as counter:
+            threads = [threading.Thread(target=worker) for _ in range(args.workers)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+        print(f"\n{args.workers} agentes em threads, token expirando: {counter.count} renovação(ões) "
+              f"em {elapsed * 1000:.0f} ms (sem a trava: {args.workers})")
+        
+        # Processos: execuções simultâneas da CLI
+        write_token(json_file, minutes_left=1)
+        with ProcessPoolExecutor(args.workers) as pool:
+            start = time.perf_counter()
+            refreshes = sum(pool.map(get_in_process, [json_file] * args.workers,
+                                     [args.refresh_latency] * args.workers))
+            elapsed = time.perf_counter() - start
+        print(f"{args.workers} processos, token expirando: {refreshes} renovação(ões) "
+              f"em {elapsed * 1000:.0f} ms (sem a trava: {args.workers})")
+
+
+if __name__ == '__main__':
+    main()
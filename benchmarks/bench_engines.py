@@ -0,0 +1,64 @@
+"""
+Benchmark: motor de extração 'json' (payload da API, format='full') vs. 'raw'
+(mensagem RFC 822 interpretada com email.parser), por classe de tamanho.
+
+Mede o tempo de CPU para decodificar a resposta e extrair cabeçalhos e corpo,
+sem latência de rede, e o tamanho de cada resposta. Use o resultado para
+escolher o motor da implantação (GmailAIAgent(engine=...), --engine ou
+GMAIL_ASSISTANT_ENGINE).
+
+Uso:
+    python -m benchmarks.bench_engines [--messages 200] [--budget 16384]
+"""
+
+import argparse
+import json
+import time
+
+from gmail_ai_assistant.tools import GmailTool
+
+from .fake_gmail import FakeGmailService
+
+
+SIZE_CLASSES = (
+    ('1 KB', 1_000),
+    ('10 KB', 10_000),
+    ('100 KB', 100_000),
+    ('1 MB', 1_000_000),
+)
+
+
+def measure(service: FakeGmailService, engine: str, count: int, budget) -> tuple:
+    tool = GmailTool(service, batch_size=100, engine=engine, body_bytes=budget)
+    tool.execute(max_results=count)  # aquece o fake (gera as mensagens raw)
+    start = time.perf_counter()
+    emails = tool.execute(max_results=count)
+    elapsed = time.perf_counter() - start
+    assert all('body' in email for email in emails), emails[:1]
+    
+    msg_id = service.messages[0]['id']
+    response = service.handle_get(id=msg_id, format='raw' if engine == 'raw' else 'full')
+    return elapsed / count * 1e6, len(json.dumps(response))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--messages', type=int, default=200, help='Mensagens por classe de tamanho')
+    parser.add_argument('--budget', type=int, default=16 * 1024,
+                        help='Limite de bytes do corpo (0 = corpo inteiro)')
+    args = parser.parse_args()
+    budget = args.budget or None
+    
+    print(f"{'tamanho':>8} {'json (µs/msg)':>14} {'raw (µs/msg)':>13} {'json (bytes)':>13} {'raw (bytes)':>12} "
+          f"{'mais rápido':>12}")
+    for name, body_size in SIZE_CLASSES:
+        count = max(min(args.messages, 20_000_000 // body_size), 10)
+        service = FakeGmailService(count=count, latency=0, batch_item_cost=0, body_size=body_size)
+        json_time, json_bytes = measure(service, 'json', count, budget)
+        raw_time, raw_bytes = measure(service, 'raw', count, budget)
+        winner = 'json' if json_time <= raw_time else 'raw'
+        print(f"{name:>8} {json_time:>14.0f} {raw_time:>13.0f} {json_bytes:>13} {raw_bytes:>12} {winner:>12}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark: horários de meses de eventos com o parsing antigo (fromisoformat +
+strftime por evento) vs. normalize_events com EventRecord de 'time' preguiçoso,
+textos repetidos interpretados uma vez, datas de dia inteiro em cache, fusos
+criados uma vez por nome e o deslocamento do fuso em cache por dia na exibição.
+
+Uso:
+    python -m benchmarks.bench_event_times [--events 50000] [--runs 5]
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from gmail_ai_assistant.event_time import event_times, get_zone, normalize_events
+from gmail_ai_assistant.records import EventRecord
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python 3.8
+    ZoneInfo = None
+
+ZONES = ('America/Sao_Paulo', 'Europe/Lisbon', 'America/New_York', 'UTC')
+
+
+def make_events(count: int, rng: random.Random):
+    """Eventos de seis meses no formato da API: com deslocamento, em UTC ('Z') e de dia inteiro."""
+    base = datetime(2024, 1, 1, tzinfo=timezone(timedelta(hours=-3)))
+    events = []
+    for i in range(count):
+        start = base + timedelta(minutes=30 * rng.randrange(0, 180 * 48))
+        end = start + timedelta(minutes=rng.choice((30, 60, 90)))
+        kind = i % 10
+        if kind == 0:
+            day = start.date()
+            events.append({'start': {'date': day.isoformat()},
+                           'end': {'date': (day + timedelta(days=1)).isoformat()}})
+        elif kind < 4:
+            utc_start, utc_end = start.astimezone(timezone.utc), end.astimezone(timezone.utc)
+            events.append({'start': {'dateTime': utc_start.strftime('%Y-%m-%dT%H:%M:%SZ')},
+                           'end': {'dateTime': utc_end.strftime('%Y-%m-%dT%H:%M:%SZ')}})
+        else:
+            zone = ZONES[i % len(ZONES)]
+            events.append({'start': {'dateTime': start.isoformat(), 'timeZone': zone},
+                           'end': {'dateTime': end.isoformat(), 'timeZone': zone}})
+        events[-1].update(summary=f'Evento {i}', description='')
+    return events
+
+
+def old_records(events):
+    """Como a CalendarTool fazia: um fromisoformat e um strftime por evento."""
+    records = []
+    for event in events:
+        start = event['start'].get('dateTime', event['start'].get('date'))
+        if 'T' in start:
+            dt = datetime.fromisoformat(start.replace('Z', '+00:00'))
+            formatted_time = dt.strftime('%d/%m/%Y às %H:%M')
+        else:
+            dt = datetime.fromisoformat(start)
+            formatted_time = dt.strftime('%d/%m/%Y (dia inteiro)')
+        records.append(EventRecord(summary=event['summary'], time=formatted_time,
+                                   description=event['description']))
+    return records
+
+
+def new_records(events, zone):
+    return [EventRecord(summary=event['summary'], description=event['description'],
+                        start=start, end=end, all_day=all_day, zone=zone)
+            for event, (start, end, all_day) in zip(events, normalize_events(events, zone))]
+
+
+def timed(func, runs: int) -> float:
+    """Milissegundos da melhor de runs execuções."""
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--events', type=int, default=50000, help='Eventos (seis meses de agendas)')
+    parser.add_argument('--runs', type=int, default=5, help='Execuções por medida (vale a melhor)')
+    parser.add_argument('--tz', default='America/Sao_Paulo', help='Fuso do usuário')
+    args = parser.parse_args()
+    events = make_events(args.events, random.Random(42))
+    
+    # O antigo exibia cada evento no deslocamento em que veio; o novo, no fuso do usuário
+    for event, record in zip(events[:200], new_records(events[:200], 'UTC')):
+        if 'dateTime' in event['start']:
+            moment = datetime.fromisoformat(event['start']['dateTime'].replace('Z', '+00:00'))
+            assert record.time == moment.astimezone(timezone.utc).strftime('%d/%m/%Y às %H:%M')
+    assert normalize_events(events[:200], args.tz) == [event_times(event, args.tz) for event in events[:200]]
+    # O deslocamento em cache por dia dá o mesmo texto da conversão exata, inclusive na troca de horário
+    tz = get_zone(args.tz)
+    for record in new_records(events[:2000], args.tz):
+        moment = datetime.fromtimestamp(record.start, tz)
+        assert record.time == moment.strftime('%d/%m/%Y (dia inteiro)' if record.all_day else '%d/%m/%Y às %H:%M')
+    
+    old_ms = timed(lambda: old_records(events), args.runs)
+    new_ms = timed(lambda: new_records(events, args.tz), args.runs)
+    shown_ms = timed(lambda: [record.time for record in new_records(events, args.tz)[:20]], args.runs)
+    all_ms = timed(lambda: [record.time for record in new_records(events, args.tz)], args.runs)
+    print(f"{args.events} eventos (10% de dia inteiro, 30% em UTC, fusos {', '.join(ZONES)}), ms:")
+    print(f"  antigo: fromisoformat + strftime por evento    {old_ms:8.1f}")
+    print(f"  normalize_events, 'time' não lido              {new_ms:8.1f}  ({old_ms / new_ms:.1f}x)")
+    print(f"  normalize_events, 'time' dos 20 exibidos       {shown_ms:8.1f}  ({old_ms / shown_ms:.1f}x)")
+    print(f"  normalize_events, 'time' de todos              {all_ms:8.1f}  ({old_ms / all_ms:.1f}x)")
+    
+    if ZoneInfo is not None:
+        names = [ZONES[i % len(ZONES)] for i in range(args.events)]
+        fresh_ms = timed(lambda: [ZoneInfo.no_cache(name) for name in names], 1)
+        cached_ms = timed(lambda: [get_zone(name) for name in names], args.runs)
+        print(f"\nFuso por evento: ZoneInfo.no_cache {fresh_ms:.1f} ms, get_zone (em cache) {cached_ms:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: vazão (MB/s) da conversão HTML → texto em e-mails de marketing grandes.
+
+Uso:
+    python -m benchmarks.bench_html_text [--sizes 100000 1000000 5000000] [--max-chars 4096]
+"""
+
+import argparse
+import time
+
+from gmail_ai_assistant.html_text import html_to_text
+
+
+BLOCK = """
+<table role="presentation" width="100%" style="border-collapse:collapse;font-family:Arial">
+  <tr><td style="padding:12px;color:#333"><a href="https://t.exemplo.com/c?u=1&amp;id={i}">
+    <img src="https://cdn.exemplo.com/produto{i}.png" alt="Produto {i}" width="300"></a></td>
+  <td style="padding:12px"><h2>Oferta imperdível {i}</h2>
+    <p>Aproveite&nbsp;<b>50% de desconto</b> em toda a linha de verão. Promoção válida até domingo,
+    enquanto durarem os estoques. Frete grátis para compras acima de R$&nbsp;199.</p></td></tr>
+</table>
+<img src="https://t.exemplo.com/open?id={i}" width="1" height="1" alt="">
+"""
+
+HEAD = """<html><head><title>Newsletter</title><style>
+.btn {{ background: #f60; color: #fff; }} @media (max-width: 600px) {{ td {{ display: block; }} }}
+</style><script>window.dataLayer = [];</script></head><body>"""
+
+
+def make_html(size: int) -> str:
+    """Gera um HTML de marketing com aproximadamente 'size' caracteres."""
+    parts = [HEAD.format()]
+    total = len(parts[0])
+    i = 0
+    while total < size:
+        block = BLOCK.format(i=i)
+        parts.append(block)
+        total += len(block)
+        i += 1
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000, 5_000_000],
+                        help='Tamanhos dos HTMLs gerados (caracteres)')
+    parser.add_argument('--max-chars', type=int, default=4096, help='Limite de texto para o modo com limite')
+    args = parser.parse_args()
+    
+    print(f"{'tamanho':>10} {'texto':>9} {'completo (MB/s)':>16} {'com limite (ms)':>16}")
+    for size in args.sizes:
+        html = make_html(size)
+        megabytes = len(html.encode('utf-8')) / 1024 / 1024
+        
+        start = time.perf_counter()
+        text = html_to_text(html)
+        full = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        html_to_text(html, args.max_chars)
+        capped = time.perf_counter() - start
+        
+        print(f"{len(html):>10} {len(text):>9} {megabytes / full:>16.1f} {capped * 1000:>16.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark de regressão: tempo de import do pacote e da CLI (python -X importtime).
+
+Roda cada cenário num processo novo, soma o custo dos imports feitos depois da
+inicialização do interpretador e confere que as dependências pesadas (Gemini,
+OAuth, googleapiclient, rich) não são carregadas por quem não as usa. Sai com
+código 1 se --help ou o import do pacote passarem do orçamento, ou se algum
+cenário importar o que não devia.
+
+Uso:
+    python -m benchmarks.bench_imports [--runs 5] [--budget-ms 100]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+
+HEAVY = ('google.generativeai', 'google_auth_oauthlib', 'googleapiclient', 'rich')
+
+# (nome, argumentos do python, módulos pesados que não podem aparecer, sujeito ao orçamento)
+SCENARIOS = (
+    ('gmail-assistant --help', ['-m', 'gmail_ai_assistant.cli', '--help'], HEAVY, True),
+    ('import gmail_ai_assistant', ['-c', 'import gmail_ai_assistant'], HEAVY, True),
+    ('gmail-assistant setup', ['-m', 'gmail_ai_assistant.cli', 'setup'], HEAVY[:3], False),
+    ('import ...tools', ['-c', 'import gmail_ai_assistant.tools'], HEAVY, False),
+    ('import ...agent', ['-c', 'import gmail_ai_assistant.agent'], HEAVY, False),
+)
+
+# O que o __init__ e a CLI importavam antes, só como referência
+EAGER = 'import google.generativeai, google_auth_oauthlib.flow, googleapiclient.discovery, rich.markdown'
+
+
+def import_times(args: list, env: dict) -> tuple:
+    """Retorna (ms dos imports após o site, nomes importados) de um processo novo."""
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', *args], env=env, check=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True).stderr
+    total, names, started = 0, set(), False
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        names.add(name.strip())
+        if not name.startswith('  '):  # import de nível superior
+            if started:
+                total += int(cumulative)
+            started = started or name.strip() == 'site'
+    return total / 1000, names
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5, help='Repetições por cenário')
+    parser.add_argument('--budget-ms', type=float, default=100,
+                        help='Orçamento de import de --help e do pacote')
+    args = parser.parse_args()
+    
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.getenv('PYTHONPATH')])))
+    failures = []
+    print(f"{'cenário':>28} {'imports (ms)':>13}  pesados carregados")
+    for name, cmd, forbidden, budgeted in SCENARIOS:
+        times, names = [], set()
+        for _ in range(args.runs):
+            elapsed, names = import_times(cmd, env)
+            times.append(elapsed)
+        elapsed = statistics.median(times)
+        loaded = sorted(m for m in forbidden if m in names)
+        print(f"{name:>28} {elapsed:>13.1f}  {', '.join(loaded) or '-'}")
+        if budgeted and elapsed > args.budget_ms:
+            failures.append(f"{name}: {elapsed:.1f} ms > {args.budget_ms:.0f} ms")
+        if loaded:
+            failures.append(f"{name}: importou {', '.join(loaded)}")
+    
+    eager = statistics.median(import_times(['-c', EAGER], env)[0] for _ in range(args.runs))
+    print(f"\nReferência (imports feitos antes na carga do pacote): {eager:.1f} ms")
+    
+    if failures:
+        print("\nRegressão:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
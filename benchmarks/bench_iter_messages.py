@@ -0,0 +1,78 @@
+"""
+Benchmark: varredura completa com iter_messages vs. execute(max_results=N).
+
+Mede o pico de memória (tracemalloc) de cada abordagem e o ganho de tempo da
+busca antecipada da próxima página.
+
+Uso:
+    python -m benchmarks.bench_iter_messages [--emails 20000] [--latency 0.05]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from gmail_ai_assistant.tools import GmailTool
+from benchmarks.fake_gmail import FakeGmailService
+
+
+def measure(func):
+    """Executa func e retorna (segundos, pico de memória em MB)."""
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    
+    # Medido em uma segunda execução: o tracemalloc distorce o tempo
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def check_short_first_page():
+    """
+    Primeira página curta (cabe em um lote) e a seguinte longa: o pool de
+    workers nasce na thread de busca antecipada, que não pode ser encerrada ali.
+    """
+    service = FakeGmailService(count=300, latency=0, batch_item_cost=0, first_page_size=40)
+    tool = GmailTool(service, batch_size=50, workers=4, service_factory=lambda: service)
+    ids = [email['id'] for email in tool.iter_messages(page_size=100)]
+    tool.close()
+    assert ids == [msg['id'] for msg in service.messages], f"{len(ids)} de {len(service.messages)} e-mails"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--emails', type=int, default=20000, help='Tamanho da caixa de entrada')
+    parser.add_argument('--latency', type=float, default=0.05, help='Latência por ida e volta (s)')
+    parser.add_argument('--work', type=float, default=0.0001, help='Processamento por e-mail no consumidor (s)')
+    args = parser.parse_args()
+    check_short_first_page()
+    
+    service = FakeGmailService(count=args.emails, latency=args.latency, batch_item_cost=0, body_size=500)
+    sequential = GmailTool(service)
+    prefetching = GmailTool(service, service_factory=lambda: service)
+    
+    def scan(tool):
+        count = 0
+        for email in tool.iter_messages(page_size=500):
+            # Simula o processamento de cada e-mail pelo consumidor
+            time.sleep(args.work)
+            count += len(email['subject'])
+        return count
+    
+    rows = [
+        ('execute (lista)', lambda: sequential.execute(max_results=args.emails, format='metadata')),
+        ('iter_messages', lambda: scan(sequential)),
+        ('iter + prefetch', lambda: scan(prefetching)),
+    ]
+    print(f"{'abordagem':>16} {'tempo (s)':>10} {'pico (MB)':>10}")
+    for name, func in rows:
+        elapsed, peak = measure(func)
+        print(f"{name:>16} {elapsed:>10.2f} {peak:>10.1f}")
+    prefetching.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Benchmark: tamanho da resposta e custo de decodificação, format='full' vs 'metadata'.
+
+Uso:
+    python -m benchmarks.bench_metadata [--emails 200] [--body-size 20000]
+"""
+
+import argparse
+import json
+import time
+
+from gmail_ai_assistant.tools import GmailTool
+from benchmarks.fake_gmail import FakeGmailService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--emails', type=int, default=200, help='E-mails lidos por execução')
+    parser.add_argument('--body-size', type=int, default=20000, help='Tamanho do corpo de cada mensagem')
+    args = parser.parse_args()
+    
+    service = FakeGmailService(count=args.emails, latency=0, batch_item_cost=0, body_size=args.body_size)
+    tool = GmailTool(service)
+    message_id = service.messages[0]['id']
+    
+    print(f"{'formato':>9} {'bytes/msg':>10} {'json.loads (µs/msg)':>20} {'execute (ms)':>13}")
+    for format in ('full', 'metadata'):
+        kwargs = {'metadataHeaders': ['Subject', 'From', 'Date']} if format == 'metadata' else {}
+        raw = json.dumps(service.handle_get(id=message_id, format=format, **kwargs))
+        
+        loops = 2000
+        start = time.perf_counter()
+        for _ in range(loops):
+            json.loads(raw)
+        decode_us = (time.perf_counter() - start) / loops * 1e6
+        
+        start = time.perf_counter()
+        emails = tool.execute(max_results=args.emails, format=format)
+        execute_ms = (time.perf_counter() - start) * 1000
+        assert len(emails) == args.emails
+        
+        print(f"{format:>9} {len(raw):>10} {decode_us:>20.1f} {execute_ms:>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
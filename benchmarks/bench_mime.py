@@ -0,0 +1,98 @@
+"""
+Benchmark: extração do corpo com o percurso iterativo (mime.extract_body) vs.
+a versão recursiva antiga, em mensagens sintéticas profundamente aninhadas.
+
+Uso:
+    python -m benchmarks.bench_mime [--body-size 1000000] [--budget 4096]
+"""
+
+import argparse
+import base64
+import time
+
+from gmail_ai_assistant.mime import extract_body
+
+
+def legacy_get_email_body(payload):
+    """Cópia da implementação recursiva anterior, para comparação."""
+    if 'parts' in payload:
+        for part in payload['parts']:
+            if part['mimeType'] == 'text/plain':
+                data = part['body'].get('data')
+                if data:
+                    return base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore')
+            elif part['mimeType'].startswith('multipart/'):
+                return legacy_get_email_body(part)
+    else:
+        data = payload['body'].get('data')
+        if data:
+            return base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore')
+    return '(Sem corpo de texto)'
+
+
+def encode(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode('utf-8')).decode('ascii')
+
+
+def make_payload(depth: int, body_size: int, decoy: bool) -> dict:
+    """
+    Gera uma mensagem com 'depth' níveis de multipart/mixed.
+    
+    Cada nível tem um anexo de texto depois do próximo nível e, com decoy, um
+    multipart/related só com imagem antes dele (o que engana a versão antiga).
+    O text/plain do corpo fica no nível mais profundo.
+    """
+    text = ("Conteúdo do e-mail com acentuação: ação, café, coração. " * (body_size // 55 + 1))[:body_size]
+    node = {
+        'mimeType': 'multipart/alternative',
+        'parts': [
+            {'mimeType': 'text/plain', 'filename': '', 'body': {'data': encode(text)}},
+            {'mimeType': 'text/html', 'filename': '', 'body': {'data': encode(f'<p>{text}</p>')}},
+        ],
+    }
+    for level in range(depth):
+        parts = [
+            node,
+            {'mimeType': 'text/plain', 'filename': f'anexo{level}.txt', 'body': {'data': encode('anexo')}},
+        ]
+        if decoy:
+            parts.insert(0, {'mimeType': 'multipart/related', 'parts': [
+                {'mimeType': 'image/png', 'filename': f'logo{level}.png', 'body': {'attachmentId': 'x'}},
+            ]})
+        node = {'mimeType': 'multipart/mixed', 'parts': parts}
+    return node
+
+
+def timeit(func, payload, loops: int) -> float:
+    start = time.perf_counter()
+    for _ in range(loops):
+        func(payload)
+    return (time.perf_counter() - start) / loops * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--body-size', type=int, default=1_000_000, help='Tamanho do corpo (caracteres)')
+    parser.add_argument('--budget', type=int, default=4096, help='Limite de bytes decodificados')
+    args = parser.parse_args()
+    
+    print(f"{'profundidade':>12} {'isca':>5} {'antiga (µs)':>15} {'correta?':>9} {'nova (µs)':>10} "
+          f"{'nova+limite (µs)':>17}")
+    for depth, decoy in ((1, False), (10, False), (100, False), (2000, False), (1, True), (10, True)):
+        payload = make_payload(depth, args.body_size, decoy)
+        loops = 20
+        try:
+            legacy_body = legacy_get_email_body(payload)
+            legacy_time = f'{timeit(legacy_get_email_body, payload, loops):.0f}'
+            legacy_ok = 'sim' if legacy_body.startswith('Conteúdo') else 'não'
+        except RecursionError:
+            legacy_time, legacy_ok = 'RecursionError', '-'
+        assert extract_body(payload).startswith('Conteúdo')
+        full_time = timeit(extract_body, payload, loops)
+        budget_time = timeit(lambda p: extract_body(p, args.budget), payload, loops)
+        print(f"{depth:>12} {'sim' if decoy else 'não':>5} {legacy_time:>15} {legacy_ok:>9} {full_time:>10.0f} "
+              f"{budget_time:>17.1f}")
+
+
+if __name__ == '__main__':
+    main()
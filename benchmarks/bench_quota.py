@@ -0,0 +1,67 @@
+"""
+Benchmark: leitura em lote com threads contra um serviço com cota por usuário,
+sem limitador (cada 429 vira um erro) vs. com QuotaLimiter e RetryPolicy,
+inclusive com lotes maiores que a cota de um segundo.
+
+Uso:
+    python -m benchmarks.bench_quota [--count 400] [--quota 250] [--workers 4] [--big-batch 100]
+"""
+
+import argparse
+import time
+
+from gmail_ai_assistant.quota import QuotaLimiter, RetryPolicy
+from gmail_ai_assistant.tools import GmailTool
+
+from .fake_gmail import FakeGmailService
+
+
+def run(count: int, quota: float, workers: int, latency: float, limiter: QuotaLimiter, retry: RetryPolicy,
+        batch_size: int = 50):
+    """Executa uma leitura e retorna (segundos, e-mails lidos, erros, respostas 429)."""
+    service = FakeGmailService(count=count, latency=latency, units_per_second=quota)
+    tool = GmailTool(service, batch_size=batch_size, workers=workers, service_factory=lambda: service,
+                     limiter=limiter, retry=retry)
+    start = time.perf_counter()
+    emails = tool.execute(max_results=count, format='metadata')
+    elapsed = time.perf_counter() - start
+    tool.close()
+    errors = sum(1 for email in emails if 'error' in email)
+    return elapsed, len(emails) - errors, errors, service.rate_limited
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=400, help='Mensagens lidas')
+    parser.add_argument('--quota', type=float, default=250, help='Cota do serviço falso (unidades/s)')
+    parser.add_argument('--workers', type=int, default=4, help='Threads do GmailTool')
+    parser.add_argument('--latency', type=float, default=0.02, help='Latência por ida e volta (s)')
+    parser.add_argument('--big-batch', type=int, default=100, help='Lote maior que a cota de um segundo')
+    args = parser.parse_args()
+    
+    # Um lote maior que o balde é cobrado inteiro: 5 lotes de 2 s de cota levam ao menos 8 s
+    limiter = QuotaLimiter(args.quota)
+    start = time.perf_counter()
+    for _ in range(5):
+        limiter.acquire(2 * args.quota)
+    elapsed = time.perf_counter() - start
+    assert elapsed >= 8 * 0.99, f'lotes acima do balde cobrados a menos: {elapsed:.2f} s'
+    
+    variants = (
+        ('sem limite, sem novas tentativas', QuotaLimiter(float('inf')), RetryPolicy(max_retries=0)),
+        ('sem limite, com novas tentativas', QuotaLimiter(float('inf')), RetryPolicy(base_delay=0.1)),
+        ('QuotaLimiter + RetryPolicy', QuotaLimiter(args.quota), RetryPolicy(base_delay=0.1)),
+        (f'idem, lotes de {args.big_batch}', QuotaLimiter(args.quota), RetryPolicy(base_delay=0.1)),
+    )
+    print(f"{args.count} mensagens (5 unidades cada), cota de {args.quota:.0f} unidades/s, "
+          f"{args.workers} threads:")
+    print(f"{'variante':<34} {'tempo (s)':>10} {'lidos':>6} {'erros':>6} {'429':>6}")
+    for name, limiter, retry in variants:
+        batch_size = args.big_batch if name.startswith('idem') else 50
+        elapsed, fetched, errors, rate_limited = run(args.count, args.quota, args.workers, args.latency,
+                                                     limiter, retry, batch_size)
+        print(f"{name:<34} {elapsed:>10.2f} {fetched:>6} {errors:>6} {rate_limited:>6}")
+
+
+if __name__ == '__main__':
+    main()
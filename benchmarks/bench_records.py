@@ -0,0 +1,78 @@
+"""
+Benchmark: memória de 100 mil e-mails como dicts vs. EmailRecord (__slots__,
+remetente internado), e custo de leitura com o corpo preguiçoso.
+
+Uso:
+    python -m benchmarks.bench_records [--records 100000] [--senders 500]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from gmail_ai_assistant.records import EmailRecord, EventRecord
+from gmail_ai_assistant.tools import GmailTool
+
+from .fake_gmail import FakeGmailService
+
+
+def make_fields(count: int, senders: int) -> list:
+    """Campos como viriam do JSON da API: cada string é um objeto novo, mesmo repetida."""
+    return [(f'msg{i:08d}', f'Assunto {i % 1000}', f'Remetente {i % senders} <r{i % senders}@exemplo.com>',
+             'Mon, 13 Nov 2023 10:00:00 -0300', f'Trecho da mensagem {i}') for i in range(count)]
+
+
+def measure(build) -> tuple:
+    tracemalloc.start()
+    start = time.perf_counter()
+    items = build()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return items, size, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--records', type=int, default=100_000, help='Número de registros')
+    parser.add_argument('--senders', type=int, default=500, help='Remetentes distintos')
+    args = parser.parse_args()
+    
+    print(f"{args.records} e-mails (campos + contêiner; {args.senders} remetentes distintos):")
+    print(f"{'tipo':>12} {'MB':>8} {'bytes/registro':>15} {'tempo (ms)':>11}")
+    for name, build in (
+        ('dict', lambda: [{'id': i, 'subject': s, 'from': f, 'date': d, 'snippet': sn}
+                          for i, s, f, d, sn in make_fields(args.records, args.senders)]),
+        ('EmailRecord', lambda: [EmailRecord(i, s, f, d, sn)
+                                 for i, s, f, d, sn in make_fields(args.records, args.senders)]),
+    ):
+        items, size, elapsed = measure(build)
+        print(f"{name:>12} {size / 1e6:>8.1f} {size / len(items):>15.0f} {elapsed * 1000:>11.0f}")
+        del items
+    
+    for name, build in (
+        ('dict', lambda: [{'summary': f'Evento {i}', 'time': '13/11/2023 às 10:00', 'description': ''}
+                          for i in range(args.records)]),
+        ('EventRecord', lambda: [EventRecord(f'Evento {i}', '13/11/2023 às 10:00', '')
+                                 for i in range(args.records)]),
+    ):
+        items, size, elapsed = measure(build)
+        print(f"{name:>12} {size / 1e6:>8.1f} {size / len(items):>15.0f} {elapsed * 1000:>11.0f}")
+        del items
+    
+    # Corpo preguiçoso: ler 2000 e-mails completos sem tocar no corpo vs. lendo todos
+    service = FakeGmailService(count=2000, latency=0, batch_item_cost=0, body_size=20_000)
+    tool = GmailTool(service, batch_size=100, body_bytes=16 * 1024, reduce_bodies=True)
+    tool.execute(max_results=2000)
+    start = time.perf_counter()
+    emails = tool.execute(max_results=2000)
+    lazy = time.perf_counter() - start
+    start = time.perf_counter()
+    sum(len(email['body']) for email in emails)
+    bodies = time.perf_counter() - start
+    print(f"\n2000 e-mails 'full': leitura {lazy * 1000:.0f} ms; decodificar todos os corpos depois "
+          f"+{bodies * 1000:.0f} ms (só paga quem acessa 'body')")
+
+
+if __name__ == '__main__':
+    main()
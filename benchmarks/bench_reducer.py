@@ -0,0 +1,71 @@
+"""
+Benchmark: redução de corpos (citações, assinaturas, avisos legais).
+
+Mede a vazão do redutor e os tokens economizados por mensagem em um corpus
+sintético de respostas no estilo Gmail e Outlook.
+
+Uso:
+    python -m benchmarks.bench_reducer [--messages 5000]
+"""
+
+import argparse
+import time
+
+from gmail_ai_assistant.reducer import reduce_body, estimate_tokens
+from benchmarks.fake_gmail import make_reply_text
+
+
+SIGNATURE = """
+-- 
+Maria Silva | Gerente de Projetos
+Empresa Exemplo S.A. | Tel: +55 11 99999-9999
+"""
+
+DISCLAIMER = """
+Esta mensagem e seus anexos podem conter informações confidenciais ou privilegiadas.
+Se você não for o destinatário, por favor apague-a e avise o remetente.
+"""
+
+OUTLOOK_HEADER = """
+________________________________
+De: João Souza <joao@exemplo.com>
+Enviado: segunda-feira, 13 de novembro de 2023 10:00
+Para: Maria Silva <maria@exemplo.com>
+Assunto: RE: Relatório
+"""
+
+
+def make_corpus(count: int):
+    """Gera respostas alternando os estilos do Gmail e do Outlook."""
+    corpus = []
+    for i in range(count):
+        previous = make_reply_text(i + 1, 400, make_reply_text(i + 2, 400, None))
+        if i % 2:
+            body = make_reply_text(i, 200, None) + '\n' + SIGNATURE + DISCLAIMER + OUTLOOK_HEADER + previous
+        else:
+            body = make_reply_text(i, 200, previous) + '\n' + SIGNATURE + DISCLAIMER
+        corpus.append(body)
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--messages', type=int, default=5000, help='Tamanho do corpus')
+    args = parser.parse_args()
+    
+    corpus = make_corpus(args.messages)
+    start = time.perf_counter()
+    results = [reduce_body(body) for body in corpus]
+    elapsed = time.perf_counter() - start
+    
+    before = sum(estimate_tokens(body) for body in corpus)
+    saved = sum(tokens for _, tokens in results)
+    megabytes = sum(len(body.encode('utf-8')) for body in corpus) / 1024 / 1024
+    print(f"mensagens:            {args.messages}")
+    print(f"tempo por mensagem:   {elapsed / args.messages * 1e6:.1f} µs ({megabytes / elapsed:.1f} MB/s)")
+    print(f"tokens por mensagem:  {before / args.messages:.0f} → {(before - saved) / args.messages:.0f}")
+    print(f"economia:             {saved / before:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark: custo de construir os serviços do Google na inicialização.
+
+Compara build() do googleapiclient (Gmail + Calendar, como o agente fazia a
+cada execução) com build_service (documento reduzido em cache, só o Gmail),
+em processos novos e dentro do mesmo processo, e confirma que o agente não
+constrói o cliente do Calendar num comando que só lê e-mails. Por fim mede a
+criação do agente com um token perto de expirar: a renovação (simulada, com
+latência) agora roda em segundo plano em vez de bloquear o construtor.
+
+Uso:
+    python -m benchmarks.bench_startup [--runs 10] [--refresh-latency 0.3]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from .fake_auth import slow_refresh, write_token
+
+
+# Os imports ficam fora da medida: o custo deles é tratado em bench_imports
+BEFORE = """
+from google.auth.credentials import AnonymousCredentials
+from googleapiclient.discovery import build
+import time; start = time.perf_counter()
+build('gmail', 'v1', credentials=AnonymousCredentials())
+build('calendar', 'v3', credentials=AnonymousCredentials())
+print(time.perf_counter() - start)
+"""
+
+AFTER = """
+from google.auth.credentials import AnonymousCredentials
+from gmail_ai_assistant.discovery import build_service
+import googleapiclient.discovery, googleapiclient.discovery_cache
+import time; start = time.perf_counter()
+build_service('gmail', 'v1', credentials=AnonymousCredentials())
+print(time.perf_counter() - start)
+"""
+
+
+def cold_start(code: str, runs: int, env: dict) -> float:
+    """Mediana, em ms, do tempo medido dentro de processos Python novos."""
+    times = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-W', 'ignore', '-c', code], env=env, check=True,
+                                capture_output=True, text=True).stdout
+        times.append(float(output) * 1000)
+    return statistics.median(times)
+
+
+def in_process(func, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        func()
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def check_refresh(latency: float):
+    """Tempo do construtor e da primeira requisição com um token expirando."""
+    from gmail_ai_assistant.agent import GmailAIAgent
+    
+    with tempfile.TemporaryDirectory() as directory, slow_refresh(latency):
+        token_file = os.path.join(directory, 'token.json')
+        write_token(token_file, minutes_left=1)
+        
+        start = time.perf_counter()
+        agent = GmailAIAgent(credentials_file='credentials.json', token_file=token_file)
+        built = time.perf_counter() - start
+        time.sleep(latency * 1.5)  # o chamador monta o prompt, lê o cache...
+        start = time.perf_counter()
+        agent.gmail_service.users()
+        first = time.perf_counter() - start
+        agent.close()
+    print(f"\nToken expirando (renovação de {latency * 1000:.0f} ms):")
+    print(f"  antes: o construtor esperava a renovação    ~{latency * 1000:6.0f} ms")
+    print(f"  agora: construtor {built * 1000:.1f} ms; primeira requisição esperou {first * 1000:.1f} ms")
+
+
+def check_agent():
+    """Cria o agente com um token válido (sem rede) e mostra quais serviços foram construídos."""
+    from gmail_ai_assistant.agent import GmailAIAgent
+    
+    with tempfile.TemporaryDirectory() as directory:
+        token_file = os.path.join(directory, 'token.json')
+        write_token(token_file)
+        agent = GmailAIAgent(credentials_file='credentials.json', token_file=token_file)
+        print(f"\nAgente criado: Gmail construído={agent.gmail_service.built}, "
+              f"Calendar construído={agent.calendar_service.built}")
+        # O comando 'emails' só usa o serviço do Gmail
+        agent.gmail_tool.gmail_service.users()
+        print(f"Depois de usar o Gmail: Gmail construído={agent.gmail_service.built}, "
+              f"Calendar construído={agent.calendar_service.built}")
+        agent.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=10, help='Repetições por medida')
+    parser.add_argument('--refresh-latency', type=float, default=0.3, help='Latência simulada da renovação (s)')
+    args = parser.parse_args()
+    
+    from google.auth.credentials import AnonymousCredentials
+    from googleapiclient.discovery import build
+    from gmail_ai_assistant import discovery
+    
+    with tempfile.TemporaryDirectory() as cache_dir:
+        os.environ['GMAIL_ASSISTANT_DISCOVERY_CACHE'] = cache_dir
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.getenv('PYTHONPATH')])))
+        subprocess.run([sys.executable, '-W', 'ignore', '-c', AFTER], env=env, check=True, capture_output=True)
+        
+        print("Processo novo (construção dos serviços, mediana em ms):")
+        print(f"  build() Gmail + Calendar:           {cold_start(BEFORE, args.runs, env):8.1f}")
+        print(f"  build_service Gmail (cache quente): {cold_start(AFTER, args.runs, env):8.1f}")
+        
+        creds = AnonymousCredentials()
+        print("\nMesmo processo (só a construção, ms por serviço):")
+        for api, version in (('gmail', 'v1'), ('calendar', 'v3')):
+            full = in_process(lambda: build(api, version, credentials=creds), args.runs)
+            discovery._documents.clear()
+            cold = in_process(lambda: discovery.build_service(api, version, credentials=creds), 1)
+            warm = in_process(lambda: discovery.build_service(api, version, credentials=creds), args.runs)
+            print(f"  {api:>8}: build() {full:6.2f} | build_service do disco {cold:6.2f}, da memória {warm:6.2f}")
+        
+        check_agent()
+        check_refresh(args.refresh_latency)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Benchmark: leitura por mensagem vs. por conversa (users().threads()).
+
+Compara idas e voltas HTTP, chamadas à API e o volume de texto que seria
+enviado ao Gemini para as mesmas mensagens.
+
+Uso:
+    python -m benchmarks.bench_threads [--emails 60] [--thread-size 6]
+"""
+
+import argparse
+
+from gmail_ai_assistant.tools import GmailTool
+from benchmarks.fake_gmail import FakeGmailService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--emails', type=int, default=60, help='Mensagens na caixa de entrada')
+    parser.add_argument('--thread-size', type=int, default=6, help='Mensagens por conversa')
+    args = parser.parse_args()
+    
+    service = FakeGmailService(count=args.emails, latency=0, body_size=400, thread_size=args.thread_size)
+    threads = args.emails // args.thread_size
+    
+    print(f"{'modo':>10} {'registros':>10} {'chamadas':>9} {'caracteres':>11}")
+    for mode in ('mensagens', 'conversas'):
+        tool = GmailTool(service, batch_size=1)
+        service.round_trips = 0
+        if mode == 'mensagens':
+            records = tool.execute(max_results=args.emails)
+        else:
+            records = tool.execute_threads(max_results=threads)
+        assert all('error' not in r for r in records)
+        chars = sum(len(r['body']) for r in records)
+        print(f"{mode:>10} {len(records):>10} {service.round_trips:>9} {chars:>11}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Tokens falsos do Google e renovação simulada (sem rede) para benchmarks locais
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from google.oauth2.credentials import Credentials
+
+
+def make_credentials(minutes_left: float, token: str = 'velho') -> Credentials:
+    """Credenciais com refresh_token que expiram daqui a minutes_left minutos."""
+    return Credentials(token=token, refresh_token='refresh', client_id='cliente', client_secret='segredo',
+                       token_uri='https://oauth2.googleapis.com/token',
+                       expiry=datetime.utcnow() + timedelta(minutes=minutes_left))
+
+
+def write_token(path: str, minutes_left: float = 60):
+    """Grava um token JSON (Credentials.to_json), como o JsonFileStore faz."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(make_credentials(minutes_left).to_json())
+
+
+class RefreshCounter:
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+    
+    def add(self):
+        with self._lock:
+            self.count += 1
+
+
+@contextmanager
+def slow_refresh(latency: float):
+    """Troca Credentials.refresh por uma espera de latency segundos; conta as renovações."""
+    counter = RefreshCounter()
+    original = Credentials.refresh
+    
+    def refresh(self, request):
+        time.sleep(latency)
+        counter.add()
+        self.token = f'renovado{counter.count}'
+        self.expiry = datetime.utcnow() + timedelta(hours=1)
+    
+    Credentials.refresh = refresh
+    try:
+        yield counter
+    finally:
+        Credentials.refresh = original
@@ -0,0 +1,169 @@
+"""
+Serviço falso da API do Google Calendar para benchmarks locais
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from gmail_ai_assistant.event_time import event_times, parse_datetime
+
+from .fake_gmail import FakeHttpError, FakeRequest
+
+
+def make_event(index: int, start: datetime, minutes: int = 30) -> Dict[str, Any]:
+    """Gera um evento sintético no formato da API do Calendar."""
+    end = start + timedelta(minutes=minutes)
+    return {
+        'id': f'evt{index:06d}',
+        'status': 'confirmed',
+        'summary': f'Reunião {index}',
+        'description': f'Pauta da reunião {index}',
+        'start': {'dateTime': start.isoformat()},
+        'end': {'dateTime': end.isoformat()},
+    }
+
+
+class _Events:
+    def __init__(self, service: 'FakeCalendarService'):
+        self.service = service
+    
+    def list(self, **kwargs) -> FakeRequest:
+        return FakeRequest(self.service, self.service.handle_events, kwargs)
+
+
+class _FreeBusy:
+    def __init__(self, service: 'FakeCalendarService'):
+        self.service = service
+    
+    def query(self, **kwargs) -> FakeRequest:
+        return FakeRequest(self.service, self.service.handle_freebusy, kwargs)
+
+
+class _CalendarList:
+    def __init__(self, service: 'FakeCalendarService'):
+        self.service = service
+    
+    def list(self, **kwargs) -> FakeRequest:
+        return FakeRequest(self.service, self.service.handle_calendar_list, kwargs)
+
+
+class FakeCalendarService:
+    """
+    Imitação mínima do recurso events() do googleapiclient, com syncToken.
+    
+    Cada mudança (update, cancel, add) recebe uma versão; o nextSyncToken é a
+    versão atual e uma listagem com syncToken devolve só o que mudou depois dele.
+    
+    Args:
+        count: Número de eventos futuros por agenda, um a cada hora a partir de agora
+        latency: Latência simulada por ida e volta HTTP, em segundos
+        calendars: Número de agendas; além da principal, agendas de equipe com os
+            horários deslocados alguns minutos, só a principal muda (update, cancel...)
+    """
+    
+    def __init__(self, count: int = 50, latency: float = 0.02, calendars: int = 1):
+        now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        self.start = now
+        self.items = [make_event(i, now + timedelta(hours=i + 1)) for i in range(count)]
+        self.calendars = {'primary': self.items}
+        for number in range(1, calendars):
+            self.calendars[f'equipe{number:02d}@group.calendar.google.com'] = [
+                make_event(number * count + i, now + timedelta(hours=i + 1, minutes=number % 60))
+                for i in range(count)
+            ]
+        self.latency = latency
+        self.round_trips = 0
+        self.version = 0
+        self.oldest_token = 0
+        self.changes: Dict[str, Any] = {}  # id -> (versão, evento), só a última mudança
+        self.transferred = 0
+        self.next_index = count
+    
+    def events(self) -> _Events:
+        return _Events(self)
+    
+    def calendarList(self) -> _CalendarList:
+        return _CalendarList(self)
+    
+    def freebusy(self) -> _FreeBusy:
+        return _FreeBusy(self)
+    
+    def charge(self, handler):
+        """Sem simulação de cota no Calendar."""
+    
+    def handle_events(self, calendarId: str = 'primary', maxResults: int = 250, pageToken: Optional[str] = None,
+                      syncToken: Optional[str] = None, timeMin: Optional[str] = None,
+                      timeMax: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        if syncToken is not None:
+            if int(syncToken) < self.oldest_token:
+                raise FakeHttpError('Sync token is no longer valid, a full sync is required.', status=410,
+                                    reason='fullSyncRequired')
+            changes = self.changes.values() if calendarId == 'primary' else ()
+            items = [event for version, event in sorted(changes, key=lambda change: change[0])
+                     if version > int(syncToken)]
+        else:
+            items = self._window(self.calendars[calendarId], timeMin, timeMax)
+        offset = int(pageToken or 0)
+        response: Dict[str, Any] = {'items': items[offset:offset + maxResults]}
+        if offset + maxResults < len(items):
+            response['nextPageToken'] = str(offset + maxResults)
+        else:
+            response['nextSyncToken'] = str(self.version)
+        self.transferred += len(response['items'])
+        return json.loads(json.dumps(response))
+    
+    def handle_calendar_list(self, pageToken: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        return {'items': [
+            {'id': calendar_id, 'summary': 'Pessoal' if calendar_id == 'primary' else calendar_id.split('@')[0],
+             'selected': True, **({'primary': True} if calendar_id == 'primary' else {})}
+            for calendar_id in self.calendars
+        ]}
+    
+    def handle_freebusy(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        calendars = {}
+        for item in body['items']:
+            if item['id'] not in self.calendars:
+                calendars[item['id']] = {'busy': [], 'errors': [{'domain': 'global', 'reason': 'notFound'}]}
+                continue
+            events = self._window(self.calendars[item['id']], body['timeMin'], body['timeMax'])
+            calendars[item['id']] = {'busy': [
+                {'start': event['start']['dateTime'], 'end': event['end']['dateTime']}
+                for event in events if event.get('transparency') != 'transparent'
+            ]}
+        return json.loads(json.dumps({'timeMin': body['timeMin'], 'timeMax': body['timeMax'],
+                                      'calendars': calendars}))
+    
+    @staticmethod
+    def _window(items: List[Dict[str, Any]], time_min: Optional[str],
+                time_max: Optional[str]) -> List[Dict[str, Any]]:
+        """Eventos que se sobrepõem a [timeMin, timeMax), como na API."""
+        low = parse_datetime(time_min) if time_min else float('-inf')
+        high = parse_datetime(time_max) if time_max else float('inf')
+        return [event for event in items if event_times(event)[0] < high and event_times(event)[1] > low]
+    
+    def _changed(self, event: Dict[str, Any]):
+        self.version += 1
+        self.changes[event['id']] = (self.version, dict(event))
+    
+    def update(self, index: int, **fields):
+        """Altera um evento (ex.: summary='Novo título')."""
+        self.items[index].update(fields)
+        self._changed(self.items[index])
+    
+    def cancel(self, index: int):
+        """Cancela um evento: some da agenda e aparece como 'cancelled' na sincronização."""
+        event = self.items.pop(index)
+        self._changed({'id': event['id'], 'status': 'cancelled'})
+    
+    def add(self, count: int = 1):
+        """Cria eventos novos depois do último."""
+        for _ in range(count):
+            event = make_event(self.next_index, self.start + timedelta(hours=len(self.items) + 1, minutes=30))
+            self.next_index += 1
+            self.items.append(event)
+            self._changed(event)
+    
+    def expire_sync_tokens(self):
+        """Invalida os syncTokens emitidos até agora (a próxima sincronização recebe 410)."""
+        self.oldest_token = self.version + 1
@@ -0,0 +1,360 @@
+"""
+Serviço falso da API do Gmail para benchmarks locais
+"""
+
+import base64
+import json
+import time
+from collections import deque
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import List, Dict, Any, Optional
+
+
+def make_reply_text(index: int, body_size: int, previous: Optional[str]) -> str:
+    """Gera o texto de uma resposta que cita a mensagem anterior, como os clientes de e-mail fazem."""
+    lines = [f"Resposta {index}, linha {n}: comentário sobre o assunto." for n in range(max(body_size // 50, 1))]
+    if previous:
+        lines.append("")
+        lines.append(f"Em seg., 13 de nov. de 2023 às 10:{index % 60:02d}, Remetente escreveu:")
+        lines.extend(f"> {line}" for line in previous.splitlines())
+    return '\n'.join(lines)
+
+
+def make_message(index: int, body_size: int = 2000, thread_id: Optional[str] = None,
+                 text: Optional[str] = None) -> Dict[str, Any]:
+    """Gera uma mensagem sintética no formato 'full' da API do Gmail."""
+    if text is None:
+        text = (f"Mensagem {index}. " * (body_size // 12 + 1))[:body_size]
+    data = base64.urlsafe_b64encode(text.encode('utf-8')).decode('ascii')
+    return {
+        'id': f'msg{index:06d}',
+        'threadId': thread_id or f'thr{index:06d}',
+        'labelIds': ['INBOX'],
+        'snippet': text[:200],
+        'historyId': str(1000 + index),
+        'internalDate': str(1700000000000 - index * 60000),
+        'payload': {
+            'mimeType': 'multipart/alternative',
+            'headers': [
+                {'name': 'Subject', 'value': f'Assunto {index}'},
+                {'name': 'From', 'value': f'Remetente {index} <r{index}@exemplo.com>'},
+                {'name': 'Date', 'value': 'Mon, 13 Nov 2023 10:00:00 -0300'},
+            ],
+            'parts': [
+                {'mimeType': 'text/plain', 'headers': [], 'body': {'size': len(text), 'data': data}},
+                {'mimeType': 'text/html', 'headers': [], 'body': {'size': len(text), 'data': data}},
+            ],
+        },
+    }
+
+
+def make_raw(msg: Dict[str, Any]) -> str:
+    """Monta a mensagem RFC 822 equivalente a uma mensagem 'full', em base64url como no formato 'raw'."""
+    mime = MIMEMultipart('alternative')
+    for header in msg['payload']['headers']:
+        mime[header['name']] = header['value']
+    for part in msg['payload']['parts']:
+        if part.get('filename'):
+            continue  # anexos ficam fora da versão raw
+        text = base64.urlsafe_b64decode(part['body']['data']).decode('utf-8')
+        mime.attach(MIMEText(text, part['mimeType'].split('/')[1], 'utf-8'))
+    return base64.urlsafe_b64encode(mime.as_bytes()).decode('ascii')
+
+
+# Charset do CSV anexado: 'Ł' vira '£' se o texto for decodificado como Windows-1252
+CSV_CHARSET = 'iso-8859-2'
+
+# Unidades de cota de cada handler, como na tabela de limites do Gmail
+HANDLER_UNITS = {
+    'handle_list': 5,
+    'handle_get': 5,
+    'handle_attachment': 5,
+    'handle_thread_list': 10,
+    'handle_thread_get': 10,
+    'handle_history': 2,
+    'handle_profile': 1,
+}
+
+
+class _FakeResponse(dict):
+    """Cabeçalhos da resposta HTTP, com o status como atributo (como httplib2.Response)."""
+    
+    def __init__(self, status: int):
+        super().__init__(status=str(status))
+        self.status = status
+
+
+class FakeHttpError(Exception):
+    """Erro simulado de uma chamada individual, com status HTTP como o HttpError."""
+    
+    def __init__(self, message: str, status: int = 404, reason: str = 'notFound'):
+        super().__init__(message)
+        self.resp = _FakeResponse(status)
+        self.content = json.dumps({'error': {'code': status, 'message': message,
+                                             'errors': [{'reason': reason}]}}).encode('utf-8')
+
+
+class FakeRequest:
+    """Requisição que simula uma ida e volta HTTP com latência fixa."""
+    
+    def __init__(self, service: 'FakeGmailService', handler, kwargs: Dict[str, Any]):
+        self.service = service
+        self.handler = handler
+        self.kwargs = kwargs
+    
+    def execute(self) -> Dict[str, Any]:
+        self.service.round_trips += 1
+        time.sleep(self.service.latency)
+        self.service.charge(self.handler)
+        return self.handler(**self.kwargs)
+
+
+class FakeBatch:
+    """Requisição em lote: uma única ida e volta para todos os itens."""
+    
+    def __init__(self, service: 'FakeGmailService', callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+    
+    def add(self, request: FakeRequest, request_id: Optional[str] = None, callback=None):
+        self.requests.append((request_id or str(len(self.requests)), request, callback or self.callback))
+    
+    def execute(self):
+        self.service.round_trips += 1
+        time.sleep(self.service.latency + self.service.batch_item_cost * len(self.requests))
+        for request_id, request, callback in self.requests:
+            try:
+                self.service.charge(request.handler)
+                response, exception = request.handler(**request.kwargs), None
+            except Exception as e:
+                response, exception = None, e
+            callback(request_id, response, exception)
+
+
+class _Messages:
+    def __init__(self, service: 'FakeGmailService'):
+        self.service = service
+    
+    def list(self, **kwargs) -> FakeRequest:
+        return FakeRequest(self.service, self.service.handle_list, kwargs)
+    
+    def get(self, **kwargs) -> FakeRequest:
+        return FakeRequest(self.service, self.service.handle_get, kwargs)
+    
+    def attachments(self) -> '_Attachments':
+        return _Attachments(self.service)
+
+
+class _Attachments:
+    def __init__(self, service: 'FakeGmailService'):
+        self.service = service
+    
+    def get(self, **kwargs) -> FakeRequest:
+        return FakeRequest(self.service, self.service.handle_attachment, kwargs)
+
+
+class _Threads:
+    def __init__(self, service: 'FakeGmailService'):
+        self.service = service
+    
+    def list(self, **kwargs) -> FakeRequest:
+        return FakeRequest(self.service, self.service.handle_thread_list, kwargs)
+    
+    def get(self, **kwargs) -> FakeRequest:
+        return FakeRequest(self.service, self.service.handle_thread_get, kwargs)
+
+
+class _History:
+    def __init__(self, service: 'FakeGmailService'):
+        self.service = service
+    
+    def list(self, **kwargs) -> FakeRequest:
+        return FakeRequest(self.service, self.service.handle_history, kwargs)
+
+
+class _Users:
+    def __init__(self, service: 'FakeGmailService'):
+        self.service = service
+    
+    def messages(self) -> _Messages:
+        return _Messages(self.service)
+    
+    def threads(self) -> _Threads:
+        return _Threads(self.service)
+    
+    def history(self) -> _History:
+        return _History(self.service)
+    
+    def getProfile(self, **kwargs) -> FakeRequest:
+        return FakeRequest(self.service, self.service.handle_profile, kwargs)
+
+
+class FakeGmailService:
+    """
+    Imitação mínima do recurso users().messages() do googleapiclient.
+    
+    Args:
+        count: Número de mensagens na caixa de entrada
+        latency: Latência simulada por ida e volta HTTP, em segundos
+        batch_item_cost: Custo adicional por item dentro de um lote, em segundos
+        failing_ids: IDs que devem falhar no GET
+        attachment_size: Se > 0, cada mensagem ganha um PDF desse tamanho e um CSV pequeno
+        units_per_second: Cota por usuário; acima dela as chamadas falham com 429 (None = sem cota)
+        first_page_size: Se definido, a primeira página da listagem traz só esses IDs
+            (o Gmail pode devolver menos que maxResults)
+    """
+    
+    def __init__(self, count: int = 100, latency: float = 0.02, batch_item_cost: float = 0.0005,
+                 failing_ids: Optional[List[str]] = None, body_size: int = 2000, thread_size: int = 1,
+                 attachment_size: int = 0, units_per_second: Optional[float] = None,
+                 first_page_size: Optional[int] = None):
+        if thread_size > 1:
+            self.messages = self._make_threads(count, body_size, thread_size)
+        else:
+            self.messages = [make_message(i, body_size) for i in range(count)]
+        self.by_id = {m['id']: m for m in self.messages}
+        self.raw_by_id: Dict[str, str] = {}
+        self.attachment_size = attachment_size
+        if attachment_size:
+            for msg in self.messages:
+                msg['payload']['parts'].extend([
+                    {'partId': '2', 'mimeType': 'application/pdf', 'filename': 'relatorio.pdf', 'headers': [],
+                     'body': {'size': attachment_size, 'attachmentId': f"pdf-{msg['id']}"}},
+                    {'partId': '3', 'mimeType': 'text/csv', 'filename': 'valores.csv',
+                     'headers': [{'name': 'Content-Type', 'value': f'text/csv; charset={CSV_CHARSET}'}],
+                     'body': {'size': len(self.csv_bytes(msg['id'])), 'attachmentId': f"csv-{msg['id']}"}},
+                ])
+        self.latency = latency
+        self.batch_item_cost = batch_item_cost
+        self.failing_ids = set(failing_ids or [])
+        self.round_trips = 0
+        self.history_id = 1000 + count
+        self.history = []
+        self.units_per_second = units_per_second
+        self.first_page_size = first_page_size
+        self.rate_limited = 0
+        self._spent = deque()
+        self._spent_units = 0
+    
+    def charge(self, handler):
+        """Cobra as unidades da chamada na janela do último segundo, ou falha com 429."""
+        if self.units_per_second is None:
+            return
+        units = HANDLER_UNITS.get(handler.__name__, 1)
+        now = time.monotonic()
+        while self._spent and now - self._spent[0][0] >= 1.0:
+            self._spent_units -= self._spent.popleft()[1]
+        if self._spent_units + units > self.units_per_second:
+            self.rate_limited += 1
+            raise FakeHttpError('User-rate limit exceeded', status=429, reason='rateLimitExceeded')
+        self._spent.append((now, units))
+        self._spent_units += units
+    
+    @staticmethod
+    def _make_threads(count: int, body_size: int, thread_size: int) -> List[Dict[str, Any]]:
+        """Gera conversas de thread_size mensagens, cada resposta citando a anterior."""
+        messages = [None] * count
+        for first in range(0, count, thread_size):
+            indexes = list(range(first, min(first + thread_size, count)))
+            previous = None
+            # A caixa de entrada lista da mais nova para a mais antiga: a conversa começa no fim
+            for index in reversed(indexes):
+                previous = make_reply_text(index, body_size, previous)
+                messages[index] = make_message(index, thread_id=f'thr{first:06d}', text=previous)
+        return messages
+    
+    def users(self) -> _Users:
+        return _Users(self)
+    
+    def new_batch_http_request(self, callback=None) -> FakeBatch:
+        return FakeBatch(self, callback)
+    
+    def handle_list(self, userId: str = 'me', maxResults: int = 100, pageToken: Optional[str] = None,
+                    **kwargs) -> Dict[str, Any]:
+        offset = int(pageToken or 0)
+        if offset == 0 and self.first_page_size is not None:
+            maxResults = min(maxResults, self.first_page_size)
+        page = self.messages[offset:offset + maxResults]
+        response = {'messages': [{'id': m['id'], 'threadId': m['threadId']} for m in page],
+                    'resultSizeEstimate': len(self.messages)}
+        if offset + maxResults < len(self.messages):
+            response['nextPageToken'] = str(offset + maxResults)
+        return response
+    
+    def handle_thread_list(self, userId: str = 'me', maxResults: int = 100, pageToken: Optional[str] = None,
+                           **kwargs) -> Dict[str, Any]:
+        thread_ids = list(dict.fromkeys(m['threadId'] for m in self.messages))
+        offset = int(pageToken or 0)
+        response = {'threads': [{'id': thread_id} for thread_id in thread_ids[offset:offset + maxResults]]}
+        if offset + maxResults < len(thread_ids):
+            response['nextPageToken'] = str(offset + maxResults)
+        return response
+    
+    def handle_thread_get(self, userId: str = 'me', id: str = '', **kwargs) -> Dict[str, Any]:
+        messages = [m for m in reversed(self.messages) if m['threadId'] == id]
+        if not messages:
+            raise FakeHttpError(f'Conversa {id} indisponível')
+        return json.loads(json.dumps({'id': id, 'messages': messages}))
+    
+    @staticmethod
+    def csv_bytes(message_id: str) -> bytes:
+        rows = ['período;valor;filial'] + [f'{month:02d};{month * 1000};Łódź' for month in range(1, 13)]
+        return (f'# {message_id}\n' + '\n'.join(rows)).encode(CSV_CHARSET)
+    
+    def handle_attachment(self, userId: str = 'me', messageId: str = '', id: str = '', **kwargs) -> Dict[str, Any]:
+        if messageId not in self.by_id:
+            raise FakeHttpError(f'Mensagem {messageId} indisponível')
+        if id.startswith('csv-'):
+            data = self.csv_bytes(messageId)
+            return {'size': len(data), 'data': base64.urlsafe_b64encode(data).decode('ascii')}
+        # O PDF é gerado uma vez: a resposta já existe, como se tivesse vindo da rede
+        if id not in self.raw_by_id:
+            data = b'%PDF-1.4 ' + bytes(range(256)) * (self.attachment_size // 256 + 1)
+            self.raw_by_id[id] = base64.urlsafe_b64encode(data[:self.attachment_size]).decode('ascii')
+        return {'size': self.attachment_size, 'data': self.raw_by_id[id]}
+    
+    def handle_profile(self, userId: str = 'me', **kwargs) -> Dict[str, Any]:
+        return {'emailAddress': 'eu@exemplo.com', 'historyId': str(self.history_id)}
+    
+    def handle_history(self, userId: str = 'me', startHistoryId: str = '0', **kwargs) -> Dict[str, Any]:
+        records = [h for h in self.history if int(h['id']) > int(startHistoryId)]
+        return {'history': records, 'historyId': str(self.history_id)}
+    
+    def receive(self, count: int = 1):
+        """Simula a chegada de novas mensagens no topo da caixa de entrada."""
+        for _ in range(count):
+            msg = make_message(len(self.by_id))
+            self.messages.insert(0, msg)
+            self.by_id[msg['id']] = msg
+            self.history_id += 1
+            self.history.append({'id': str(self.history_id),
+                                 'messagesAdded': [{'message': {'id': msg['id'], 'labelIds': ['INBOX']}}]})
+    
+    def archive(self, message_id: str):
+        """Simula o arquivamento (remoção do rótulo INBOX) de uma mensagem."""
+        msg = self.by_id[message_id]
+        msg['labelIds'] = [label for label in msg['labelIds'] if label != 'INBOX']
+        self.messages.remove(msg)
+        self.history_id += 1
+        self.history.append({'id': str(self.history_id),
+                             'labelsRemoved': [{'message': {'id': message_id}, 'labelIds': ['INBOX']}]})
+    
+    def handle_get(self, userId: str = 'me', id: str = '', format: str = 'full',
+                   metadataHeaders: Optional[List[str]] = None, **kwargs) -> Dict[str, Any]:
+        if id in self.failing_ids or id not in self.by_id:
+            raise FakeHttpError(f'Mensagem {id} indisponível')
+        msg = self.by_id[id]
+        if format == 'metadata':
+            wanted = set(metadataHeaders or [])
+            headers = [h for h in msg['payload']['headers'] if not wanted or h['name'] in wanted]
+            msg = {key: msg[key] for key in ('id', 'threadId', 'labelIds', 'snippet', 'internalDate', 'historyId')}
+            msg['payload'] = {'headers': headers}
+        elif format == 'raw':
+            if id not in self.raw_by_id:
+                self.raw_by_id[id] = make_raw(msg)
+            msg = {key: msg[key] for key in ('id', 'threadId', 'labelIds', 'snippet', 'internalDate', 'historyId')}
+            msg['raw'] = self.raw_by_id[id]
+        # Simula a decodificação do JSON da resposta, como faz o googleapiclient
+        return json.loads(json.dumps(msg))
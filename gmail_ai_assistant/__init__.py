@@ -2,11 +2,36 @@
 Gmail AI Assistant - Assistente de IA para Gmail e Google Calendar
 """
 
+import importlib
+from typing import TYPE_CHECKING
+
 __version__ = "1.0.0"
 __author__ = "Seu Nome"
 __email__ = "seu.email@exemplo.com"
 
-from .agent import GmailAIAgent
-from .tools import GmailTool, CalendarTool
+__all__ = ["GmailAIAgent", "GmailTool", "CalendarTool"]
+
+# Importados só no primeiro acesso (PEP 562): o agente puxa Gemini, OAuth e
+# googleapiclient, que custam mais de um segundo e não são usados por --help
+_LAZY = {
+    "GmailAIAgent": ".agent",
+    "GmailTool": ".tools",
+    "CalendarTool": ".tools",
+}
+
+if TYPE_CHECKING:
+    from .agent import GmailAIAgent
+    from .tools import GmailTool, CalendarTool
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
 
-__all__ = ["GmailAIAgent", "GmailTool", "CalendarTool"] 
\ No newline at end of file
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,277 @@
+"""
+Várias caixas de e-mail numa implantação: registro de contas e agendador que
+distribui as etapas de Gmail e Calendar de cada conta num pool de processos
+"""
+
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from .auth import CredentialProvider
+from .discovery import build_service
+from .quota import shared_limiter
+from .records import Record
+from .tools import CalendarTool, GmailTool
+
+
+# Etapas executadas para cada conta, cada uma num processo do pool
+STAGES = ('gmail', 'calendar')
+
+# Etapas da mesma conta rodando ao mesmo tempo. A cota do Gmail é por usuário:
+# mais processos na mesma conta só trocam vazão por erros 429
+DEFAULT_ACCOUNT_CONCURRENCY = 1
+
+API_VERSIONS = {'gmail': 'v1', 'calendar': 'v3'}
+
+
+class Account:
+    """Uma caixa de e-mail: nome, token e o que ler dela."""
+    
+    __slots__ = ('name', 'token_file', 'credentials_file', 'max_emails', 'max_events', 'query', 'workers',
+                 'max_concurrency')
+    
+    def __init__(self, name: str, token_file: str, credentials_file: str = 'credentials.json',
+                 max_emails: int = 50, max_events: int = 10, query: Optional[str] = None, workers: int = 1,
+                 max_concurrency: int = DEFAULT_ACCOUNT_CONCURRENCY):
+        """
+        Args:
+            name: Nome único da conta no registro
+            token_file: Arquivo JSON do token da conta
+            credentials_file: Arquivo credentials.json usado para autorizar a conta
+            max_emails: E-mails lidos por execução
+            max_events: Eventos lidos por execução
+            query: Busca na sintaxe do Gmail aplicada à leitura
+            workers: Threads do GmailTool dentro do processo da conta
+            max_concurrency: Etapas desta conta rodando ao mesmo tempo no pool
+        """
+        self.name = name
+        self.token_file = token_file
+        self.credentials_file = credentials_file
+        self.max_emails = max_emails
+        self.max_events = max_events
+        self.query = query
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: getattr(self, key) for key in self.__slots__}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Account':
+        return cls(**data)
+    
+    def __repr__(self) -> str:
+        return f'Account({self.name!r}, token_file={self.token_file!r})'
+
+
+class AccountRegistry:
+    """Contas da implantação, guardadas num arquivo JSON."""
+    
+    def __init__(self, accounts: Iterable[Account] = ()):
+        self._accounts: Dict[str, Account] = {}
+        for account in accounts:
+            self.add(account)
+    
+    @classmethod
+    def load(cls, path: str) -> 'AccountRegistry':
+        """Lê o registro; um arquivo inexistente é um registro vazio."""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding='utf-8') as f:
+            return cls(Account.from_dict(data) for data in json.load(f)['accounts'])
+    
+    def save(self, path: str):
+        """Grava o registro de forma atômica."""
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'accounts': [account.to_dict() for account in self]}, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, path)
+    
+    def add(self, account: Account):
+        if account.name in self._accounts:
+            raise ValueError(f"Conta já registrada: {account.name}")
+        self._accounts[account.name] = account
+    
+    def remove(self, name: str):
+        del self._accounts[name]
+    
+    def get(self, name: str) -> Account:
+        return self._accounts[name]
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self._accounts
+    
+    def __iter__(self) -> Iterator[Account]:
+        return iter(self._accounts.values())
+    
+    def __len__(self) -> int:
+        return len(self._accounts)
+
+
+# Um provedor por conta em cada processo do pool, reaproveitado entre etapas
+_providers: Dict[str, CredentialProvider] = {}
+
+
+def google_service(account: Account, api: str):
+    """Constrói o serviço da API para a conta (o token é renovado sob a trava do store)."""
+    from .agent import SCOPES
+    
+    provider = _providers.get(account.name)
+    if provider is None or provider.token_file != account.token_file:
+        provider = _providers[account.name] = CredentialProvider(account.token_file, account.credentials_file,
+                                                                 list(SCOPES))
+    # Num processo do pool não há como abrir o navegador: a conta precisa estar autorizada
+    creds = None if not os.path.exists(account.token_file) else provider.get(interactive=False)
+    if creds is None:
+        raise RuntimeError(f"Conta não autorizada: use 'gmail-assistant accounts add {account.name}'")
+    return build_service(api, API_VERSIONS[api], credentials=creds)
+
+
+def run_stage(account_data: Dict[str, Any], stage: str, services: Callable[[Account, str], Any],
+              include_body: bool = False) -> Dict[str, Any]:
+    """
+    Executa uma etapa de uma conta; roda dentro de um processo do pool.
+    
+    Retorna {'account', 'stage', 'items', 'elapsed', 'error'}, com os registros
+    já convertidos em dicts para voltarem ao processo principal.
+    """
+    account = Account.from_dict(account_data)
+    start = time.perf_counter()
+    try:
+        if stage == 'gmail':
+            factory = (lambda: services(account, 'gmail')) if account.workers > 1 else None
+            tool = GmailTool(services(account, 'gmail'), workers=account.workers, service_factory=factory,
+                             limiter=shared_limiter('gmail', account.name))
+            try:
+                items = tool.execute(max_results=account.max_emails, format='full' if include_body else 'metadata',
+                                     query=account.query)
+            finally:
+                tool.close()
+        elif stage == 'calendar':
+            tool = CalendarTool(services(account, 'calendar'), limiter=shared_limiter('calendar', account.name))
+            items = tool.execute(max_results=account.max_events)
+        else:
+            raise ValueError(f"Etapa desconhecida: {stage}")
+        items = [item.to_dict() if isinstance(item, Record) else item for item in items]
+        error = None
+    except Exception as e:
+        items, error = [], str(e)
+    return {'account': account.name, 'stage': stage, 'items': items,
+            'elapsed': time.perf_counter() - start, 'error': error}
+
+
+class ThroughputReport:
+    """Resultado de uma execução do agendador, com a vazão combinada."""
+    
+    def __init__(self, results: List[Dict[str, Any]], elapsed: float, processes: int):
+        self.results = results
+        self.elapsed = elapsed
+        self.processes = processes
+    
+    def _items(self, stage: str) -> Iterator[Dict[str, Any]]:
+        for result in self.results:
+            if result['stage'] == stage:
+                yield from (item for item in result['items'] if 'error' not in item)
+    
+    @property
+    def accounts(self) -> int:
+        return len({result['account'] for result in self.results})
+    
+    @property
+    def messages(self) -> int:
+        return sum(1 for _ in self._items('gmail'))
+    
+    @property
+    def events(self) -> int:
+        return sum(1 for _ in self._items('calendar'))
+    
+    @property
+    def errors(self) -> List[str]:
+        """Falhas de etapas inteiras e de itens, prefixadas pela conta."""
+        errors = []
+        for result in self.results:
+            if result['error']:
+                errors.append(f"{result['account']} ({result['stage']}): {result['error']}")
+            errors.extend(f"{result['account']} ({result['stage']}): {item['error']}"
+                          for item in result['items'] if 'error' in item)
+        return errors
+    
+    @property
+    def accounts_per_minute(self) -> float:
+        return self.accounts / self.elapsed * 60 if self.elapsed else 0.0
+    
+    @property
+    def messages_per_second(self) -> float:
+        return self.messages / self.elapsed if self.elapsed else 0.0
+    
+    def by_account(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Resultados agrupados: {conta: {etapa: resultado}}."""
+        grouped: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for result in self.results:
+            grouped.setdefault(result['account'], {})[result['stage']] = result
+        return grouped
+    
+    def summary(self) -> str:
+        return (f"{self.accounts} contas, {self.messages} e-mails e {self.events} eventos em "
+                f"{self.elapsed:.1f} s com {self.processes} processos: "
+                f"{self.accounts_per_minute:.1f} contas/min, {self.messages_per_second:.1f} e-mails/s")
+
+
+class AccountScheduler:
+    """
+    Distribui as etapas (STAGES) de todas as contas num pool de processos.
+    
+    Cada etapa é um fragmento independente: o processo constrói seu próprio
+    serviço e reaproveita GmailTool/CalendarTool. Uma conta nunca tem mais
+    etapas rodando do que seu max_concurrency, para não estourar a cota por
+    usuário; enquanto isso os processos livres atendem as outras contas.
+    """
+    
+    def __init__(self, registry: AccountRegistry, processes: int = 4,
+                 services: Callable[[Account, str], Any] = google_service, stages=STAGES,
+                 include_body: bool = False):
+        """
+        Args:
+            registry: Contas a processar
+            processes: Tamanho do pool de processos
+            services: Função (conta, api) -> serviço, chamada dentro do processo;
+                precisa ser importável (definida no nível do módulo)
+            stages: Etapas executadas para cada conta
+            include_body: Lê o corpo dos e-mails (format='full') em vez de só os cabeçalhos
+        """
+        self.registry = registry
+        self.processes = processes
+        self.services = services
+        self.stages = tuple(stages)
+        self.include_body = include_body
+    
+    def run(self, on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> ThroughputReport:
+        """Executa todas as etapas e retorna o relatório; on_result recebe cada etapa concluída."""
+        # Intercala as contas: a primeira etapa de cada conta sai antes da segunda de qualquer uma
+        pending = [(account, stage) for stage in self.stages for account in self.registry]
+        running: Dict[str, int] = {}
+        results = []
+        start = time.perf_counter()
+        with ProcessPoolExecutor(self.processes) as pool:
+            futures = {}
+            while pending or futures:
+                for shard in list(pending):
+                    if len(futures) >= self.processes:
+                        break
+                    account, stage = shard
+                    if running.get(account.name, 0) >= max(account.max_concurrency, 1):
+                        continue
+                    pending.remove(shard)
+                    running[account.name] = running.get(account.name, 0) + 1
+                    future = pool.submit(run_stage, account.to_dict(), stage, self.services, self.include_body)
+                    futures[future] = account.name
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    running[futures.pop(future)] -= 1
+                    result = future.result()
+                    results.append(result)
+                    if on_result is not None:
+                        on_result(result)
+        return ThroughputReport(results, time.perf_counter() - start, self.processes)
@@ -2,90 +2,154 @@
 Agente principal para Gmail e Google Calendar
 """
 
+import math
 import os
-import pickle
-from typing import List, Dict, Any
-import google.generativeai as genai
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
+import time
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Sequence, Tuple, Union
 
+# O Gemini é importado só quando há chave (custa mais de um segundo); o fluxo
+# OAuth e o transporte HTTP ficam em auth.py, também importados sob demanda
+from .auth import CredentialProvider, CredentialStore
+from .availability import Availability, WorkingHours
+from .cache import EventCache, MessageCache
+from .discovery import LazyService, build_service
+from .event_time import check_zone, get_zone
 from .tools import GmailTool, CalendarTool
 
+if TYPE_CHECKING:
+    from .analytics import CalendarStats
+
+
+# Escopos pedidos na autorização (leitura do Gmail e do Calendar)
+SCOPES = (
+    'https://www.googleapis.com/auth/gmail.readonly',
+    'https://www.googleapis.com/auth/calendar.readonly',
+)
+
+# O prompt usa só o início de cada corpo; não vale decodificar e-mails enormes inteiros
+DEFAULT_BODY_BYTES = 16 * 1024
+
+# Trecho lido de anexos de texto pequenos (CSV, TXT...) para o prompt
+DEFAULT_ATTACHMENT_TEXT_BYTES = 2 * 1024
+
 
 class GmailAIAgent:
     """Agente de IA para Gmail e Google Calendar."""
     
     def __init__(self, credentials_file: str = "credentials.json", token_file: str = "token.json", 
-                 gemini_api_key: str = None):
+                 gemini_api_key: str = None, batch_size: int = 50, workers: int = 1,
+                 cache_file: Optional[str] = None, body_bytes: Optional[int] = DEFAULT_BODY_BYTES,
+                 reduce_bodies: bool = True, engine: str = 'json',
+                 attachment_text_bytes: Optional[int] = DEFAULT_ATTACHMENT_TEXT_BYTES,
+                 credential_store: Optional[CredentialStore] = None,
+                 calendars: Union[str, Sequence[str]] = 'primary', calendar_workers: int = 4,
+                 tz: Optional[str] = None):
         """
         Inicializa o agente.
         
         Args:
             credentials_file: Caminho para o arquivo credentials.json
-            token_file: Caminho para salvar o token de autenticação
+            token_file: Caminho para salvar o token de autenticação (JSON)
             gemini_api_key: Chave da API do Gemini (opcional, pode usar variável de ambiente)
+            batch_size: Mensagens por requisição em lote do Gmail (1 desativa o lote)
+            workers: Threads para buscar e-mails em paralelo (cada uma com seu próprio serviço)
+            cache_file: Arquivo SQLite para o cache local de mensagens e eventos (None desativa o cache)
+            body_bytes: Máximo de bytes do corpo decodificados por e-mail (None = corpo inteiro)
+            reduce_bodies: Remove citações, assinaturas e avisos legais antes de truncar
+                o corpo, para o prompt levar mais conteúdo novo
+            engine: Motor de extração do corpo: 'json' (payload da API) ou 'raw'
+                (mensagem RFC 822); ver benchmarks/bench_engines.py
+            attachment_text_bytes: Máximo de bytes lidos de cada anexo de texto
+                pequeno (None = só nome, tipo e tamanho dos anexos)
+            credential_store: Onde o token é lido e salvo; token_file é a conta
+                nele (padrão: um arquivo JSON compartilhado pelo processo)
+            calendars: Agendas lidas: 'primary', 'selected' (as marcadas na lista
+                de agendas), 'all' ou uma lista de IDs
+            calendar_workers: Agendas lidas em paralelo (cada thread com seu próprio serviço)
+            tz: Fuso do usuário, nome IANA como 'America/Sao_Paulo' (None = o fuso local)
         """
         self.credentials_file = credentials_file
         self.token_file = token_file
         self.gemini_api_key = gemini_api_key or os.getenv('GEMINI_API_KEY')
+        self.batch_size = batch_size
+        self.workers = workers
+        self.cache = MessageCache(cache_file) if cache_file else None
+        self.event_cache = EventCache(cache_file) if cache_file else None
+        self.body_bytes = body_bytes
+        self.reduce_bodies = reduce_bodies
+        self.engine = engine
+        self.attachment_text_bytes = attachment_text_bytes
+        self.tz = check_zone(tz)
         
         # Escopos necessários
-        self.scopes = [
-            'https://www.googleapis.com/auth/gmail.readonly',
-            'https://www.googleapis.com/auth/calendar.readonly',
-        ]
+        self.scopes = list(SCOPES)
         
         # Configurar Gemini
         if self.gemini_api_key:
+            import google.generativeai as genai
+            
             genai.configure(api_key=self.gemini_api_key)
             self.model = genai.GenerativeModel('gemini-1.5-pro')
         else:
             self.model = None
         
-        # Inicializar serviços
-        self.gmail_service = None
-        self.calendar_service = None
-        self.gmail_tool = None
-        self.calendar_tool = None
-        
-        # Autenticar
-        self._authenticate()
-    
-    def _authenticate(self):
-        """Autentica com o Google."""
-        creds = None
-        if os.path.exists(self.token_file):
-            with open(self.token_file, 'rb') as token:
-                creds = pickle.load(token)
-        
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-            else:
-                flow = InstalledAppFlow.from_client_secrets_file(self.credentials_file, self.scopes)
-                creds = flow.run_local_server(port=0)
-            
-            with open(self.token_file, 'wb') as token:
-                pickle.dump(creds, token)
-        
-        # Criar serviços
-        self.gmail_service = build('gmail', 'v1', credentials=creds)
-        self.calendar_service = build('calendar', 'v3', credentials=creds)
+        # Nada é autenticado nem construído aqui: as credenciais são carregadas
+        # em segundo plano e cada serviço só é montado no primeiro uso
+        self.credentials = CredentialProvider(token_file, credentials_file, self.scopes,
+                                              store=credential_store)
+        self.credentials.prefetch()
+        self.gmail_service = LazyService(lambda: self._build_service('gmail', 'v1'))
+        self.calendar_service = LazyService(lambda: self._build_service('calendar', 'v3'))
         
         # Criar ferramentas
-        self.gmail_tool = GmailTool(self.gmail_service)
-        self.calendar_tool = CalendarTool(self.calendar_service)
+        # httplib2 não é thread-safe: cada worker constrói seu próprio serviço
+        self.gmail_tool = GmailTool(
+            self.gmail_service,
+            batch_size=self.batch_size,
+            workers=self.workers,
+            service_factory=lambda: self._build_service('gmail', 'v1'),
+            cache=self.cache,
+            body_bytes=self.body_bytes,
+            reduce_bodies=self.reduce_bodies,
+            engine=self.engine,
+            attachment_text_bytes=self.attachment_text_bytes
+        )
+        self.calendar_tool = CalendarTool(
+            self.calendar_service,
+            cache=self.event_cache,
+            calendars=calendars,
+            workers=calendar_workers,
+            service_factory=lambda: self._build_service('calendar', 'v3'),
+            tz=tz
+        )
+        self.availability = Availability(self.calendar_tool)
+    
+    def _build_service(self, api: str, version: str):
+        """Constrói um serviço com as credenciais, autenticando na primeira vez."""
+        return build_service(api, version, credentials=self.credentials.get())
+    
+    def close(self):
+        """Encerra a renovação do token em segundo plano e os workers das ferramentas."""
+        self.credentials.close()
+        self.gmail_tool.close()
+        self.calendar_tool.close()
     
-    def run(self, prompt: str, max_emails: int = 3, max_events: int = 3) -> str:
+    def run(self, prompt: str, max_emails: int = 3, max_events: int = 3, threads: bool = False,
+            event_stats: Optional['CalendarStats'] = None, **email_filters) -> str:
         """
         Executa o agente com um prompt.
         
         Args:
             prompt: Prompt para o agente
-            max_emails: Número máximo de e-mails para ler
+            max_emails: Número máximo de e-mails (ou conversas, com threads=True) para ler
             max_events: Número máximo de eventos para ler
-            
+            threads: Agrupa as mensagens por conversa, sem o histórico citado
+            event_stats: Agregados da agenda (calendar_stats) enviados no lugar dos
+                eventos; com eles, nenhum evento é lido
+            **email_filters: Filtros aplicados pelo Gmail (query, label_ids, after,
+                before, include_spam_trash), como em GmailTool.execute
+        
         Returns:
             Resposta do agente
         """
@@ -94,24 +158,45 @@ class GmailAIAgent:
         
         try:
             # Coletar dados das ferramentas
-            emails = self.gmail_tool.execute(max_results=max_emails)
-            events = self.calendar_tool.execute(max_results=max_events)
+            if threads:
+                emails = self.gmail_tool.execute_threads(max_results=max_emails, **email_filters)
+            else:
+                emails = self.gmail_tool.execute(max_results=max_emails, **email_filters)
+            events = self.calendar_tool.execute(max_results=max_events) if event_stats is None else []
             
             # Preparar detalhes dos e-mails
             email_details = ""
             if emails:
                 email_details = "\nDetalhes dos e-mails:\n"
                 for i, email in enumerate(emails, 1):
+                    if 'error' in email:
+                        email_details += f"\n{i}. (Não foi possível ler: {email['error']})\n"
+                        continue
+                    # Conversas já vêm sem repetições: cada mensagem ganha seu próprio trecho
+                    message_count = email.get('message_count', 1)
                     email_details += f"\n{i}. Assunto: {email['subject']}\n"
                     email_details += f"   De: {email['from']}\n"
-                    email_details += f"   Conteúdo: {email['body'][:200]}...\n"
+                    if message_count > 1:
+                        email_details += f"   Mensagens na conversa: {message_count}\n"
+                    email_details += f"   Conteúdo: {email['body'][:200 * min(message_count, 5)]}...\n"
+                    for attachment in email.get('attachments', ()):
+                        email_details += f"   Anexo: {attachment['filename']} ({attachment['mime_type']}, " \
+                                         f"{attachment['size']} bytes)\n"
+                        if attachment.get('text'):
+                            email_details += f"   Trecho do anexo: {attachment['text'][:300]}...\n"
             
             # Preparar detalhes dos eventos
             event_details = ""
-            if events:
+            if event_stats is not None:
+                event_details = "\nResumo da agenda (calculado localmente):\n" + event_stats.summary() + "\n"
+            elif events:
                 event_details = "\nPróximos eventos:\n"
                 for i, event in enumerate(events, 1):
-                    event_details += f"\n{i}. {event['summary']} - {event['time']}\n"
+                    if 'error' in event:
+                        event_details += f"\n{i}. (Não foi possível ler: {event['error']})\n"
+                        continue
+                    calendar = f" [{event['calendar']}]" if 'calendar' in event else ''
+                    event_details += f"\n{i}. {event['summary']} - {event['time']}{calendar}\n"
                     if event.get('description'):
                         event_details += f"   Descrição: {event['description'][:100]}...\n"
             
@@ -120,8 +205,8 @@ class GmailAIAgent:
             {prompt}
             
             Dados disponíveis:
-            - E-mails: {len(emails)} mensagens
-            - Eventos: {len(events)} eventos
+            - E-mails: {len(emails)} {'conversas' if threads else 'mensagens'}
+            - Eventos: {'resumo da agenda' if event_stats is not None else f'{len(events)} eventos'}
             {email_details}
             {event_details}
             
@@ -133,10 +218,76 @@ class GmailAIAgent:
         except Exception as e:
             return f"Erro ao executar agente: {str(e)}"
     
-    def get_emails(self, max_results: int = 5) -> List[Dict[str, Any]]:
-        """Retorna os e-mails mais recentes."""
-        return self.gmail_tool.execute(max_results=max_results)
+    def get_emails(self, max_results: int = 5, include_body: bool = True, **email_filters) -> List[Dict[str, Any]]:
+        """
+        Retorna os e-mails mais recentes.
+        
+        Com include_body=False só os cabeçalhos e o snippet são buscados
+        (format='metadata'); use gmail_tool.load_bodies para carregar o corpo depois.
+        Os filtros (query, label_ids, after, before, include_spam_trash) são
+        repassados a GmailTool.execute.
+        """
+        return self.gmail_tool.execute(
+            max_results=max_results,
+            format='full' if include_body else 'metadata',
+            **email_filters
+        )
+    
+    def get_threads(self, max_results: int = 5, **email_filters) -> List[Dict[str, Any]]:
+        """Retorna as conversas mais recentes, uma por registro (ver GmailTool.execute_threads)."""
+        return self.gmail_tool.execute_threads(max_results=max_results, **email_filters)
     
     def get_events(self, max_results: int = 5) -> List[Dict[str, Any]]:
         """Retorna os próximos eventos."""
-        return self.calendar_tool.execute(max_results=max_results) 
\ No newline at end of file
+        return self.calendar_tool.execute(max_results=max_results)
+    
+    def calendar_stats(self, days: int = 90, ahead: bool = False, working_hours: Optional[WorkingHours] = None,
+                       focus_minutes: float = 120, gap_minutes: float = 5, top: int = 5) -> 'CalendarStats':
+        """
+        Carga de reuniões, sequências, fragmentação e foco das agendas, com NumPy (sem o Gemini).
+        
+        Args:
+            days: Dias analisados, até agora (ou a partir de agora, com ahead=True)
+            ahead: Analisa os próximos dias em vez dos últimos
+            working_hours: Expediente (None = 9h às 18h de segunda a sexta, no fuso do usuário)
+            focus_minutes: Menor bloco livre no expediente que conta como foco
+            gap_minutes: Maior intervalo entre reuniões de uma mesma sequência
+            top: Organizadores listados
+        
+        Returns:
+            CalendarStats; passe-o a run(event_stats=...) para o Gemini ver os agregados
+        """
+        from .analytics import EventColumns, calendar_stats
+        
+        now = time.time()
+        start, end = (now, now + days * 86400) if ahead else (now - days * 86400, now)
+        events = self.calendar_tool.events_by_calendar(datetime.fromtimestamp(start, timezone.utc),
+                                                       datetime.fromtimestamp(end, timezone.utc))
+        return calendar_stats(EventColumns.from_calendars(events, self.tz), start, end, self.tz,
+                              working_hours, focus_minutes, gap_minutes, top)
+    
+    def find_free_slots(self, duration_minutes: int = 30, days: int = 7, attendees: Sequence[str] = ('primary',),
+                        working_hours: Optional[WorkingHours] = None) -> List[Tuple[datetime, datetime]]:
+        """
+        Horários livres em comum nos próximos dias, calculados localmente (sem o Gemini).
+        
+        Args:
+            duration_minutes: Duração mínima de cada horário
+            days: Dias à frente considerados
+            attendees: Agendas ou e-mails dos participantes ('primary' = você)
+            working_hours: Expediente, ex.: WorkingHours() para 9h às 18h de segunda
+                a sexta (None = o dia inteiro)
+        
+        Returns:
+            (início, fim) de cada horário livre, no fuso do expediente (ou no do usuário)
+        """
+        # Começa no próximo quarto de hora, como uma pessoa marcaria
+        start = math.ceil(time.time() / 900) * 900
+        end = start + days * 86400
+        slots = self.availability.free_slots(start, end, duration_minutes * 60, attendees, working_hours)
+        tz = working_hours.tz if working_hours is not None else get_zone(self.tz)
+        if tz is None:
+            # astimezone() em cada horário dá o deslocamento local daquela data
+            return [(datetime.fromtimestamp(a).astimezone(), datetime.fromtimestamp(b).astimezone())
+                    for a, b in slots]
+        return [(datetime.fromtimestamp(a, tz), datetime.fromtimestamp(b, tz)) for a, b in slots] 
\ No newline at end of file
@@ -0,0 +1,279 @@
+"""
+Análise da agenda com NumPy: carga de reuniões, sequências sem intervalo,
+fragmentação e tempo de foco, calculados localmente sobre colunas de eventos
+"""
+
+from array import array
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from .availability import WorkingHours
+from .event_time import date_epoch, get_zone, parse_datetime
+
+try:
+    import numpy as np
+except ImportError as e:  # extra opcional
+    raise ImportError("A análise da agenda precisa do NumPy: pip install 'gmail-ai-assistant[analytics]'") from e
+
+HOUR = 3600.0
+WEEKDAYS = ('seg', 'ter', 'qua', 'qui', 'sex', 'sáb', 'dom')
+
+
+class EventColumns:
+    """
+    Eventos em colunas NumPy, uma posição por evento.
+    
+    As colunas são montadas em arrays compactos e lidas sem cópia (np.frombuffer);
+    agendas e organizadores viram códigos inteiros, com os nomes em calendars
+    e organizers. Cancelados ficam de fora, e um convite que aparece em várias
+    agendas conta uma vez (na primeira).
+    """
+    
+    __slots__ = ('start', 'end', 'all_day', 'busy', 'attendees', 'calendar', 'organizer',
+                 'calendars', 'organizers')
+    
+    def __init__(self, start: 'np.ndarray', end: 'np.ndarray', all_day: 'np.ndarray', busy: 'np.ndarray',
+                 attendees: 'np.ndarray', calendar: 'np.ndarray', organizer: 'np.ndarray',
+                 calendars: List[str], organizers: List[str]):
+        self.start = start
+        self.end = end
+        self.all_day = all_day
+        self.busy = busy
+        self.attendees = attendees
+        self.calendar = calendar
+        self.organizer = organizer
+        self.calendars = calendars
+        self.organizers = organizers
+    
+    @classmethod
+    def from_calendars(cls, events_by_calendar: Dict[str, List[Dict[str, Any]]],
+                       zone: Optional[str] = None) -> 'EventColumns':
+        """
+        Colunas dos eventos de CalendarTool.events_by_calendar.
+        
+        Args:
+            events_by_calendar: {agenda: eventos no formato da API}
+            zone: Fuso do usuário, onde caem os eventos de dia inteiro (None = local)
+        """
+        starts, ends, all_day, busy = array('d'), array('d'), array('b'), array('b')
+        attendees, calendar, organizer = array('i'), array('i'), array('i')
+        organizers: Dict[str, int] = {}
+        seen = set()
+        # Reuniões começam e terminam quase sempre nas mesmas horas cheias e meias:
+        # cada texto com deslocamento é interpretado uma vez
+        parsed: Dict[str, float] = {}
+        
+        def epoch(value: Dict[str, str]) -> float:
+            text = value.get('dateTime')
+            if text is None:
+                return date_epoch(value['date'], zone)
+            result = parsed.get(text)
+            if result is None:
+                result = parse_datetime(text, value.get('timeZone'))
+                if text[-1] == 'Z' or text[-6] in '+-':
+                    parsed[text] = result
+            return result
+        
+        for code, events in enumerate(events_by_calendar.values()):
+            for event in events:
+                if event.get('status') == 'cancelled':
+                    continue
+                start = event['start']
+                uid = event.get('iCalUID')
+                if uid is not None:
+                    key = (uid, start.get('dateTime') or start.get('date'))
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                starts.append(epoch(start))
+                ends.append(epoch(event['end']))
+                all_day.append('dateTime' not in start)
+                # Recusado ou marcado como "disponível": o evento não ocupa a agenda
+                declined = False
+                guests = event.get('attendees', ())
+                for guest in guests:
+                    if guest.get('self'):
+                        declined = guest.get('responseStatus') == 'declined'
+                        break
+                busy.append(not declined and event.get('transparency') != 'transparent')
+                attendees.append(len(guests))
+                calendar.append(code)
+                email = event.get('organizer', {}).get('email', '')
+                organizer.append(organizers.setdefault(email, len(organizers)))
+        
+        return cls(
+            start=np.frombuffer(starts, np.float64),
+            end=np.frombuffer(ends, np.float64),
+            all_day=np.frombuffer(all_day, np.int8).view(bool),
+            busy=np.frombuffer(busy, np.int8).view(bool),
+            attendees=np.frombuffer(attendees, np.intc),
+            calendar=np.frombuffer(calendar, np.intc),
+            organizer=np.frombuffer(organizer, np.intc),
+            calendars=list(events_by_calendar),
+            organizers=list(organizers),
+        )
+    
+    def __len__(self) -> int:
+        return len(self.start)
+
+
+class CalendarStats:
+    """
+    Agregados de uma janela da agenda, calculados por calendar_stats.
+    
+    Horas em float; weekly é [(segunda-feira, horas)], by_weekday tem 7 valores
+    (segunda primeiro), organizers e calendars são [(nome, reuniões, horas)].
+    summary() é o texto enviado ao Gemini no lugar dos eventos.
+    """
+    
+    __slots__ = ('start', 'end', 'meetings', 'meeting_hours', 'busy_hours', 'weekly', 'by_weekday',
+                 'chains', 'chained_meetings', 'longest_chain', 'longest_chain_hours', 'gap_minutes',
+                 'free_hours', 'focus_hours', 'focus_minutes', 'fragmentation', 'organizers', 'calendars')
+    
+    def __init__(self, **values: Any):
+        for name in self.__slots__:
+            setattr(self, name, values[name])
+    
+    def as_dict(self) -> Dict[str, Any]:
+        """Os agregados como dicionário serializável em JSON (datas em ISO 8601)."""
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values['start'] = self.start.isoformat()
+        values['end'] = self.end.isoformat()
+        values['weekly'] = [(monday.isoformat(), hours) for monday, hours in self.weekly]
+        return values
+    
+    def summary(self) -> str:
+        """Resumo em texto, compacto o bastante para um prompt."""
+        lines = [f"Agenda de {self.start:%d/%m/%Y} a {self.end:%d/%m/%Y}:"]
+        if not self.meetings:
+            lines.append("- Nenhuma reunião no período")
+        else:
+            lines.append(f"- {self.meetings} reuniões, {self.meeting_hours:.1f} h "
+                         f"(ocupado {self.busy_hours:.1f} h; média de "
+                         f"{self.meeting_hours * 60 / self.meetings:.0f} min por reunião)")
+            peak_monday, peak_hours = max(self.weekly, key=lambda week: week[1])
+            average = sum(hours for _, hours in self.weekly) / len(self.weekly)
+            lines.append(f"- Por semana: média de {average:.1f} h, pico de {peak_hours:.1f} h "
+                         f"(semana de {peak_monday:%d/%m})")
+            busiest = sorted(range(7), key=lambda day: -self.by_weekday[day])[:3]
+            lines.append("- Dias mais carregados: " + ', '.join(
+                f"{WEEKDAYS[day]} {self.by_weekday[day]:.1f} h" for day in busiest if self.by_weekday[day]
+            ))
+            lines.append(f"- Reuniões em sequência (intervalo de até {self.gap_minutes:g} min): {self.chains} "
+                         f"sequência(s) com {self.chained_meetings} reuniões; a maior com {self.longest_chain} "
+                         f"reuniões, {self.longest_chain_hours:.1f} h")
+        lines.append(f"- Expediente livre: {self.free_hours:.1f} h; foco (blocos de {self.focus_minutes:g}+ min): "
+                     f"{self.focus_hours:.1f} h; fragmentação {self.fragmentation:.0%}")
+        if self.organizers:
+            lines.append("- Quem mais marca: " + ', '.join(
+                f"{name} ({count} reuniões, {hours:.1f} h)" for name, count, hours in self.organizers
+            ))
+        if len(self.calendars) > 1:
+            lines.append("- Por agenda: " + ', '.join(
+                f"{name} {hours:.1f} h" for name, _, hours in self.calendars
+            ))
+        return '\n'.join(lines)
+
+
+def calendar_stats(columns: EventColumns, start: float, end: float, zone: Optional[str] = None,
+                   working_hours: Optional[WorkingHours] = None, focus_minutes: float = 120,
+                   gap_minutes: float = 5, top: int = 5) -> CalendarStats:
+    """
+    Carga de reuniões, sequências, fragmentação e foco em [start, end).
+    
+    Reunião é todo evento com horário que ocupa a agenda (não recusado nem
+    "disponível"), recortado à janela. Fora do expediente conta como ocupado
+    no cálculo do tempo livre; blocos livres de focus_minutes ou mais são
+    tempo de foco, e fragmentação é a parte do tempo livre em blocos menores.
+    
+    Args:
+        columns: Eventos (EventColumns.from_calendars)
+        start: Início da janela, em segundos desde a época
+        end: Fim da janela
+        zone: Fuso do usuário para dias e semanas, nome IANA (None = local)
+        working_hours: Expediente (padrão: WorkingHours() no fuso zone)
+        focus_minutes: Menor bloco livre que conta como foco
+        gap_minutes: Maior intervalo entre duas reuniões da mesma sequência
+        top: Organizadores listados
+    """
+    tz = get_zone(zone)
+    working_hours = working_hours or WorkingHours(tz=tz)
+    
+    meeting = columns.busy & ~columns.all_day & (columns.end > start) & (columns.start < end)
+    order = np.argsort(columns.start[meeting], kind='stable')
+    starts = np.maximum(columns.start[meeting][order], start)
+    ends = np.minimum(columns.end[meeting][order], end)
+    durations = ends - starts
+    
+    # Dias locais pela meia-noite de cada um (o horário de verão muda a duração do dia)
+    first = datetime.fromtimestamp(start, tz).date()
+    days = (datetime.fromtimestamp(end, tz).date() - first).days + 1
+    midnights = np.array([date_epoch((first + timedelta(days=i)).isoformat(), zone) for i in range(days)])
+    day = np.searchsorted(midnights, starts, 'right') - 1 + first.weekday()
+    weekly_hours = np.bincount(day // 7, weights=durations, minlength=(days + first.weekday() + 6) // 7) / HOUR
+    monday = first - timedelta(days=first.weekday())
+    
+    busy_starts, busy_ends, _ = _merge(starts, ends)
+    chain_starts, chain_ends, chain_sizes = _merge(starts, ends, gap_minutes * 60)
+    chained = chain_sizes >= 2
+    longest = int(np.argmax(chain_sizes)) if chained.any() else None
+    
+    # Tempo livre: as lacunas entre reuniões e horários fora do expediente
+    off = working_hours.mask(start, end)
+    blocked_starts = np.concatenate([starts, off.starts])
+    blocked_order = np.argsort(blocked_starts, kind='stable')
+    blocked_starts, blocked_ends, _ = _merge(blocked_starts[blocked_order],
+                                             np.concatenate([ends, off.ends])[blocked_order])
+    gaps = np.append(blocked_starts, end) - np.insert(blocked_ends, 0, start)
+    gaps = gaps[gaps > 0]
+    free = gaps.sum()
+    focus = gaps[gaps >= focus_minutes * 60].sum()
+    
+    organizers = _ranking(columns.organizers, columns.organizer[meeting][order], durations)
+    return CalendarStats(
+        start=datetime.fromtimestamp(start, tz),
+        end=datetime.fromtimestamp(end, tz),
+        meetings=len(starts),
+        meeting_hours=float(durations.sum() / HOUR),
+        busy_hours=float((busy_ends - busy_starts).sum() / HOUR),
+        weekly=[(monday + timedelta(weeks=week), float(hours)) for week, hours in enumerate(weekly_hours)],
+        by_weekday=(np.bincount(day % 7, weights=durations, minlength=7) / HOUR).tolist(),
+        chains=int(chained.sum()),
+        chained_meetings=int(chain_sizes[chained].sum()),
+        longest_chain=int(chain_sizes[longest]) if longest is not None else 0,
+        longest_chain_hours=float((chain_ends[longest] - chain_starts[longest]) / HOUR) if longest is not None else 0.0,
+        gap_minutes=gap_minutes,
+        free_hours=float(free / HOUR),
+        focus_hours=float(focus / HOUR),
+        focus_minutes=focus_minutes,
+        fragmentation=float(1 - focus / free) if free else 0.0,
+        organizers=[item for item in organizers if item[0]][:top],
+        calendars=_ranking(columns.calendars, columns.calendar[meeting][order], durations),
+    )
+
+
+def _merge(starts: 'np.ndarray', ends: 'np.ndarray',
+           gap: float = 0.0) -> Tuple['np.ndarray', 'np.ndarray', 'np.ndarray']:
+    """
+    Une intervalos ordenados por início que se sobrepõem (ou distam até gap).
+    
+    Returns:
+        Início, fim e número de intervalos de cada bloco
+    """
+    if not len(starts):
+        return starts, ends, np.zeros(0, np.intp)
+    # Um bloco novo começa quando o início passa do maior fim visto até ali
+    reach = np.maximum.accumulate(ends)
+    first = np.empty(len(starts), bool)
+    first[0] = True
+    np.greater(starts[1:], reach[:-1] + gap, out=first[1:])
+    index = np.flatnonzero(first)
+    return starts[index], np.maximum.reduceat(ends, index), np.diff(np.append(index, len(starts)))
+
+
+def _ranking(names: List[str], codes: 'np.ndarray', durations: 'np.ndarray') -> List[Tuple[str, int, float]]:
+    """[(nome, reuniões, horas)] por horas, da maior para a menor, sem os que não têm reuniões."""
+    counts = np.bincount(codes, minlength=len(names))
+    hours = np.bincount(codes, weights=durations, minlength=len(names)) / HOUR
+    return [(names[code], int(counts[code]), float(hours[code]))
+            for code in np.argsort(-hours, kind='stable') if counts[code]]
@@ -0,0 +1,134 @@
+"""
+Metadados de anexos, trechos de texto de anexos pequenos e gravação em disco
+"""
+
+import base64
+import os
+from email.message import Message
+from typing import Dict, Any, List, Optional
+
+from .html_text import html_to_text
+from .mime import Bytes, content_charset, decode_base64url, decode_text, part_header
+
+
+# Anexos maiores que isso não são baixados só para extrair um trecho de texto
+ATTACHMENT_TEXT_MAX_SIZE = 256 * 1024
+
+# Tipos que, além de text/*, são texto legível
+TEXT_ATTACHMENT_TYPES = frozenset({
+    'application/json', 'application/xml', 'application/csv', 'application/x-yaml', 'application/yaml',
+})
+
+# Caracteres base64 decodificados por vez ao gravar um anexo (múltiplo de 4)
+DOWNLOAD_CHUNK_CHARS = 1024 * 1024
+
+
+def is_text_attachment(attachment: Dict[str, Any]) -> bool:
+    """Indica se vale extrair um trecho de texto do anexo (tipo de texto e tamanho pequeno)."""
+    mime_type = attachment['mime_type']
+    return (mime_type.startswith('text/') or mime_type in TEXT_ATTACHMENT_TYPES) and \
+        attachment['size'] <= ATTACHMENT_TEXT_MAX_SIZE
+
+
+def attachment_text(data: Bytes, mime_type: str, charset: Optional[str] = None, final: bool = True,
+                    max_chars: Optional[int] = None) -> str:
+    """Converte o conteúdo de um anexo de texto em texto simples (HTML vira texto visível)."""
+    text = decode_text(data, charset, final=final)
+    if mime_type == 'text/html':
+        return html_to_text(text, max_chars)
+    return text.strip()
+
+
+def find_attachments(payload: Dict[str, Any], text_bytes: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Lista os anexos de um payload JSON sem baixar nada.
+    
+    Cada anexo é {'filename', 'mime_type', 'size', 'attachment_id', 'part_id',
+    'charset'}; o charset do Content-Type decodifica também o texto baixado
+    depois. Com text_bytes, anexos de texto pequenos cujo conteúdo já veio no
+    payload ganham 'text' com até text_bytes bytes; os demais ficam para
+    GmailTool.load_attachment_texts.
+    """
+    attachments = []
+    stack = [payload]
+    while stack:
+        part = stack.pop()
+        children = part.get('parts')
+        if children:
+            stack.extend(reversed(children))
+            continue
+        if not part.get('filename'):
+            continue
+        body = part.get('body', {})
+        attachment = {
+            'filename': part['filename'],
+            'mime_type': part.get('mimeType', ''),
+            'size': body.get('size', 0),
+            'attachment_id': body.get('attachmentId'),
+            'part_id': part.get('partId'),
+            'charset': content_charset(part_header(part, 'Content-Type')),
+        }
+        if text_bytes and body.get('data') and is_text_attachment(attachment):
+            data = decode_base64url(body['data'], text_bytes)
+            attachment['text'] = attachment_text(data, attachment['mime_type'], attachment['charset'],
+                                                 final=len(data) < text_bytes, max_chars=text_bytes)
+        attachments.append(attachment)
+    return attachments
+
+
+def find_raw_attachments(message: Message, text_bytes: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Como find_attachments, para uma mensagem interpretada por mime.parse_raw.
+    
+    O formato raw não tem attachmentId: o conteúdo já está na mensagem, então os
+    trechos de texto saem direto dela. O tamanho é estimado pelo conteúdo codificado.
+    """
+    attachments = []
+    for part in message.walk():
+        if part.is_multipart() or not part.get_filename():
+            continue
+        encoded = part.get_payload()
+        is_base64 = (part.get('Content-Transfer-Encoding') or '').strip().lower() == 'base64'
+        attachment = {
+            'filename': part.get_filename(),
+            'mime_type': part.get_content_type(),
+            'size': len(encoded) * 3 // 4 if is_base64 else len(encoded),
+            'attachment_id': None,
+            'part_id': None,
+            'charset': part.get_content_charset(),
+        }
+        if text_bytes and is_text_attachment(attachment):
+            data = part.get_payload(decode=True) or b''
+            final = len(data) <= text_bytes
+            attachment['text'] = attachment_text(memoryview(data)[:text_bytes], attachment['mime_type'],
+                                                 attachment['charset'], final=final, max_chars=text_bytes)
+        attachments.append(attachment)
+    return attachments
+
+
+def write_base64url(data: str, path: str, chunk_chars: int = DOWNLOAD_CHUNK_CHARS) -> int:
+    """
+    Decodifica dados base64url direto para um arquivo, um bloco por vez.
+    
+    Só um bloco decodificado fica em memória. O arquivo é escrito ao lado do
+    destino e renomeado no fim, então um download interrompido não deixa um
+    arquivo truncado com o nome final.
+    
+    Returns:
+        Número de bytes gravados
+    """
+    chunk_chars -= chunk_chars % 4
+    temp_path = f'{path}.part'
+    written = 0
+    try:
+        with open(temp_path, 'wb') as f:
+            for start in range(0, len(data), chunk_chars):
+                chunk = data[start:start + chunk_chars]
+                padding = -len(chunk) % 4
+                written += f.write(base64.urlsafe_b64decode(chunk + '=' * padding if padding else chunk))
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return written
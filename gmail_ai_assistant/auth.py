@@ -0,0 +1,275 @@
+"""
+Credenciais do Google: armazenamento em JSON, carregamento sob demanda e
+renovação em segundo plano
+"""
+
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+
+# Antecedência da renovação em segundo plano. Maior que a margem do google-auth
+# (3min45s), para o token nunca ser considerado inválido no meio de uma requisição
+REFRESH_MARGIN = 5 * 60
+
+# Intervalo até nova tentativa quando a renovação em segundo plano falha
+RETRY_DELAY = 30
+
+
+def _seconds_left(creds) -> float:
+    # O google-auth guarda expiry em UTC sem fuso
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return (creds.expiry - now).total_seconds()
+
+
+def is_fresh(creds, margin: float = REFRESH_MARGIN) -> bool:
+    """Indica se as credenciais são válidas por mais de margin segundos."""
+    return bool(creds and creds.valid and (creds.expiry is None or _seconds_left(creds) > margin))
+
+
+@contextmanager
+def _file_lock(path: str) -> Iterator[None]:
+    """Trava exclusiva entre processos, num arquivo .lock ao lado do token."""
+    with open(path, 'a+b') as f:
+        if os.name == 'nt':
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == 'nt':
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class CredentialStore(ABC):
+    """
+    Onde as credenciais de cada conta ficam guardadas.
+    
+    lock(account) protege a sequência ler → renovar → salvar: quem entra depois
+    relê o token e encontra a renovação feita por quem entrou antes.
+    """
+    
+    def __init__(self):
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+    
+    @abstractmethod
+    def load(self, account: str):
+        """Retorna as credenciais da conta, ou None se não houver."""
+        pass
+    
+    @abstractmethod
+    def save(self, account: str, creds):
+        """Grava as credenciais da conta."""
+        pass
+    
+    @contextmanager
+    def lock(self, account: str) -> Iterator[None]:
+        """Trava a conta entre as threads do processo."""
+        with self._locks_lock:
+            lock = self._locks.setdefault(account, threading.Lock())
+        with lock:
+            yield
+
+
+class JsonFileStore(CredentialStore):
+    """
+    Um arquivo JSON (Credentials.to_json) por conta; a conta é o caminho do arquivo.
+    
+    A gravação é atômica e só o dono pode ler o arquivo. lock() também trava
+    entre processos, para duas execuções da CLI não renovarem o mesmo token ao
+    mesmo tempo. As credenciais lidas ficam em memória, compartilhadas por todos
+    os agentes do processo, e só são relidas quando o arquivo muda.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self._cache: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+    
+    def load(self, account: str):
+        path = os.path.abspath(account)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        version = (stat.st_mtime_ns, stat.st_size)
+        cached = self._cache.get(path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        from google.oauth2.credentials import Credentials
+        
+        try:
+            with open(path, encoding='utf-8') as f:
+                creds = Credentials.from_authorized_user_info(json.load(f))
+        except ValueError:
+            # Token antigo em pickle (ou corrompido): não é desserializado; autoriza de novo
+            return None
+        self._cache[path] = (version, creds)
+        return creds
+    
+    def save(self, account: str, creds):
+        path = os.path.abspath(account)
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(creds.to_json())
+        os.replace(temp_path, path)
+        stat = os.stat(path)
+        self._cache[path] = ((stat.st_mtime_ns, stat.st_size), creds)
+    
+    @contextmanager
+    def lock(self, account: str) -> Iterator[None]:
+        path = os.path.abspath(account)
+        with super().lock(path), _file_lock(path + '.lock'):
+            yield
+
+
+# Store padrão: um só por processo, para o cache e as travas valerem entre agentes
+default_store = JsonFileStore()
+
+
+class CredentialProvider:
+    """
+    Fornece as credenciais do Google a quem as pede, na primeira vez que pedem.
+    
+    Nada é lido nem renovado no construtor. prefetch() carrega e, se preciso,
+    renova o token numa thread, para que a primeira requisição encontre as
+    credenciais prontas; depois disso um timer renova o token REFRESH_MARGIN
+    segundos antes de expirar. O fluxo interativo do OAuth só roda em get(),
+    nunca em segundo plano. Renovações passam pela trava do store, então
+    vários agentes (ou processos) da mesma conta renovam o token uma vez só.
+    """
+    
+    def __init__(self, token_file: str, credentials_file: str, scopes: List[str],
+                 refresh_margin: float = REFRESH_MARGIN, store: Optional[CredentialStore] = None):
+        """
+        Args:
+            token_file: Conta no store; no store padrão, o arquivo JSON do token
+            credentials_file: Arquivo credentials.json usado no fluxo OAuth
+            scopes: Escopos pedidos no fluxo OAuth
+            refresh_margin: Segundos antes da expiração em que o token é renovado
+            store: Onde o token é lido e salvo (padrão: default_store)
+        """
+        self.token_file = token_file
+        self.credentials_file = credentials_file
+        self.scopes = scopes
+        self.refresh_margin = refresh_margin
+        self.store = store or default_store
+        self._creds = None
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+        self._closed = False
+    
+    def get(self, interactive: bool = True):
+        """
+        Retorna credenciais válidas, renovando ou autorizando se necessário.
+        
+        Um token ainda válido mas sem refresh_token é usado até expirar. O
+        fluxo OAuth só abre na thread principal e sem token utilizável; em
+        outra thread isso levanta RuntimeError. Com interactive=False ele
+        nunca abre e, sem token utilizável, o retorno é None.
+        """
+        with self._lock:
+            creds = self._load(interactive=interactive)
+            self._schedule()
+            return creds
+    
+    def prefetch(self) -> threading.Thread:
+        """Carrega e renova o token numa thread, sem bloquear quem chama."""
+        thread = threading.Thread(target=self._prefetch, name='credentials-prefetch', daemon=True)
+        thread.start()
+        return thread
+    
+    @property
+    def loaded(self) -> bool:
+        """Indica se as credenciais já foram carregadas."""
+        return self._creds is not None
+    
+    def close(self):
+        """Cancela a renovação em segundo plano."""
+        with self._lock:
+            self._closed = True
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+    
+    def _prefetch(self):
+        try:
+            with self._lock:
+                if self._load(interactive=False) is not None:
+                    self._schedule()
+        except Exception:
+            pass  # get() tenta de novo e mostra o erro a quem pediu as credenciais
+    
+    def _load(self, interactive: bool):
+        """Usa as credenciais em memória ou, sob a trava do store, relê, renova ou autoriza."""
+        if is_fresh(self._creds, self.refresh_margin):
+            return self._creds
+        with self.store.lock(self.token_file):
+            creds = self.store.load(self.token_file)
+            if is_fresh(creds, self.refresh_margin):
+                pass  # outro agente ou processo já renovou
+            elif creds and creds.refresh_token:
+                self._refresh(creds)
+            elif creds and creds.valid:
+                pass  # sem refresh_token não há como renovar: o token vale até expirar
+            elif not interactive:
+                return None
+            elif threading.current_thread() is not threading.main_thread():
+                # O navegador só abre em primeiro plano, nunca de uma thread de trabalho
+                raise RuntimeError(f"Sem token válido em {self.token_file}: autorize a conta em primeiro plano")
+            else:
+                from google_auth_oauthlib.flow import InstalledAppFlow
+                
+                flow = InstalledAppFlow.from_client_secrets_file(self.credentials_file, self.scopes)
+                creds = flow.run_local_server(port=0)
+                self.store.save(self.token_file, creds)
+        self._creds = creds
+        return creds
+    
+    def _refresh(self, creds):
+        from google.auth.transport.requests import Request
+        
+        creds.refresh(Request())
+        self.store.save(self.token_file, creds)
+    
+    def _schedule(self, delay: Optional[float] = None):
+        """Agenda a próxima renovação em segundo plano (uma por vez)."""
+        creds = self._creds
+        if self._closed or creds is None or creds.expiry is None or not creds.refresh_token:
+            return
+        if self._timer is not None:
+            return
+        if delay is None:
+            delay = max(_seconds_left(creds) - self.refresh_margin, RETRY_DELAY)
+        self._timer = threading.Timer(delay, self._background_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+    
+    def _background_refresh(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._timer = None
+            try:
+                self._load(interactive=False)
+            except Exception:
+                # Sem rede agora: tenta de novo; o google-auth ainda renova na requisição
+                self._schedule(RETRY_DELAY)
+                return
+            self._schedule()
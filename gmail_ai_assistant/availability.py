@@ -0,0 +1,230 @@
+"""
+Disponibilidade: horários ocupados por agenda (FreeBusy ou cache de eventos),
+horários livres em comum entre participantes e expediente, sem passar pelo LLM
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime, time, timedelta, timezone, tzinfo
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .event_time import normalize_events, parse_datetime
+
+# Intervalo em segundos desde a época: [início, fim)
+Interval = Tuple[float, float]
+
+
+class BusyIntervals:
+    """
+    Horários ocupados de uma agenda (ou de várias já unidas).
+    
+    Os intervalos ficam ordenados e sem sobreposição, em duas listas paralelas
+    de inícios e fins. Como fins também ficam em ordem, a busca por bisect acha
+    em O(log n) o intervalo que contém um instante ou o primeiro depois dele.
+    """
+    
+    __slots__ = ('starts', 'ends')
+    
+    def __init__(self, intervals: Iterable[Interval] = ()):
+        """Une intervalos em qualquer ordem, com sobreposição ou encostados."""
+        self.starts: List[float] = []
+        self.ends: List[float] = []
+        self._extend_sorted(sorted(intervals))
+    
+    @classmethod
+    def from_events(cls, events: Iterable[Dict[str, Any]], zone: Optional[str] = None) -> 'BusyIntervals':
+        """
+        Intervalos de eventos no formato da API.
+        
+        Cancelados, recusados e marcados como "disponível" não ocupam, como no
+        FreeBusy e em calendar_stats.
+        """
+        busy = [event for event in events
+                if event.get('status') != 'cancelled' and event.get('transparency') != 'transparent'
+                and not _declined(event)]
+        return cls((start, end) for start, end, _ in normalize_events(busy, zone))
+    
+    @classmethod
+    def union(cls, calendars: Iterable['BusyIntervals']) -> 'BusyIntervals':
+        """Ocupação somada de várias agendas (livre só quando todas estão livres)."""
+        # Cada agenda já está ordenada: o timsort só intercala as sequências
+        return cls(interval for calendar in calendars for interval in calendar)
+    
+    def _extend_sorted(self, intervals: Iterable[Interval]):
+        starts, ends = self.starts, self.ends
+        for start, end in intervals:
+            if end <= start:
+                continue
+            if ends and start <= ends[-1]:
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+    
+    def add(self, start: float, end: float):
+        """Marca [start, end) como ocupado, unindo com os intervalos que ele toca."""
+        if end <= start:
+            return
+        first = bisect_left(self.ends, start)
+        last = bisect_right(self.starts, end)
+        if first < last:
+            start = min(start, self.starts[first])
+            end = max(end, self.ends[last - 1])
+        self.starts[first:last] = [start]
+        self.ends[first:last] = [end]
+    
+    def is_free(self, start: float, end: float) -> bool:
+        """True se nada ocupa [start, end)."""
+        index = bisect_right(self.ends, start)
+        return index == len(self.starts) or self.starts[index] >= end
+    
+    def busy_between(self, start: float, end: float) -> List[Interval]:
+        """Intervalos ocupados que tocam [start, end), recortados à janela."""
+        index = bisect_right(self.ends, start)
+        result = []
+        while index < len(self.starts) and self.starts[index] < end:
+            result.append((max(self.starts[index], start), min(self.ends[index], end)))
+            index += 1
+        return result
+    
+    def free_slots(self, start: float, end: float, min_duration: float = 0) -> List[Interval]:
+        """Lacunas livres dentro de [start, end) com pelo menos min_duration segundos."""
+        slots = []
+        cursor = start
+        for busy_start, busy_end in self.busy_between(start, end):
+            if busy_start - cursor >= max(min_duration, 1e-9):
+                slots.append((cursor, busy_start))
+            cursor = busy_end
+        if end - cursor >= max(min_duration, 1e-9):
+            slots.append((cursor, end))
+        return slots
+    
+    def first_free(self, start: float, end: float, duration: float) -> Optional[Interval]:
+        """Primeiro horário livre de duration segundos dentro de [start, end), ou None."""
+        index = bisect_right(self.ends, start)
+        cursor = start
+        while cursor + duration <= end:
+            if index == len(self.starts) or self.starts[index] >= cursor + duration:
+                return cursor, cursor + duration
+            cursor = max(cursor, self.ends[index])
+            index += 1
+        return None
+    
+    def __len__(self) -> int:
+        return len(self.starts)
+    
+    def __iter__(self):
+        return zip(self.starts, self.ends)
+    
+    def __repr__(self) -> str:
+        return f'BusyIntervals({list(self)!r})'
+
+
+def _declined(event: Dict[str, Any]) -> bool:
+    """True se o dono da agenda recusou o convite."""
+    for guest in event.get('attendees', ()):
+        if guest.get('self'):
+            return guest.get('responseStatus') == 'declined'
+    return False
+
+
+class WorkingHours:
+    """Expediente: das start às end, nos dias da semana em days (0 = segunda)."""
+    
+    __slots__ = ('start', 'end', 'days', 'tz')
+    
+    def __init__(self, start: time = time(9), end: time = time(18), days: Sequence[int] = (0, 1, 2, 3, 4),
+                 tz: Optional[tzinfo] = None):
+        """
+        Args:
+            start: Início do expediente
+            end: Fim do expediente
+            days: Dias da semana com expediente (0 = segunda, 6 = domingo)
+            tz: Fuso do expediente (None = o fuso local do sistema, com horário de verão)
+        """
+        self.start = start
+        self.end = end
+        self.days = frozenset(days)
+        # Sem tz, datas e horários ficam ingênuos: timestamp() e fromtimestamp()
+        # usam o fuso local de cada data, não o deslocamento de hoje
+        self.tz = tz
+    
+    def mask(self, start: float, end: float) -> BusyIntervals:
+        """Fora do expediente dentro de [start, end), como horários ocupados."""
+        day = datetime.fromtimestamp(start, self.tz).date()
+        last = datetime.fromtimestamp(end, self.tz).date()
+        off, cursor = [], start
+        while day <= last:
+            if day.weekday() in self.days:
+                opens = datetime.combine(day, self.start, self.tz).timestamp()
+                closes = datetime.combine(day, self.end, self.tz).timestamp()
+                off.append((cursor, opens))
+                cursor = max(cursor, closes)
+            day += timedelta(days=1)
+        off.append((cursor, end))
+        return BusyIntervals((max(a, start), min(b, end)) for a, b in off)
+
+
+class Availability:
+    """
+    Responde "quando estou (estamos) livre(s)?" direto das agendas.
+    
+    Agendas que a CalendarTool mantém no EventCache são lidas de lá, depois de
+    uma sincronização incremental; as demais (inclusive as de outras pessoas,
+    pelo e-mail) vêm de CalendarTool.freebusy.
+    """
+    
+    def __init__(self, calendar_tool):
+        """
+        Args:
+            calendar_tool: CalendarTool cujo serviço, cota e cache são usados
+        """
+        self.calendar_tool = calendar_tool
+    
+    def busy(self, calendar_ids: Sequence[str], start: float, end: float) -> Dict[str, BusyIntervals]:
+        """
+        Horários ocupados de cada agenda em [start, end).
+        
+        Uma agenda sem acesso (ou desconhecida) levanta ValueError com o motivo
+        informado pela API, em vez de parecer livre.
+        """
+        tool = self.calendar_tool
+        result: Dict[str, BusyIntervals] = {}
+        remote = []
+        for calendar_id in dict.fromkeys(calendar_ids):
+            if tool.cache is not None and tool.cache.sync_token(calendar_id) is not None:
+                tool.sync_cache(calendar_id)
+                result[calendar_id] = BusyIntervals.from_events(
+                    tool.cache.window(start, end, calendar_id=calendar_id), tool.tz
+                )
+            else:
+                remote.append(calendar_id)
+        
+        if remote:
+            window_start = datetime.fromtimestamp(start, timezone.utc)
+            window_end = datetime.fromtimestamp(end, timezone.utc)
+            for calendar_id, calendar in tool.freebusy(remote, window_start, window_end).items():
+                if calendar.get('errors'):
+                    reasons = ', '.join(error.get('reason', '?') for error in calendar['errors'])
+                    raise ValueError(f"Disponibilidade de {calendar_id} indisponível: {reasons}")
+                result[calendar_id] = BusyIntervals(
+                    (parse_datetime(busy['start']), parse_datetime(busy['end']))
+                    for busy in calendar.get('busy', [])
+                )
+        return result
+    
+    def free_slots(self, start: float, end: float, duration: float, attendees: Sequence[str] = ('primary',),
+                   working_hours: Optional[WorkingHours] = None) -> List[Interval]:
+        """
+        Horários em que todos os participantes estão livres por pelo menos duration segundos.
+        
+        Args:
+            start: Início da janela (segundos desde a época)
+            end: Fim da janela
+            duration: Duração mínima de cada horário, em segundos
+            attendees: Agendas ou e-mails dos participantes ('primary' = você)
+            working_hours: Restringe ao expediente (None = o dia inteiro)
+        """
+        calendars = list(self.busy(attendees, start, end).values())
+        if working_hours is not None:
+            calendars.append(working_hours.mask(start, end))
+        return BusyIntervals.union(calendars).free_slots(start, end, duration)
@@ -0,0 +1,256 @@
+"""
+Cache local (SQLite) das mensagens do Gmail e dos eventos do Calendar
+"""
+
+import json
+import sqlite3
+import threading
+from typing import List, Dict, Any, Optional, Iterable
+
+from .event_time import normalize_events
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT PRIMARY KEY,
+    thread_id TEXT,
+    history_id INTEGER,
+    internal_date INTEGER,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class MessageCache:
+    """
+    Armazena mensagens do Gmail (formato 'full') indexadas pelo ID.
+    
+    O conteúdo de uma mensagem do Gmail é imutável; só os rótulos mudam. Por isso
+    o cache guarda também o último historyId sincronizado, usado pelo GmailTool
+    para aplicar apenas as mudanças (users().history().list) em cada execução.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Abre (ou cria) o cache.
+        
+        Args:
+            path: Caminho do arquivo SQLite (':memory:' para um cache temporário)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+    
+    @property
+    def history_id(self) -> Optional[int]:
+        """Último historyId sincronizado, ou None se o cache nunca foi sincronizado."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM state WHERE key = 'history_id'").fetchone()
+        return int(row[0]) if row else None
+    
+    @history_id.setter
+    def history_id(self, value: int):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO state (key, value) VALUES ('history_id', ?)", (str(value),)
+            )
+    
+    def get_many(self, message_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Retorna as mensagens em cache dentre os IDs informados."""
+        message_ids = list(message_ids)
+        found = {}
+        with self._lock:
+            # Respeita o limite de parâmetros por consulta do SQLite
+            for start in range(0, len(message_ids), 500):
+                chunk = message_ids[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT id, data FROM messages WHERE id IN ({placeholders})", chunk
+                )
+                for msg_id, data in rows:
+                    found[msg_id] = json.loads(data)
+        return found
+    
+    def put_many(self, messages: List[Dict[str, Any]]):
+        """Grava (ou substitui) mensagens no cache."""
+        rows = [
+            (
+                msg['id'],
+                msg.get('threadId'),
+                int(msg.get('historyId', 0)),
+                int(msg.get('internalDate', 0)),
+                json.dumps(msg, separators=(',', ':'))
+            )
+            for msg in messages
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO messages VALUES (?, ?, ?, ?, ?)", rows)
+    
+    def delete_many(self, message_ids: Iterable[str]):
+        """Remove mensagens do cache."""
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM messages WHERE id = ?", [(msg_id,) for msg_id in message_ids])
+    
+    def update_labels(self, message_id: str, added: Iterable[str] = (), removed: Iterable[str] = ()):
+        """Aplica uma mudança de rótulos a uma mensagem em cache (ignora se não estiver em cache)."""
+        removed = set(removed)
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT data FROM messages WHERE id = ?", (message_id,)).fetchone()
+            if row is None:
+                return
+            msg = json.loads(row[0])
+            labels = [label for label in msg.get('labelIds', []) if label not in removed]
+            labels.extend(label for label in added if label not in labels)
+            msg['labelIds'] = labels
+            self._conn.execute(
+                "UPDATE messages SET data = ? WHERE id = ?",
+                (json.dumps(msg, separators=(',', ':')), message_id)
+            )
+    
+    def clear(self):
+        """Esvazia o cache, inclusive o historyId."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM messages")
+            self._conn.execute("DELETE FROM state")
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+    
+    def close(self):
+        """Fecha a conexão com o banco."""
+        with self._lock:
+            self._conn.close()
+
+
+EVENT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    calendar_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    start_ts INTEGER NOT NULL,
+    end_ts INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (calendar_id, id)
+);
+CREATE INDEX IF NOT EXISTS events_start ON events (calendar_id, start_ts);
+CREATE TABLE IF NOT EXISTS event_state (
+    calendar_id TEXT PRIMARY KEY,
+    sync_token TEXT,
+    max_span INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+class EventCache:
+    """
+    Armazena os eventos do Calendar e o syncToken de cada agenda.
+    
+    A CalendarTool aplica a cada execução só o que mudou desde o último
+    nextSyncToken; as consultas por janela de tempo são respondidas daqui,
+    pelo índice de início, sem ir à API.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Abre (ou cria) o cache; pode ser o mesmo arquivo do MessageCache.
+        
+        Args:
+            path: Caminho do arquivo SQLite (':memory:' para um cache temporário)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(EVENT_SCHEMA)
+        self._conn.commit()
+    
+    def sync_token(self, calendar_id: str = 'primary') -> Optional[str]:
+        """nextSyncToken da última sincronização da agenda, ou None se nunca sincronizou."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sync_token FROM event_state WHERE calendar_id = ?", (calendar_id,)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def set_sync_token(self, token: str, calendar_id: str = 'primary'):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO event_state (calendar_id, sync_token) VALUES (?, ?) "
+                "ON CONFLICT (calendar_id) DO UPDATE SET sync_token = excluded.sync_token",
+                (calendar_id, token)
+            )
+    
+    def apply(self, events: List[Dict[str, Any]], calendar_id: str = 'primary', zone: Optional[str] = None) -> int:
+        """
+        Grava eventos novos ou alterados e remove os cancelados, numa só transação.
+        
+        Args:
+            zone: Fuso do usuário, onde caem os eventos de dia inteiro (None = local)
+        
+        Returns:
+            Número de eventos aplicados
+        """
+        cancelled = [(calendar_id, event['id']) for event in events if event.get('status') == 'cancelled']
+        active = [event for event in events if event.get('status') != 'cancelled']
+        rows, max_span = [], 0
+        for event, (start, end, _) in zip(active, normalize_events(active, zone)):
+            start, end = int(start), int(end)
+            rows.append((calendar_id, event['id'], start, end, json.dumps(event, separators=(',', ':'))))
+            max_span = max(max_span, end - start)
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM events WHERE calendar_id = ? AND id = ?", cancelled)
+            self._conn.executemany("INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?)", rows)
+            # Maior duração já gravada na agenda, no banco: vale para outros processos
+            self._conn.execute(
+                "INSERT INTO event_state (calendar_id, max_span) VALUES (?, ?) "
+                "ON CONFLICT (calendar_id) DO UPDATE SET max_span = MAX(max_span, excluded.max_span)",
+                (calendar_id, max_span)
+            )
+        return len(events)
+    
+    def window(self, start: float, end: float = float('inf'), limit: Optional[int] = None,
+               calendar_id: str = 'primary') -> List[Dict[str, Any]]:
+        """
+        Eventos que se sobrepõem a [start, end), em segundos desde a época, por ordem de início.
+        
+        Como o timeMin da API, um evento em andamento em start entra no resultado.
+        A maior duração gravada na agenda limita a busca no índice de início.
+        """
+        end = min(end, 2 ** 62)  # o SQLite compara INTEGER com REAL, mas não aceita inf como limite
+        query = ("SELECT data FROM events WHERE calendar_id = ? AND start_ts >= ? AND start_ts < ? "
+                 "AND end_ts > ? ORDER BY start_ts")
+        if limit is not None:
+            query += " LIMIT ?"
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT max_span FROM event_state WHERE calendar_id = ?", (calendar_id,)
+            ).fetchone()
+            params = [calendar_id, int(start) - (row[0] if row else 0), end, start]
+            if limit is not None:
+                params.append(limit)
+            rows = self._conn.execute(query, params).fetchall()
+        return [json.loads(data) for data, in rows]
+    
+    def clear(self, calendar_id: str = 'primary'):
+        """Esvazia a agenda no cache, inclusive o syncToken."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM events WHERE calendar_id = ?", (calendar_id,))
+            self._conn.execute("DELETE FROM event_state WHERE calendar_id = ?", (calendar_id,))
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+    
+    def close(self):
+        """Fecha a conexão com o banco."""
+        with self._lock:
+            self._conn.close()
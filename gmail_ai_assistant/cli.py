@@ -1 +1,500 @@
- 
\ No newline at end of file
+"""
+Interface de linha de comando do Gmail AI Assistant
+"""
+
+import os
+import sys
+from typing import TYPE_CHECKING, Optional
+
+import click
+
+from . import __version__
+
+# Só o click é importado no carregamento: rich e o agente (Gemini, OAuth,
+# googleapiclient) entram dentro dos comandos; ver benchmarks/bench_imports.py
+if TYPE_CHECKING:
+    from .agent import GmailAIAgent
+
+
+class _LazyConsole:
+    """Console do rich criado no primeiro uso; --help não precisa dele."""
+    
+    def __init__(self):
+        self._console = None
+    
+    def __getattr__(self, name: str):
+        if self._console is None:
+            from rich.console import Console
+            
+            self._console = Console()
+        return getattr(self._console, name)
+
+
+console = _LazyConsole()
+
+DEFAULT_PROMPT = "Forneça um resumo executivo dos meus e-mails e compromissos, destacando prioridades."
+
+
+def _create_agent(ctx: click.Context, api_key: str = None, batch_size: int = 50, workers: int = 1) -> 'GmailAIAgent':
+    """Cria o agente com as opções globais, encerrando o comando em caso de erro."""
+    from .agent import GmailAIAgent
+    
+    credentials_file = ctx.obj['credentials']
+    if not os.path.exists(credentials_file):
+        console.print(f"[red]❌ Arquivo de credenciais não encontrado: {credentials_file}[/red]")
+        console.print("Execute [bold]gmail-assistant setup[/bold] para ver o guia de configuração.")
+        sys.exit(1)
+    
+    try:
+        agent = GmailAIAgent(
+            credentials_file=credentials_file,
+            token_file=ctx.obj['token'],
+            gemini_api_key=api_key,
+            batch_size=batch_size,
+            workers=workers,
+            cache_file=ctx.obj['cache'],
+            engine=ctx.obj['engine'],
+            calendars=ctx.obj['calendars'],
+            tz=ctx.obj['tz']
+        )
+        # O comando vai usar a API em seguida: autentica agora para mostrar o erro aqui
+        with console.status("🔐 Autenticando com Google..."):
+            agent.credentials.get()
+        return agent
+    except Exception as e:
+        console.print(f"[red]❌ Erro na autenticação: {str(e)}[/red]")
+        sys.exit(1)
+
+
+def _email_filter_options(func):
+    """Adiciona ao comando as opções de filtro aplicadas pelo Gmail."""
+    options = [
+        click.option('--query', '-q', help='Busca na sintaxe do Gmail, ex.: "from:chefe@empresa.com is:unread"'),
+        click.option('--label', 'labels', multiple=True,
+                     help='Rótulo exigido (pode repetir; padrão: INBOX)'),
+        click.option('--all-mail', is_flag=True, help='Não filtra por rótulo (ignora --label)'),
+        click.option('--after', type=click.DateTime(formats=['%Y-%m-%d']),
+                     help='Só e-mails a partir desta data (AAAA-MM-DD)'),
+        click.option('--before', type=click.DateTime(formats=['%Y-%m-%d']),
+                     help='Só e-mails antes desta data (AAAA-MM-DD)'),
+        click.option('--include-spam-trash', is_flag=True, help='Inclui SPAM e lixeira'),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+
+def _email_filters(query, labels, all_mail, after, before, include_spam_trash) -> dict:
+    """Converte as opções de filtro da CLI nos argumentos de GmailTool.execute."""
+    return {
+        'query': query,
+        'label_ids': None if all_mail else (list(labels) or ['INBOX']),
+        'after': after.date() if after else None,
+        'before': before.date() if before else None,
+        'include_spam_trash': include_spam_trash,
+    }
+
+
+def _format_size(size: int) -> str:
+    """Tamanho legível de um anexo."""
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024 or unit == 'MB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def _working_hours(hours: str, weekends: bool, tz: Optional[str]):
+    """WorkingHours a partir de --hours (HH:MM-HH:MM), --weekends e --tz."""
+    from datetime import time
+    
+    from .availability import WorkingHours
+    from .event_time import get_zone
+    
+    try:
+        opens, closes = (time.fromisoformat(part.strip()) for part in hours.split('-'))
+    except ValueError:
+        raise click.BadParameter(f"use HH:MM-HH:MM, ex.: 09:00-18:00 (recebido: {hours})", param_hint='--hours')
+    return WorkingHours(opens, closes, days=range(7) if weekends else range(5), tz=get_zone(tz))
+
+
+def _check_tz(ctx, param, value: Optional[str]) -> Optional[str]:
+    """Valida --tz (ou GMAIL_ASSISTANT_TZ) antes de qualquer comando."""
+    if value is None:
+        return None
+    from .event_time import check_zone
+    
+    try:
+        return check_zone(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e), ctx=ctx, param=param)
+
+
+def _print_error(item: dict) -> bool:
+    """Imprime o erro de um item e retorna True se o item era um erro."""
+    if 'error' in item:
+        console.print(f"[red]⚠️  {item['error']}[/red]")
+        return True
+    return False
+
+
+@click.group()
+@click.version_option(version=__version__)
+@click.option('--credentials', default='credentials.json', show_default=True,
+              help='Arquivo de credenciais OAuth do Google')
+@click.option('--token', default='token.json', show_default=True,
+              help='Arquivo onde o token de autenticação é salvo')
+@click.option('--cache', type=click.Path(dir_okay=False), envvar='GMAIL_ASSISTANT_CACHE',
+              help='Arquivo SQLite para o cache local de mensagens e eventos (sincronização incremental)')
+@click.option('--engine', type=click.Choice(['json', 'raw']), default='json', show_default=True,
+              envvar='GMAIL_ASSISTANT_ENGINE',
+              help='Extração do corpo: payload JSON da API ou mensagem RFC 822 (raw)')
+@click.option('--calendars', default='primary', show_default=True, envvar='GMAIL_ASSISTANT_CALENDARS',
+              help="Agendas lidas: 'primary', 'selected' (as marcadas no Calendar), 'all' ou IDs separados por vírgula")
+@click.option('--tz', envvar='GMAIL_ASSISTANT_TZ', callback=_check_tz,
+              help="Seu fuso horário IANA, ex.: America/Sao_Paulo (padrão: o do sistema)")
+@click.pass_context
+def main(ctx, credentials, token, cache, engine, calendars, tz):
+    """🤖 Assistente de IA para Gmail e Google Calendar."""
+    ctx.ensure_object(dict)
+    ctx.obj['credentials'] = credentials
+    ctx.obj['token'] = token
+    ctx.obj['cache'] = cache
+    ctx.obj['engine'] = engine
+    ctx.obj['calendars'] = calendars if calendars in ('primary', 'selected', 'all') else [
+        calendar_id.strip() for calendar_id in calendars.split(',') if calendar_id.strip()
+    ]
+    ctx.obj['tz'] = tz
+
+
+@main.command()
+@click.argument('prompt', required=False, default=DEFAULT_PROMPT)
+@click.option('--emails', 'max_emails', default=3, show_default=True, help='Número de e-mails para analisar')
+@click.option('--events', 'max_events', default=3, show_default=True, help='Número de eventos para analisar')
+@click.option('--api-key', envvar='GEMINI_API_KEY', help='Chave da API do Gemini')
+@click.option('--batch-size', default=50, show_default=True, help='Mensagens por requisição em lote (1 desativa)')
+@click.option('--workers', default=1, show_default=True, help='Threads para buscar e-mails em paralelo')
+@click.option('--threads', is_flag=True, help='Agrupa por conversa (--emails passa a contar conversas)')
+@click.option('--stats-days', type=int,
+              help='Envia agregados da agenda dos últimos N dias (calendar-stats) em vez dos eventos')
+@_email_filter_options
+@click.pass_context
+def analyze(ctx, prompt, max_emails, max_events, api_key, batch_size, workers, threads, stats_days, **filters):
+    """Analisa e-mails e eventos com o Gemini."""
+    if not api_key:
+        console.print("[red]❌ API Key do Gemini não configurada.[/red] Use --api-key ou GEMINI_API_KEY.")
+        sys.exit(1)
+    
+    agent = _create_agent(ctx, api_key=api_key, batch_size=batch_size, workers=workers)
+    event_stats = None
+    if stats_days:
+        try:
+            with console.status("📊 Calculando os agregados da agenda..."):
+                event_stats = agent.calendar_stats(days=stats_days)
+        except Exception as e:
+            console.print(f"[red]❌ Erro ao analisar a agenda: {str(e)}[/red]")
+            sys.exit(1)
+    with console.status("🧠 Analisando com Gemini..."):
+        response = agent.run(prompt, max_emails=max_emails, max_events=max_events, threads=threads,
+                             event_stats=event_stats, **_email_filters(**filters))
+    
+    from rich.markdown import Markdown
+    from rich.panel import Panel
+    
+    console.print(Panel(Markdown(response), title="🤖 Análise", border_style="green"))
+
+
+@main.command()
+@click.option('--max', 'max_results', default=5, show_default=True, help='Número de e-mails para listar')
+@click.option('--batch-size', default=50, show_default=True, help='Mensagens por requisição em lote (1 desativa)')
+@click.option('--workers', default=1, show_default=True, help='Threads para buscar e-mails em paralelo')
+@click.option('--body/--no-body', default=False, show_default=True,
+              help='Baixa o corpo completo (sem ele, só cabeçalhos e snippet)')
+@click.option('--threads', is_flag=True, help='Lista conversas em vez de mensagens')
+@_email_filter_options
+@click.pass_context
+def emails(ctx, max_results, batch_size, workers, body, threads, **filters):
+    """Lista os e-mails mais recentes da caixa de entrada."""
+    agent = _create_agent(ctx, batch_size=batch_size, workers=workers)
+    with console.status("📧 Lendo e-mails..."):
+        if threads:
+            items = agent.get_threads(max_results=max_results, **_email_filters(**filters))
+        else:
+            items = agent.get_emails(max_results=max_results, include_body=False, **_email_filters(**filters))
+            if body:
+                agent.gmail_tool.load_bodies(items)
+    
+    if not items:
+        console.print("Nenhum e-mail encontrado.")
+        return
+    
+    from rich.panel import Panel
+    
+    for i, email in enumerate(items, 1):
+        if _print_error(email):
+            continue
+        text = email.get('body', email['snippet'])
+        preview = text[:300] + ('...' if len(text) > 300 else '')
+        count = f" ({email['message_count']} mensagens)" if email.get('message_count', 1) > 1 else ''
+        saved = f"✂️ {email['tokens_saved']} tokens removidos" if email.get('tokens_saved') else None
+        attachments = ''
+        if email.get('attachments'):
+            names = ', '.join(f"{a['filename']} ({_format_size(a['size'])})" for a in email['attachments'])
+            attachments = f"\n\n📎 {names}\n[dim]gmail-assistant attachments {email['id']}[/dim]"
+        console.print(Panel(
+            f"[bold]De:[/bold] {email['from']}\n\n{preview}{attachments}",
+            title=f"📧 {i}. {email['subject']}{count}",
+            subtitle=saved,
+            border_style="blue"
+        ))
+
+
+@main.command()
+@click.argument('message_id')
+@click.option('--save', 'directory', type=click.Path(file_okay=False),
+              help='Baixa os anexos para esta pasta (sem ela, só lista)')
+@click.option('--name', 'names', multiple=True, help='Só os anexos com este nome (pode repetir)')
+@click.pass_context
+def attachments(ctx, message_id, directory, names):
+    """Lista e baixa os anexos de um e-mail."""
+    agent = _create_agent(ctx)
+    with console.status("📎 Lendo anexos..."):
+        email = agent.gmail_tool.load_bodies([{'id': message_id}])[0]
+    if _print_error(email):
+        sys.exit(1)
+    
+    selected = [a for a in email.get('attachments', []) if not names or a['filename'] in names]
+    if not selected:
+        console.print("Nenhum anexo encontrado.")
+        return
+    
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    for attachment in selected:
+        line = f"📎 {attachment['filename']} [dim]({attachment['mime_type']}, {_format_size(attachment['size'])})[/dim]"
+        if directory:
+            try:
+                with console.status(f"⬇️  Baixando {attachment['filename']}..."):
+                    line += f" → {agent.gmail_tool.download_attachment(attachment, directory)}"
+            except Exception as e:
+                line += f" [red]❌ {str(e)}[/red]"
+        console.print(line)
+
+
+@main.command()
+@click.option('--max', 'max_results', default=5, show_default=True, help='Número de eventos para listar')
+@click.pass_context
+def events(ctx, max_results):
+    """Lista os próximos eventos do Google Calendar."""
+    agent = _create_agent(ctx)
+    with console.status("📅 Lendo eventos..."):
+        items = agent.get_events(max_results=max_results)
+    
+    if not items:
+        console.print("Nenhum evento próximo encontrado.")
+        return
+    
+    for i, event in enumerate(items, 1):
+        if _print_error(event):
+            continue
+        console.print(f"[bold]{i}. 📅 {event['summary']}[/bold]")
+        console.print(f"   🕐 {event['time']}" + (f"  [dim]({event['calendar']})[/dim]" if 'calendar' in event else ''))
+        if event.get('description'):
+            description = event['description']
+            console.print(f"   📝 {description[:200]}{'...' if len(description) > 200 else ''}")
+
+
+@main.command()
+@click.option('--duration', default=30, show_default=True, help='Duração mínima do horário, em minutos')
+@click.option('--days', default=7, show_default=True, help='Dias à frente considerados')
+@click.option('--with', 'attendees', multiple=True, help='E-mail ou agenda de outro participante (pode repetir)')
+@click.option('--hours', default='09:00-18:00', show_default=True, help='Expediente (HH:MM-HH:MM)')
+@click.option('--weekends', is_flag=True, help='Inclui sábados e domingos')
+@click.option('--any-time', is_flag=True, help='Considera o dia inteiro, não só o expediente')
+@click.pass_context
+def free(ctx, duration, days, attendees, hours, weekends, any_time):
+    """Mostra os horários livres em comum (calculados localmente, sem o Gemini)."""
+    working_hours = None if any_time else _working_hours(hours, weekends, ctx.obj['tz'])
+    
+    agent = _create_agent(ctx)
+    try:
+        with console.status("🗓️  Consultando disponibilidade..."):
+            slots = agent.find_free_slots(duration, days, ('primary',) + attendees, working_hours)
+    except Exception as e:
+        console.print(f"[red]❌ Erro ao consultar disponibilidade: {str(e)}[/red]")
+        sys.exit(1)
+    
+    if not slots:
+        console.print(f"Nenhum horário livre de {duration} min nos próximos {days} dias.")
+        return
+    
+    weekdays = ('seg', 'ter', 'qua', 'qui', 'sex', 'sáb', 'dom')
+    by_day = {}
+    for start, end in slots:
+        until = f"{end:%H:%M}" if end.date() == start.date() else f"{end:%d/%m %H:%M}"
+        by_day.setdefault(start.date(), []).append(f"{start:%H:%M}–{until}")
+    for day, ranges in by_day.items():
+        console.print(f"[bold]{weekdays[day.weekday()]} {day:%d/%m}[/bold]: {', '.join(ranges)}")
+
+
+@main.command('calendar-stats')
+@click.option('--days', default=90, show_default=True, help='Dias analisados, até hoje')
+@click.option('--ahead', is_flag=True, help='Analisa os próximos dias em vez dos últimos')
+@click.option('--hours', default='09:00-18:00', show_default=True, help='Expediente (HH:MM-HH:MM)')
+@click.option('--weekends', is_flag=True, help='Inclui sábados e domingos no expediente')
+@click.option('--focus', default=120, show_default=True, help='Menor bloco livre que conta como foco, em minutos')
+@click.option('--gap', default=5, show_default=True, help='Maior intervalo entre reuniões em sequência, em minutos')
+@click.option('--top', default=5, show_default=True, help='Organizadores listados')
+@click.option('--json', 'as_json', is_flag=True, help='Imprime os agregados em JSON')
+@click.pass_context
+def calendar_stats(ctx, days, ahead, hours, weekends, focus, gap, top, as_json):
+    """Carga de reuniões, sequências, fragmentação e foco (calculados localmente com NumPy)."""
+    working_hours = _working_hours(hours, weekends, ctx.obj['tz'])
+    agent = _create_agent(ctx)
+    try:
+        with console.status("📊 Analisando a agenda..."):
+            stats = agent.calendar_stats(days, ahead, working_hours, focus, gap, top)
+    except ImportError as e:
+        console.print(f"[red]❌ {str(e)}[/red]")
+        sys.exit(1)
+    except Exception as e:
+        console.print(f"[red]❌ Erro ao analisar a agenda: {str(e)}[/red]")
+        sys.exit(1)
+    
+    if as_json:
+        import json
+        
+        click.echo(json.dumps(stats.as_dict(), ensure_ascii=False, indent=2))
+        return
+    
+    console.print(stats.summary())
+    if stats.meetings:
+        peak = max(week_hours for _, week_hours in stats.weekly) or 1
+        console.print("\n[bold]Horas de reunião por semana[/bold]")
+        for monday, week_hours in stats.weekly:
+            console.print(f"  {monday:%d/%m}  {'█' * round(week_hours / peak * 30):<30} {week_hours:5.1f} h")
+
+
+@main.group()
+@click.option('--registry', default='accounts.json', show_default=True, envvar='GMAIL_ASSISTANT_ACCOUNTS',
+              help='Arquivo JSON com as contas da implantação')
+@click.pass_context
+def accounts(ctx, registry):
+    """Gerencia e processa várias contas de uma vez."""
+    ctx.obj['registry'] = registry
+
+
+@accounts.command('add')
+@click.argument('name')
+@click.option('--token', 'token_file', help='Arquivo do token da conta (padrão: tokens/NOME.json)')
+@click.option('--emails', 'max_emails', default=50, show_default=True, help='E-mails lidos por execução')
+@click.option('--events', 'max_events', default=10, show_default=True, help='Eventos lidos por execução')
+@click.option('--query', '-q', help='Busca na sintaxe do Gmail aplicada à leitura')
+@click.option('--concurrency', default=1, show_default=True, help='Etapas desta conta rodando ao mesmo tempo')
+@click.pass_context
+def accounts_add(ctx, name, token_file, max_emails, max_events, query, concurrency):
+    """Registra uma conta e autoriza o acesso a ela."""
+    from .accounts import Account, AccountRegistry
+    from .agent import SCOPES
+    from .auth import CredentialProvider
+    
+    registry = AccountRegistry.load(ctx.obj['registry'])
+    if name in registry:
+        console.print(f"[red]❌ Conta já registrada: {name}[/red]")
+        sys.exit(1)
+    token_file = token_file or os.path.join('tokens', f'{name}.json')
+    os.makedirs(os.path.dirname(token_file) or '.', exist_ok=True)
+    try:
+        with console.status(f"🔐 Autorizando {name}..."):
+            CredentialProvider(token_file, ctx.obj['credentials'], list(SCOPES)).get()
+    except Exception as e:
+        console.print(f"[red]❌ Erro na autenticação: {str(e)}[/red]")
+        sys.exit(1)
+    registry.add(Account(name, token_file, credentials_file=ctx.obj['credentials'], max_emails=max_emails,
+                         max_events=max_events, query=query, max_concurrency=concurrency))
+    registry.save(ctx.obj['registry'])
+    console.print(f"[green]✅ Conta {name} registrada[/green] ({token_file})")
+
+
+@accounts.command('list')
+@click.pass_context
+def accounts_list(ctx):
+    """Lista as contas registradas."""
+    from .accounts import AccountRegistry
+    
+    registry = AccountRegistry.load(ctx.obj['registry'])
+    if not registry:
+        console.print("Nenhuma conta registrada. Use [bold]gmail-assistant accounts add NOME[/bold].")
+        return
+    for account in registry:
+        query = f", busca: {account.query}" if account.query else ''
+        console.print(f"👤 [bold]{account.name}[/bold] [dim]({account.token_file}; {account.max_emails} e-mails, "
+                      f"{account.max_events} eventos{query})[/dim]")
+
+
+@accounts.command('run')
+@click.option('--processes', default=4, show_default=True, help='Processos no pool')
+@click.option('--body/--no-body', default=False, show_default=True,
+              help='Lê o corpo completo (sem ele, só cabeçalhos e snippet)')
+@click.pass_context
+def accounts_run(ctx, processes, body):
+    """Lê e-mails e eventos de todas as contas em paralelo e mostra a vazão."""
+    from .accounts import AccountRegistry, AccountScheduler
+    
+    registry = AccountRegistry.load(ctx.obj['registry'])
+    if not registry:
+        console.print("Nenhuma conta registrada. Use [bold]gmail-assistant accounts add NOME[/bold].")
+        return
+    
+    def show(result):
+        label = 'e-mails' if result['stage'] == 'gmail' else 'eventos'
+        if result['error']:
+            console.print(f"[red]⚠️  {result['account']} ({label}): {result['error']}[/red]")
+        else:
+            failed = sum(1 for item in result['items'] if 'error' in item)
+            errors = f" [red]({failed} com erro)[/red]" if failed else ''
+            console.print(f"✅ {result['account']}: {len(result['items']) - failed} {label}{errors} "
+                          f"[dim]({result['elapsed']:.1f} s)[/dim]")
+    
+    report = AccountScheduler(registry, processes=processes, include_body=body).run(on_result=show)
+    console.print(f"\n📊 {report.summary()}")
+
+
+@main.command()
+def setup():
+    """Mostra o guia de configuração."""
+    from rich.markdown import Markdown
+    
+    guide = """
+# ⚙️ Configuração do Gmail AI Assistant
+
+## 1. Google Cloud Console
+1. Acesse https://console.cloud.google.com/ e crie um projeto
+2. Ative a **Gmail API** e a **Google Calendar API**
+3. Crie credenciais OAuth 2.0 (Aplicativo para computador)
+4. Baixe o arquivo `credentials.json` para a pasta atual
+
+## 2. Gemini API
+1. Crie uma API Key em https://makersuite.google.com/app/apikey
+2. Configure a variável de ambiente: `export GEMINI_API_KEY="sua_chave"`
+
+## 3. Teste
+```bash
+gmail-assistant emails --max 3
+gmail-assistant analyze "Resuma meu dia"
+```
+"""
+    console.print(Markdown(guide))
+    
+    if os.path.exists('credentials.json'):
+        console.print("[green]✅ credentials.json encontrado[/green]")
+    else:
+        console.print("[yellow]⚠️  credentials.json não encontrado na pasta atual[/yellow]")
+    
+    if os.getenv('GEMINI_API_KEY'):
+        console.print("[green]✅ GEMINI_API_KEY configurada[/green]")
+    else:
+        console.print("[yellow]⚠️  GEMINI_API_KEY não configurada[/yellow]")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""
+Construção rápida e preguiçosa dos serviços do Google a partir de documentos
+de descoberta reduzidos e guardados em disco
+"""
+
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+
+# googleapiclient é importado dentro das funções: com LazyService, quem não usa
+# a API (--help, setup) não paga o import
+
+
+# Recursos e métodos realmente usados pelo pacote; o resto do documento é descartado
+USED_RESOURCES = {
+    ('gmail', 'v1'): ('users.getProfile', 'users.messages', 'users.threads', 'users.history'),
+    ('calendar', 'v3'): ('events', 'calendarList', 'calendars', 'freebusy'),
+}
+
+_documents: Dict[Tuple[str, str], str] = {}
+_documents_lock = threading.Lock()
+
+
+def default_cache_dir() -> str:
+    """Pasta do cache de documentos (GMAIL_ASSISTANT_DISCOVERY_CACHE ou ~/.cache)."""
+    path = os.getenv('GMAIL_ASSISTANT_DISCOVERY_CACHE')
+    if path:
+        return path
+    base = os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'gmail-ai-assistant', 'discovery')
+
+
+def _collect_refs(node: Any, refs: Set[str]):
+    """Junta os nomes de schema referenciados ($ref) em qualquer ponto de node."""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            ref = node.get('$ref')
+            if isinstance(ref, str):
+                refs.add(ref)
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+
+
+def prune_document(document: Dict[str, Any], paths: Iterable[str]) -> Dict[str, Any]:
+    """
+    Reduz um documento de descoberta aos recursos/métodos em paths.
+    
+    Cada caminho é separado por pontos ('users.messages'); o último nome pode ser
+    um recurso (mantido inteiro) ou um método. Só os schemas alcançáveis a
+    partir do que ficou são mantidos.
+    """
+    pruned = {key: value for key, value in document.items() if key not in ('resources', 'methods', 'schemas')}
+    for path in paths:
+        *parents, name = path.split('.')
+        source, target = document, pruned
+        for parent in parents:
+            source = source['resources'][parent]
+            target = target.setdefault('resources', {}).setdefault(parent, {})
+        if name in source.get('methods', {}):
+            target.setdefault('methods', {})[name] = source['methods'][name]
+        else:
+            target.setdefault('resources', {})[name] = source['resources'][name]
+    
+    schemas = document.get('schemas', {})
+    pending: Set[str] = set()
+    _collect_refs(pruned, pending)
+    kept: Dict[str, Any] = {}
+    while pending:
+        name = pending.pop()
+        if name in kept or name not in schemas:
+            continue
+        kept[name] = schemas[name]
+        _collect_refs(schemas[name], pending)
+    pruned['schemas'] = kept
+    return pruned
+
+
+def _write_atomic(path: str, text: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+
+def load_document(api: str, version: str, cache_dir: Optional[str] = None) -> Optional[str]:
+    """
+    Retorna o documento de descoberta reduzido (JSON), ou None se não houver um estático.
+    
+    Ordem: memória do processo, arquivo no cache em disco e, por fim, o documento
+    estático que acompanha o google-api-python-client, reduzido e gravado no
+    cache. O nome do arquivo inclui a versão da biblioteca, então atualizá-la
+    invalida o cache.
+    """
+    key = (api, version)
+    with _documents_lock:
+        if key in _documents:
+            return _documents[key]
+        
+        from googleapiclient.version import __version__ as client_version
+        
+        path = os.path.join(cache_dir or default_cache_dir(), f'{api}.{version}.{client_version}.json')
+        try:
+            with open(path, encoding='utf-8') as f:
+                text = f.read()
+        except OSError:
+            from googleapiclient.discovery_cache import get_static_doc
+            
+            static = get_static_doc(api, version)
+            if static is None:
+                return None
+            paths = USED_RESOURCES.get(key)
+            text = json.dumps(prune_document(json.loads(static), paths), separators=(',', ':')) if paths else static
+            try:
+                _write_atomic(path, text)
+            except OSError:
+                pass  # Sem permissão de escrita: o documento fica só na memória
+        _documents[key] = text
+        return text
+
+
+def build_service(api: str, version: str, credentials=None, cache_dir: Optional[str] = None):
+    """
+    Constrói um serviço da API do Google, como googleapiclient.discovery.build.
+    
+    Usa o documento reduzido de load_document; sem documento estático, cai no
+    build() normal.
+    """
+    from googleapiclient.discovery import build, build_from_document
+    
+    text = load_document(api, version, cache_dir)
+    if text is None:
+        return build(api, version, credentials=credentials)
+    # build_from_document altera o documento recebido: cada serviço ganha sua cópia
+    return build_from_document(json.loads(text), credentials=credentials)
+
+
+class LazyService:
+    """
+    Serviço construído só no primeiro uso.
+    
+    Repassa qualquer atributo ao serviço real, então pode substituir o
+    resultado de build() onde ele era esperado. Assim um comando que só lê
+    e-mails nunca monta o cliente do Calendar.
+    """
+    
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._service = None
+        self._lock = threading.Lock()
+    
+    @property
+    def built(self) -> bool:
+        """Indica se o serviço real já foi construído."""
+        return self._service is not None
+    
+    def __getattr__(self, name: str) -> Any:
+        service = self._service
+        if service is None:
+            with self._lock:
+                if self._service is None:
+                    self._service = self._factory()
+                service = self._service
+        return getattr(service, name)
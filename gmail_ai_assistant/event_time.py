@@ -0,0 +1,171 @@
+"""
+Horários dos eventos: início e fim em segundos desde a época, fusos em cache
+e a formatação para exibição só quando ela é pedida
+"""
+
+import sys
+from datetime import date, datetime, time, timedelta, tzinfo
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python 3.8
+    try:
+        from backports.zoneinfo import ZoneInfo
+    except ImportError:
+        ZoneInfo = None
+
+# Antes do 3.11, fromisoformat não aceita o sufixo 'Z' que a API usa em UTC
+_ACCEPTS_Z = sys.version_info >= (3, 11)
+
+# (início, fim, dia inteiro) de um evento
+EventTimes = Tuple[float, float, bool]
+
+# Meia-noite de 01/01/1970, ingênua: dias contados desde a época viram datas
+_EPOCH = datetime(1970, 1, 1)
+
+
+@lru_cache(maxsize=None)
+def get_zone(name: Optional[str]) -> Optional[tzinfo]:
+    """
+    Fuso IANA ('America/Sao_Paulo') em cache, criado uma vez por nome.
+    
+    None, um nome desconhecido ou um Python sem zoneinfo retornam None, que
+    aqui significa o fuso local do sistema (com horário de verão).
+    """
+    if name is None or ZoneInfo is None:
+        return None
+    try:
+        return ZoneInfo(name)
+    except (KeyError, ValueError):
+        return None
+
+
+def check_zone(name: Optional[str]) -> Optional[str]:
+    """
+    Valida um nome de fuso do usuário e o retorna.
+    
+    get_zone trata um nome desconhecido como o fuso local; aqui ele levanta
+    ValueError, para um erro de digitação não passar despercebido.
+    """
+    if name is not None and get_zone(name) is None:
+        if ZoneInfo is None:
+            raise ValueError(f"Fuso horário {name} indisponível: instale backports.zoneinfo (Python 3.8)")
+        raise ValueError(f"Fuso horário desconhecido: {name} (use um nome IANA, ex.: America/Sao_Paulo)")
+    return name
+
+
+def parse_datetime(value: str, zone: Optional[str] = None) -> float:
+    """
+    Segundos desde a época de um dateTime RFC 3339 da API.
+    
+    As respostas trazem o deslocamento; sem ele, o horário vale no fuso zone
+    (o timeZone do evento), como a API interpreta.
+    """
+    if not _ACCEPTS_Z and value[-1] == 'Z':
+        value = value[:-1] + '+00:00'
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None and zone is not None:
+        tz = get_zone(zone)
+        if tz is not None:
+            moment = moment.replace(tzinfo=tz)
+    return moment.timestamp()
+
+
+@lru_cache(maxsize=4096)
+def date_epoch(value: str, zone: Optional[str] = None) -> float:
+    """Meia-noite da data 'AAAA-MM-DD' no fuso (None = local); os eventos de um dia repetem a data."""
+    day = date.fromisoformat(value)
+    tz = get_zone(zone)
+    if tz is None:
+        return datetime.combine(day, time()).timestamp()
+    return datetime.combine(day, time(), tz).timestamp()
+
+
+def event_times(event: Dict[str, Any], zone: Optional[str] = None) -> EventTimes:
+    """
+    (início, fim, dia inteiro) de um evento no formato da API.
+    
+    Eventos de dia inteiro são "flutuantes": a data vale no fuso zone do usuário
+    (None = local), onde quer que ele esteja; um dateTime sem deslocamento vale
+    no timeZone do próprio evento.
+    """
+    start, end = event['start'], event['end']
+    if 'dateTime' in start:
+        return (parse_datetime(start['dateTime'], start.get('timeZone')),
+                parse_datetime(end['dateTime'], end.get('timeZone')), False)
+    return date_epoch(start['date'], zone), date_epoch(end['date'], zone), True
+
+
+def normalize_events(events: Iterable[Dict[str, Any]], zone: Optional[str] = None) -> List[EventTimes]:
+    """
+    event_times de vários eventos de uma vez, com as buscas feitas fora do laço.
+    
+    Reuniões começam e terminam quase sempre nas mesmas horas cheias e meias:
+    cada texto com deslocamento é interpretado uma vez por chamada.
+    """
+    day = date_epoch
+    parsed: Dict[str, float] = {}
+    
+    def parse(value: Dict[str, str]) -> float:
+        text = value['dateTime']
+        result = parsed.get(text)
+        if result is None:
+            result = parse_datetime(text, value.get('timeZone'))
+            if text[-1] == 'Z' or text[-6] in '+-':
+                parsed[text] = result
+        return result
+    
+    result = []
+    append = result.append
+    for event in events:
+        start, end = event['start'], event['end']
+        if 'dateTime' in start:
+            append((parse(start), parse(end), False))
+        else:
+            append((day(start['date'], zone), day(end['date'], zone), True))
+    return result
+
+
+@lru_cache(maxsize=4096)
+def _day_offset(zone: Optional[str], day: int) -> Optional[float]:
+    """
+    Deslocamento do fuso (s) durante todo o dia UTC day, ou None se ele muda no dia.
+    
+    Os eventos de um dia repetem o mesmo deslocamento: uma conversão de fuso
+    por dia em vez de uma por evento.
+    """
+    tz = get_zone(zone)
+    first, last = day * 86400, day * 86400 + 86399
+    if tz is not None:
+        offsets = {datetime.fromtimestamp(first, tz).utcoffset(), datetime.fromtimestamp(last, tz).utcoffset()}
+        return next(iter(offsets)).total_seconds() if len(offsets) == 1 else None
+    # Sem tz, o relógio local ingênuo: o deslocamento é a diferença para UTC
+    offsets = {(datetime.fromtimestamp(moment) - _EPOCH).total_seconds() - moment for moment in (first, last)}
+    return offsets.pop() if len(offsets) == 1 else None
+
+
+@lru_cache(maxsize=4096)
+def _date_text(day: int) -> str:
+    """'DD/MM/AAAA' do dia day, contado desde 01/01/1970."""
+    return (_EPOCH + timedelta(days=day)).strftime('%d/%m/%Y')
+
+
+@lru_cache(maxsize=1440)
+def _clock_text(minute: int) -> str:
+    """'HH:MM' do minute-ésimo minuto do dia."""
+    return f'{minute // 60:02d}:{minute % 60:02d}'
+
+
+def display_time(start: float, all_day: bool, zone: Optional[str] = None) -> str:
+    """Texto exibido para o início de um evento, no fuso zone (None = local)."""
+    offset = _day_offset(zone, int(start // 86400))
+    if offset is None:
+        # Dia de mudança de horário: a conversão exata, evento a evento
+        moment = datetime.fromtimestamp(start, get_zone(zone))
+        return moment.strftime('%d/%m/%Y (dia inteiro)' if all_day else '%d/%m/%Y às %H:%M')
+    day, seconds = divmod(int((start + offset) // 1), 86400)
+    if all_day:
+        return _date_text(day) + ' (dia inteiro)'
+    return _date_text(day) + ' às ' + _clock_text(seconds // 60)
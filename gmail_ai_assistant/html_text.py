@@ -0,0 +1,120 @@
+"""
+Conversão de HTML em texto simples para e-mails sem parte text/plain
+"""
+
+import re
+from html.parser import HTMLParser
+from typing import List, Optional
+
+
+# Conteúdo dessas tags nunca é texto visível
+SKIP_TAGS = frozenset({'script', 'style', 'head', 'title', 'noscript', 'template', 'svg', 'object'})
+
+# Tags que quebram a linha no texto final
+BLOCK_TAGS = frozenset({
+    'p', 'div', 'br', 'hr', 'li', 'ul', 'ol', 'tr', 'table', 'section', 'article', 'header',
+    'footer', 'blockquote', 'pre', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+})
+
+# Células de tabela viram texto separado por espaço
+CELL_TAGS = frozenset({'td', 'th'})
+
+# Tamanho dos blocos entregues ao parser: permite parar cedo ao atingir o limite
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r'\s+')
+_BLANK_LINES = re.compile(r'\n\s*\n+')
+
+
+class _TextExtractor(HTMLParser):
+    """Parser incremental que acumula só o texto visível, até max_chars."""
+    
+    def __init__(self, max_chars: Optional[int] = None):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.pieces: List[str] = []
+        self.length = 0
+        self.done = False
+        self._skip_depth = 0
+    
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._newline()
+        elif tag == 'img':
+            self._image(dict(attrs))
+    
+    def handle_startendtag(self, tag, attrs):
+        # Tags como <br/> e <img/> não têm fechamento nem conteúdo
+        if tag in BLOCK_TAGS:
+            self._newline()
+        elif tag == 'img':
+            self._image(dict(attrs))
+    
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif tag in BLOCK_TAGS:
+            self._newline()
+        elif tag in CELL_TAGS and self.pieces and self.pieces[-1][-1:] not in (' ', '\n'):
+            self._append(' ')
+    
+    def handle_data(self, data):
+        if self._skip_depth or self.done:
+            return
+        text = _WHITESPACE.sub(' ', data)
+        if text == ' ' and (not self.pieces or self.pieces[-1][-1:] in (' ', '\n')):
+            return
+        self._append(text)
+    
+    def _image(self, attrs):
+        """Usa o texto alternativo de imagens reais; pixels de rastreamento são ignorados."""
+        if attrs.get('width') in ('0', '1') or attrs.get('height') in ('0', '1'):
+            return
+        alt = (attrs.get('alt') or '').strip()
+        if alt and not self._skip_depth:
+            self._append(f'[{alt}] ')
+    
+    def _newline(self):
+        if self.pieces and self.pieces[-1] != '\n':
+            self._append('\n')
+    
+    def _append(self, text: str):
+        if self.done:
+            return
+        if self.max_chars is not None and self.length + len(text) >= self.max_chars:
+            text = text[:self.max_chars - self.length]
+            self.done = True
+        self.pieces.append(text)
+        self.length += len(text)
+    
+    def text(self) -> str:
+        text = ''.join(self.pieces)
+        text = '\n'.join(line.strip() for line in text.split('\n'))
+        return _BLANK_LINES.sub('\n\n', text).strip()
+
+
+def html_to_text(html: str, max_chars: Optional[int] = None) -> str:
+    """
+    Converte HTML em texto simples.
+    
+    Remove scripts, estilos e pixels de rastreamento, troca blocos por quebras
+    de linha e junta espaços em branco. O HTML é entregue ao parser em blocos,
+    que para assim que o texto atinge max_chars.
+    
+    Args:
+        html: Documento ou fragmento HTML
+        max_chars: Tamanho máximo do texto gerado (None = sem limite)
+    
+    Returns:
+        O texto visível do HTML
+    """
+    parser = _TextExtractor(max_chars)
+    for start in range(0, len(html), CHUNK_SIZE):
+        parser.feed(html[start:start + CHUNK_SIZE])
+        if parser.done:
+            break
+    else:
+        parser.close()
+    return parser.text()
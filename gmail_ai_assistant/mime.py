@@ -0,0 +1,278 @@
+"""
+Extração do corpo de mensagens a partir do payload JSON da API do Gmail ou
+dos bytes RFC 822 do formato 'raw'
+"""
+
+import base64
+import binascii
+import codecs
+import re
+from email import policy
+from email.errors import HeaderParseError
+from email.header import decode_header, make_header
+from email.message import Message
+from email.parser import BytesParser
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple, Union
+
+from .html_text import html_to_text
+
+
+NO_BODY = '(Sem corpo de texto)'
+
+# Marcação ocupa boa parte de um HTML: decodifica mais bytes para render max_bytes de texto
+HTML_BUDGET_FACTOR = 8
+
+# Sem charset declarado (ou com um desconhecido): UTF-8 e, se não for válido, Windows-1252
+FALLBACK_CHARSET = 'cp1252'
+
+# Rótulos que os clientes usam para o que na prática é outra codificação: e-mails
+# "iso-8859-1" costumam trazer aspas curvas do Windows, e "us-ascii" esconde UTF-8
+CHARSET_ALIASES = {
+    'iso-8859-1': 'cp1252',
+    'iso8859-1': 'cp1252',
+    'latin1': 'cp1252',
+    'latin-1': 'cp1252',
+    'us-ascii': 'utf-8',
+    'ascii': 'utf-8',
+}
+
+# Codificações de 8 bits que aceitam qualquer byte: UTF-8 rotulado assim (comum) só
+# é detectado tentando UTF-8 antes, já que texto Latin-1 quase nunca é UTF-8 válido
+_UTF8_FIRST = frozenset({'cp1252', 'iso8859-15'})
+
+_FOLDING = re.compile(r'\r?\n[ \t]+')
+
+_CHARSET_PARAM = re.compile(r'charset\s*=\s*"?([^";\s]+)', re.IGNORECASE)
+
+Bytes = Union[bytes, bytearray, memoryview]
+
+# compat32 mantém os cabeçalhos como texto simples, sem montar os objetos de
+# cabeçalho da política padrão: só os poucos que usamos são decodificados
+RAW_POLICY = policy.compat32
+
+
+def find_text_parts(payload: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Percorre a árvore MIME sem recursão e retorna (text/plain, text/html).
+    
+    A busca é em profundidade e na ordem do documento, então cada tipo fica com a
+    primeira parte com conteúdo. Partes com nome de arquivo são anexos e não
+    contam como corpo. A busca para assim que encontra um text/plain, o tipo
+    preferido.
+    """
+    html = None
+    stack = [payload]
+    while stack:
+        part = stack.pop()
+        children = part.get('parts')
+        if children:
+            # Empilha ao contrário para visitar os filhos na ordem original
+            stack.extend(reversed(children))
+            continue
+        if part.get('filename') or not part.get('body', {}).get('data'):
+            continue
+        mime_type = part.get('mimeType', '')
+        if mime_type == 'text/plain':
+            return part, html
+        if mime_type == 'text/html' and html is None:
+            html = part
+    return None, html
+
+
+def decode_base64url(data: str, max_bytes: Optional[int] = None) -> Bytes:
+    """
+    Decodifica dados base64url, opcionalmente só o prefixo necessário para max_bytes.
+    
+    Cada 4 caracteres codificam 3 bytes, então basta decodificar os primeiros
+    ceil(max_bytes / 3) * 4 caracteres em vez da parte inteira. O corte final
+    é uma memoryview, sem copiar os bytes.
+    """
+    if max_bytes is not None:
+        data = data[:-(-max_bytes // 3) * 4]
+    padding = -len(data) % 4
+    if padding:
+        data += '=' * padding
+    decoded = base64.urlsafe_b64decode(data)
+    return decoded if max_bytes is None else memoryview(decoded)[:max_bytes]
+
+
+def part_header(part: Dict[str, Any], name: str) -> Optional[str]:
+    """Valor de um cabeçalho da parte (sem diferenciar maiúsculas), ou None."""
+    name = name.lower()
+    for header in part.get('headers') or ():
+        if header.get('name', '').lower() == name:
+            return header.get('value')
+    return None
+
+
+def content_charset(content_type: Optional[str]) -> Optional[str]:
+    """Extrai o parâmetro charset de um cabeçalho Content-Type."""
+    if not content_type:
+        return None
+    match = _CHARSET_PARAM.search(content_type)
+    return match.group(1).strip("'").lower() if match else None
+
+
+@lru_cache(maxsize=64)
+def _codec(charset: Optional[str]) -> Optional[codecs.CodecInfo]:
+    """Resolve um charset declarado para um codec (None se ausente ou desconhecido)."""
+    if not charset:
+        return None
+    charset = charset.lower()
+    try:
+        return codecs.lookup(CHARSET_ALIASES.get(charset, charset))
+    except LookupError:
+        return None
+
+
+def _decode(data: Bytes, codec: codecs.CodecInfo, errors: str, final: bool) -> str:
+    # O decodificador incremental aceita memoryview sem copiar e, com final=False,
+    # guarda um caractere multibyte cortado pelo limite em vez de falhar
+    return codec.incrementaldecoder(errors).decode(data, final)
+
+
+def undo_transfer_encoding(data: Bytes, transfer_encoding: Optional[str]) -> Bytes:
+    """Desfaz quoted-printable e base64; 7bit, 8bit e binary passam direto."""
+    encoding = (transfer_encoding or '').strip().lower()
+    if encoding == 'quoted-printable':
+        return binascii.a2b_qp(data)
+    if encoding == 'base64':
+        return binascii.a2b_base64(data)
+    return data
+
+
+def decode_text(data: Bytes, charset: Optional[str] = None, transfer_encoding: Optional[str] = None,
+                final: bool = True) -> str:
+    """
+    Decodifica o conteúdo de uma parte de texto.
+    
+    Desfaz o Content-Transfer-Encoding (quoted-printable ou base64; 7bit, 8bit e
+    binary passam direto) e decodifica com o charset declarado. Se os bytes não
+    forem válidos nele, ou se não houver charset, tenta UTF-8 e por fim
+    Windows-1252, que cobre o Latin-1 dos e-mails antigos em português. Para
+    rótulos Latin-1/Windows-1252, UTF-8 é tentado primeiro (rótulo errado é comum).
+    
+    Args:
+        data: Bytes da parte (bytes, bytearray ou memoryview)
+        charset: Parâmetro charset do Content-Type
+        transfer_encoding: Valor do Content-Transfer-Encoding
+        final: False quando data é só um prefixo (um caractere cortado no fim é descartado)
+    """
+    data = undo_transfer_encoding(data, transfer_encoding)
+    declared = _codec(charset)
+    utf8 = _codec('utf-8')
+    if declared is None or declared.name in _UTF8_FIRST:
+        candidates = (utf8, declared)
+    else:
+        candidates = (declared, utf8)
+    for codec in candidates:
+        if codec is None:
+            continue
+        try:
+            return _decode(data, codec, 'strict', final)
+        except UnicodeDecodeError:
+            pass
+    return _decode(data, _codec(FALLBACK_CHARSET), 'replace', final)
+
+
+def _decode_part(part: Dict[str, Any], max_bytes: Optional[int]) -> str:
+    """Decodifica o corpo de uma parte do payload JSON respeitando o charset dela."""
+    raw = decode_base64url(part['body']['data'], max_bytes)
+    charset = content_charset(part_header(part, 'Content-Type'))
+    # O Gmail já entrega body.data sem o Content-Transfer-Encoding: só o charset se aplica
+    return decode_text(raw, charset, final=max_bytes is None or len(raw) < max_bytes)
+
+
+def extract_body(payload: Dict[str, Any], max_bytes: Optional[int] = None) -> str:
+    """
+    Extrai o corpo de texto de um payload, preferindo text/plain a text/html.
+    
+    Partes HTML são convertidas em texto simples (ver html_text.html_to_text).
+    O charset vem do Content-Type de cada parte (ver decode_text).
+    
+    Args:
+        payload: Campo 'payload' de uma mensagem no formato 'full'
+        max_bytes: Limite de bytes decodificados (None decodifica a parte inteira)
+    
+    Returns:
+        O texto do corpo, ou NO_BODY se a mensagem não tiver parte de texto
+    """
+    plain, html = find_text_parts(payload)
+    if plain is not None:
+        return _decode_part(plain, max_bytes)
+    if html is not None:
+        html_bytes = None if max_bytes is None else max_bytes * HTML_BUDGET_FACTOR
+        markup = _decode_part(html, html_bytes)
+        return html_to_text(markup, max_bytes) or NO_BODY
+    return NO_BODY
+
+
+def parse_raw(raw: Union[str, bytes]) -> Message:
+    """
+    Interpreta uma mensagem no formato 'raw' (RFC 822).
+    
+    Args:
+        raw: Campo 'raw' da API (base64url) ou os bytes da mensagem
+    """
+    if isinstance(raw, str):
+        raw = decode_base64url(raw)
+    return BytesParser(policy=RAW_POLICY).parsebytes(raw)
+
+
+def raw_header(message: Message, name: str) -> Optional[str]:
+    """Valor de um cabeçalho com as palavras codificadas (RFC 2047) já decodificadas."""
+    if name not in message:
+        return None
+    # Lido direto da lista de cabeçalhos: bytes 8-bit não declarados ficam como
+    # surrogates e passam pelos mesmos fallbacks de charset do corpo
+    value = next(value for key, value in message.raw_items() if key.lower() == name.lower())
+    value = _FOLDING.sub(' ', value).strip()
+    if not value.isascii():
+        return decode_text(value.encode('ascii', 'surrogateescape'))
+    try:
+        return str(make_header(decode_header(value)))
+    except (HeaderParseError, UnicodeError, LookupError, binascii.Error):
+        return value
+
+
+def find_raw_text_parts(message: Message) -> Tuple[Optional[Message], Optional[Message]]:
+    """Como find_text_parts, para uma mensagem interpretada por parse_raw."""
+    html = None
+    for part in message.walk():
+        if part.is_multipart() or part.get_filename():
+            continue
+        content_type = part.get_content_type()
+        if content_type == 'text/plain':
+            return part, html
+        if content_type == 'text/html' and html is None:
+            html = part
+    return None, html
+
+
+def _decode_raw_part(part: Message, max_bytes: Optional[int]) -> str:
+    """Decodifica uma parte RFC 822 com o seu Content-Transfer-Encoding e charset."""
+    # decode=True desfaz o Content-Transfer-Encoding e devolve os bytes originais;
+    # o charset fica por conta de decode_text, com os mesmos fallbacks do JSON
+    data = part.get_payload(decode=True) or b''
+    final = max_bytes is None or len(data) <= max_bytes
+    if not final:
+        data = memoryview(data)[:max_bytes]
+    return decode_text(data, part.get_content_charset(), final=final)
+
+
+def extract_body_raw(message: Message, max_bytes: Optional[int] = None) -> str:
+    """
+    Extrai o corpo de texto de uma mensagem RFC 822, como extract_body.
+    
+    Args:
+        message: Mensagem retornada por parse_raw
+        max_bytes: Limite de bytes decodificados (None decodifica a parte inteira)
+    """
+    plain, html = find_raw_text_parts(message)
+    if plain is not None:
+        return _decode_raw_part(plain, max_bytes)
+    if html is not None:
+        html_bytes = None if max_bytes is None else max_bytes * HTML_BUDGET_FACTOR
+        return html_to_text(_decode_raw_part(html, html_bytes), max_bytes) or NO_BODY
+    return NO_BODY
@@ -0,0 +1,229 @@
+"""
+Limite de cota e novas tentativas para as chamadas às APIs do Google
+"""
+
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+# Unidades de cota do Gmail por método (tabela "Usage limits" da API)
+GMAIL_QUOTA_UNITS = {
+    'getProfile': 1,
+    'history.list': 2,
+    'messages.list': 5,
+    'messages.get': 5,
+    'messages.attachments.get': 5,
+    'threads.list': 10,
+    'threads.get': 10,
+}
+
+# Limites por usuário: 250 unidades/s no Gmail, 600 consultas/min no Calendar.
+# GMAIL_ASSISTANT_QUOTA sobrescreve o do Gmail (ex.: 'inf' desativa o limitador)
+GMAIL_UNITS_PER_SECOND = float(os.environ.get('GMAIL_ASSISTANT_QUOTA', 250))
+CALENDAR_QUERIES_PER_SECOND = 10
+
+# Métodos que não estão na tabela custam uma unidade
+DEFAULT_UNITS = 1
+
+
+class QuotaLimiter:
+    """
+    Balde de fichas compartilhado, medido em unidades de cota.
+    
+    Enche a units_per_second até burst unidades; acquire() cobra a chamada
+    inteira e espera até o saldo voltar a zero. Todas as threads que usam o
+    mesmo limitador dividem a mesma cota, então juntas nunca passam do teto.
+    """
+    
+    def __init__(self, units_per_second: float = GMAIL_UNITS_PER_SECOND, burst: Optional[float] = None,
+                 units: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            units_per_second: Unidades liberadas por segundo (inf desativa o limite)
+            burst: Unidades acumuláveis (padrão: um segundo de cota)
+            units: Custo por método (padrão: GMAIL_QUOTA_UNITS)
+        """
+        self.units_per_second = units_per_second
+        self.burst = units_per_second if burst is None else burst
+        self.units = GMAIL_QUOTA_UNITS if units is None else units
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def cost(self, method: str, count: int = 1) -> float:
+        """Unidades de count chamadas do método."""
+        return self.units.get(method, DEFAULT_UNITS) * count
+    
+    def acquire(self, units: float):
+        """Consome units unidades, esperando o balde encher se preciso."""
+        if self.units_per_second == float('inf'):
+            return
+        # Um lote maior que o balde é cobrado inteiro: o saldo fica negativo e a
+        # espera cobre a parte que passou do balde
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.units_per_second)
+            self._updated = now
+            self._tokens -= units
+            wait = -self._tokens / self.units_per_second if self._tokens < 0 else 0.0
+        # A dívida fica registrada: quem chega depois espera atrás desta chamada
+        if wait > 0:
+            time.sleep(wait)
+
+
+_limiters: Dict[Tuple[str, str], QuotaLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def shared_limiter(api: str = 'gmail', account: str = '') -> QuotaLimiter:
+    """
+    Limitador do processo para a API ('gmail' ou 'calendar') e a conta.
+    
+    A cota é por usuário: ferramentas da mesma conta dividem o limitador,
+    contas diferentes têm cada uma o seu.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get((api, account))
+        if limiter is None:
+            if api == 'calendar':
+                limiter = QuotaLimiter(CALENDAR_QUERIES_PER_SECOND, units={})
+            else:
+                limiter = QuotaLimiter(GMAIL_UNITS_PER_SECOND)
+            _limiters[api, account] = limiter
+        return limiter
+
+
+def http_status(error: Exception) -> Optional[int]:
+    """Retorna o status HTTP de um HttpError do googleapiclient (ou None)."""
+    status = getattr(getattr(error, 'resp', None), 'status', None)
+    return int(status) if status is not None else None
+
+
+def is_retryable(error: Exception) -> bool:
+    """Erros temporários: 429, 403 por limite de taxa, 5xx e falhas de conexão."""
+    status = http_status(error)
+    if status is None:
+        return isinstance(error, (ConnectionError, TimeoutError))
+    if status == 429 or status >= 500:
+        return True
+    content = getattr(error, 'content', b'') or b''
+    return status == 403 and (b'rateLimitExceeded' in content or b'userRateLimitExceeded' in content)
+
+
+class RetryPolicy:
+    """Recuo exponencial com jitter completo: espera aleatória entre 0 e base * 2^tentativa."""
+    
+    def __init__(self, max_retries: int = 5, base_delay: float = 0.5, max_delay: float = 32.0):
+        """
+        Args:
+            max_retries: Novas tentativas depois da primeira (0 desativa)
+            base_delay: Espera máxima da primeira nova tentativa, em segundos
+            max_delay: Teto da espera
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+    
+    def delay(self, attempt: int, error: Optional[Exception] = None) -> float:
+        """Espera antes da nova tentativa attempt + 1; respeita Retry-After, se vier."""
+        retry_after = None
+        resp = getattr(error, 'resp', None)
+        if hasattr(resp, 'get'):
+            retry_after = resp.get('retry-after')
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.max_delay)
+            except ValueError:
+                pass  # Retry-After em formato de data: usa o recuo normal
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+    
+    def sleep(self, attempt: int, error: Optional[Exception] = None):
+        time.sleep(self.delay(attempt, error))
+
+
+def execute(request, units: float, limiter: QuotaLimiter, retry: RetryPolicy) -> Any:
+    """Executa request.execute() dentro da cota, com novas tentativas nos erros temporários."""
+    for attempt in range(retry.max_retries + 1):
+        limiter.acquire(units)
+        try:
+            return request.execute()
+        except Exception as e:
+            if attempt == retry.max_retries or not is_retryable(e):
+                raise
+            retry.sleep(attempt, e)
+
+
+def execute_batch(service, requests: Dict[str, Callable[[], Any]], units: float, limiter: QuotaLimiter,
+                  retry: RetryPolicy) -> Dict[str, Any]:
+    """
+    Executa requisições em lote, repetindo só os itens que falharam por erro temporário.
+    
+    Args:
+        service: Serviço que cria o lote (new_batch_http_request)
+        requests: ID -> função que monta a requisição do item
+        units: Unidades de cota de cada item
+    
+    Os itens são enviados em lotes de no máximo limiter.burst unidades: a API
+    cobra cada item do lote, e um lote maior que a cota de um segundo teria
+    parte dos itens recusada com 429 mesmo depois da espera.
+    
+    Returns:
+        ID -> resposta, ou a exceção do item quando ele falhou de vez
+    """
+    results: Dict[str, Any] = {}
+    pending = list(requests)
+    if limiter.burst == float('inf') or units <= 0:
+        per_batch = max(len(pending), 1)
+    else:
+        per_batch = max(1, int(limiter.burst // units))
+    for attempt in range(retry.max_retries + 1):
+        failed = []
+        
+        def callback(request_id, response, exception):
+            if exception is not None and attempt < retry.max_retries and is_retryable(exception):
+                failed.append((request_id, exception))
+            else:
+                results[request_id] = exception if exception is not None else response
+        
+        for offset in range(0, len(pending), per_batch):
+            chunk = pending[offset:offset + per_batch]
+            batch = service.new_batch_http_request(callback=callback)
+            for request_id in chunk:
+                batch.add(requests[request_id](), request_id=request_id)
+            limiter.acquire(units * len(chunk))
+            try:
+                batch.execute()
+            except Exception as e:
+                # O lote inteiro falhou: os itens dele ainda sem resposta voltam para a fila
+                if attempt == retry.max_retries or not is_retryable(e):
+                    raise
+                retrying = {request_id for request_id, _ in failed}
+                failed.extend((request_id, e) for request_id in chunk
+                              if request_id not in results and request_id not in retrying)
+        if not failed:
+            break
+        retry.sleep(attempt, failed[0][1])
+        pending = [request_id for request_id, _ in failed]
+    return results
+
+
+class QuotaClient:
+    """
+    Chamadas de uma ferramenta às APIs: cota, novas tentativas e um serviço por thread.
+    
+    Quem herda define limiter, retry, service_factory e _local (threading.local).
+    """
+    
+    def _call(self, request, method: str) -> Any:
+        """Executa uma requisição dentro da cota, com novas tentativas nos erros temporários."""
+        return execute(request, self.limiter.cost(method), self.limiter, self.retry)
+    
+    def _worker_service(self):
+        """Retorna o serviço da thread atual, criando-o no primeiro uso (httplib2 não é thread-safe)."""
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            service = self._local.service = self.service_factory()
+        return service
@@ -0,0 +1,267 @@
+"""
+Registros compactos de e-mails e eventos, compatíveis com o acesso por dict
+"""
+
+import sys
+from email.message import Message
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .event_time import display_time
+from .mime import extract_body, extract_body_raw
+from .reducer import reduce_body
+
+
+class _Missing:
+    """Marca um campo opcional ausente (a chave não aparece no acesso por dict)."""
+    
+    __slots__ = ()
+    
+    def __repr__(self):
+        return 'MISSING'
+
+
+MISSING = _Missing()
+
+# Payload JSON (format='full') ou mensagem RFC 822 já interpretada (format='raw')
+BodySource = Union[Dict[str, Any], Message]
+
+
+class BodyDecoder:
+    """
+    Decodifica corpos sob demanda com as opções de uma GmailTool.
+    
+    Uma instância é compartilhada por todos os registros lidos com as mesmas
+    opções, então cada registro guarda só uma referência a ela.
+    """
+    
+    __slots__ = ('body_bytes', 'reduce')
+    
+    def __init__(self, body_bytes: Optional[int] = None, reduce: bool = False):
+        self.body_bytes = body_bytes
+        self.reduce = reduce
+    
+    def decode(self, source: BodySource) -> Tuple[str, Optional[int]]:
+        """Retorna (corpo, tokens economizados), com None na economia se reduce=False."""
+        if isinstance(source, Message):
+            body = extract_body_raw(source, self.body_bytes)
+        else:
+            body = extract_body(source, self.body_bytes)
+        if self.reduce:
+            return reduce_body(body)
+        return body, None
+
+
+class Record:
+    """
+    Base dos registros: campos em __slots__, lidos como atributos ou como dict.
+    
+    KEYS mapeia cada chave do dict para o atributo correspondente. Campos com
+    valor MISSING não aparecem como chaves, como acontecia com os dicts.
+    """
+    
+    __slots__ = ()
+    KEYS: Dict[str, str] = {}
+    
+    def _present(self, attr: str) -> bool:
+        return getattr(self, attr) is not MISSING
+    
+    def __getitem__(self, key: str) -> Any:
+        attr = self.KEYS.get(key)
+        if attr is None or not self._present(attr):
+            raise KeyError(key)
+        return getattr(self, attr)
+    
+    def __setitem__(self, key: str, value: Any):
+        attr = self.KEYS.get(key)
+        if attr is None:
+            raise KeyError(f"{type(self).__name__} não tem o campo '{key}'")
+        setattr(self, attr, value)
+    
+    def __contains__(self, key: object) -> bool:
+        attr = self.KEYS.get(key)
+        return attr is not None and self._present(attr)
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self else default
+    
+    def keys(self) -> List[str]:
+        return [key for key, attr in self.KEYS.items() if self._present(attr)]
+    
+    def values(self) -> List[Any]:
+        return [self[key] for key in self.keys()]
+    
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(key, self[key]) for key in self.keys()]
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+    
+    def __len__(self) -> int:
+        return len(self.keys())
+    
+    def update(self, other: Any):
+        for key in other.keys():
+            self[key] = other[key]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+    
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (Record, dict)):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+    
+    __hash__ = None
+    
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class EmailRecord(Record):
+    """
+    Um e-mail lido pela GmailTool.
+    
+    O corpo é decodificado só no primeiro acesso a 'body' (ou 'tokens_saved'):
+    até lá o registro guarda apenas a fonte (payload ou mensagem raw) e o
+    BodyDecoder compartilhado. O remetente é internado, já que poucos
+    remetentes se repetem por toda a caixa de entrada.
+    """
+    
+    __slots__ = ('id', 'subject', 'sender', 'date', 'snippet', 'attachments', 'error',
+                 '_body', '_tokens_saved', '_source', '_decoder')
+    KEYS = {
+        'id': 'id',
+        'subject': 'subject',
+        'from': 'sender',
+        'date': 'date',
+        'snippet': 'snippet',
+        'body': 'body',
+        'tokens_saved': 'tokens_saved',
+        'attachments': 'attachments',
+        'error': 'error',
+    }
+    
+    def __init__(self, id: str, subject: str, sender: str, date: str, snippet: str,
+                 body: Any = MISSING, tokens_saved: Any = MISSING, attachments: Any = MISSING,
+                 source: Optional[BodySource] = None, decoder: Optional[BodyDecoder] = None):
+        self.id = id
+        self.subject = subject
+        self.sender = sys.intern(sender)
+        self.date = date
+        self.snippet = snippet
+        self.attachments = attachments
+        self.error = MISSING
+        self._body = body
+        self._tokens_saved = tokens_saved
+        self._source = source
+        self._decoder = decoder
+    
+    def _load_body(self):
+        if self._source is not None:
+            self._body, saved = self._decoder.decode(self._source)
+            if saved is not None:
+                self._tokens_saved = saved
+            # A fonte só servia para isso: libera o payload
+            self._source = self._decoder = None
+    
+    @property
+    def body(self) -> Any:
+        self._load_body()
+        return self._body
+    
+    @body.setter
+    def body(self, value: Any):
+        self._source = self._decoder = None
+        self._body = value
+    
+    @property
+    def tokens_saved(self) -> Any:
+        self._load_body()
+        return self._tokens_saved
+    
+    @tokens_saved.setter
+    def tokens_saved(self, value: Any):
+        self._load_body()
+        self._tokens_saved = value
+    
+    def _present(self, attr: str) -> bool:
+        # Não decodifica o corpo só para responder "'body' in email"
+        if self._source is not None:
+            if attr == 'body':
+                return True
+            if attr == 'tokens_saved':
+                return self._decoder.reduce
+        return super()._present(attr)
+    
+    def update(self, other: Any):
+        """Como dict.update; copiado de outro EmailRecord, o corpo continua preguiçoso."""
+        if isinstance(other, EmailRecord) and other._source is not None:
+            body_source, decoder = other._source, other._decoder
+            for key in other.keys():
+                if key not in ('body', 'tokens_saved'):
+                    self[key] = other[key]
+            self._body = self._tokens_saved = MISSING
+            self._source, self._decoder = body_source, decoder
+        else:
+            super().update(other)
+
+
+class ThreadRecord(EmailRecord):
+    """Uma conversa inteira em um registro (ver GmailTool.execute_threads)."""
+    
+    __slots__ = ('participants', 'message_count')
+    KEYS = dict(EmailRecord.KEYS, participants='participants', message_count='message_count')
+    
+    def __init__(self, id: str, subject: str, sender: str, date: str, snippet: str,
+                 participants: List[str], message_count: int, **kwargs):
+        super().__init__(id, subject, sender, date, snippet, **kwargs)
+        self.participants = participants
+        self.message_count = message_count
+
+
+class EventRecord(Record):
+    """
+    Um evento lido pela CalendarTool.
+    
+    Início e fim ficam em segundos desde a época ('start', 'end'); o texto de
+    'time' só é formatado no primeiro acesso, então análises sobre muitos
+    eventos não pagam um strftime por evento.
+    """
+    
+    __slots__ = ('summary', '_time', 'description', 'calendar', 'start', 'end', 'all_day', '_zone')
+    KEYS = {
+        'summary': 'summary',
+        'time': 'time',
+        'description': 'description',
+        'calendar': 'calendar',
+        'start': 'start',
+        'end': 'end',
+        'all_day': 'all_day',
+    }
+    
+    def __init__(self, summary: str, time: Any = MISSING, description: str = '', calendar: Any = MISSING,
+                 start: Any = MISSING, end: Any = MISSING, all_day: Any = MISSING, zone: Optional[str] = None):
+        self.summary = summary
+        self._time = time
+        self.description = description
+        self.calendar = calendar
+        self.start = start
+        self.end = end
+        self.all_day = all_day
+        self._zone = zone
+    
+    @property
+    def time(self) -> Any:
+        if self._time is MISSING and self.start is not MISSING:
+            self._time = display_time(self.start, self.all_day is True, self._zone)
+        return self._time
+    
+    @time.setter
+    def time(self, value: Any):
+        self._time = value
+    
+    def _present(self, attr: str) -> bool:
+        # Não formata o horário só para responder "'time' in event"
+        if attr == 'time' and self.start is not MISSING:
+            return True
+        return super()._present(attr)
@@ -0,0 +1,115 @@
+"""
+Redução do corpo dos e-mails: remove respostas citadas, assinaturas e avisos legais
+"""
+
+import re
+from typing import Tuple
+
+
+# Linhas de atribuição dos clientes de e-mail trazem data, hora ou <e-mail>;
+# sem um deles, "On Monday ... wrote:" é só uma frase do texto
+_ATTRIBUTION = r'(?=[^\n]{0,200}?(?:\d{1,2}:\d{2}|\b\d{4}\b|\d{1,2}/\d{1,2}|<[^<>\s]+@[^<>\s]+>))'
+_ATTRIBUTION_TOKEN = re.compile(_ATTRIBUTION)
+
+# Início do histórico citado: tudo a partir daqui é a mensagem anterior
+_REPLY_HEADER = re.compile(
+    r'^\s*(?:'
+    r'On\b' + _ATTRIBUTION + r'[^\n]{0,200}\bwrote:'             # Gmail/Apple (inglês)
+    r'|Em\b' + _ATTRIBUTION + r'[^\n]{0,200}\bescreveu:'         # Gmail (português)
+    r'|El\b' + _ATTRIBUTION + r'[^\n]{0,200}\bescribió:'         # Gmail (espanhol)
+    r'|-{2,}\s*(?:Original Message|Mensagem original|Mensaje original)\s*-{2,}'
+    r'|_{10,}'                                                # separador do Outlook
+    r')\s*$',
+    re.IGNORECASE
+)
+
+# Cabeçalho de resposta do Outlook: "From:"/"De:" seguido de "Sent:"/"Enviado:"
+_OUTLOOK_FROM = re.compile(r'^\s*\*?(?:From|De):\*?\s', re.IGNORECASE)
+_OUTLOOK_SENT = re.compile(r'^\s*\*?(?:Sent|Date|Enviado|Enviada em|Data):\*?\s', re.IGNORECASE)
+
+# Início da assinatura: o delimitador padrão "-- " ou as frases dos celulares
+_SIGNATURE = re.compile(
+    r'^\s*(?:--\s*|Sent from my .+|Enviado do meu .+|Enviado de meu .+|Get Outlook for .+|Obter o Outlook para .+)$',
+    re.IGNORECASE
+)
+
+# Termos de aviso legal / confidencialidade; um só não basta ("mantenham isso confidencial")
+_DISCLAIMER = re.compile(
+    r'confidential|privileged|intended (?:only )?for the (?:named )?(?:addressee|recipient)'
+    r'|confidencia|sigilos|destinat[áa]rio\(s\)|aviso legal|disclaimer|esta mensagem e (?:seus|quaisquer) anexos',
+    re.IGNORECASE
+)
+
+# Formatos conhecidos de rodapé legal, que valem mesmo com um termo só
+_DISCLAIMER_FOOTER = re.compile(
+    r'^\s*(?:(?:confidentiality notice|legal notice|disclaimer|aviso legal|aviso de confidencialidade)\s*[:\-–]'
+    r'|(?:this (?:e-?mail|message)|esta mensagem|este e-?mail)\b[^\n]{0,80}'
+    r'\b(?:attachments?|anexos?|intended|destinad[ao]|confidencia))',
+    re.IGNORECASE
+)
+
+
+def _is_disclaimer(paragraph: str) -> bool:
+    """Aviso legal: dois termos diferentes ou um formato conhecido de rodapé."""
+    if _DISCLAIMER_FOOTER.match(paragraph):
+        return True
+    return len({match.group(0).lower() for match in _DISCLAIMER.finditer(paragraph)}) >= 2
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa barata de tokens (~4 caracteres por token)."""
+    return (len(text) + 3) // 4
+
+
+def reduce_text(text: str) -> str:
+    """
+    Remove do corpo o que não traz informação nova para o resumo.
+    
+    Em uma única passada pelas linhas: corta no início do histórico citado
+    ("On ... wrote:", "Em ... escreveu:", separadores do Outlook) ou da
+    assinatura, e descarta linhas citadas ("> ..."). Depois remove os avisos
+    legais do fim do texto, e só eles: um parágrafo seguido de conteúdo nunca
+    sai. Mensagens encaminhadas são mantidas: o conteúdo é novo.
+    
+    Returns:
+        O texto reduzido (pode ser vazio se a mensagem era só citação)
+    """
+    lines = text.splitlines()
+    kept = []
+    for i, line in enumerate(lines):
+        stripped = line.lstrip()
+        if stripped.startswith('>'):
+            continue
+        if _REPLY_HEADER.match(line) or _SIGNATURE.match(line):
+            break
+        # O Gmail quebra "On <data>, <nome> <e-mail>" e "wrote:" em duas linhas
+        if stripped.startswith(('On ', 'Em ', 'El ')) and i + 1 < len(lines) and \
+                lines[i + 1].strip().lower() in ('wrote:', 'escreveu:', 'escribió:') and \
+                _ATTRIBUTION_TOKEN.match(stripped):
+            break
+        if _OUTLOOK_FROM.match(line) and i + 1 < len(lines) and _OUTLOOK_SENT.match(lines[i + 1]):
+            break
+        kept.append(line.rstrip())
+    
+    # Avisos legais só no fim; o primeiro parágrafo é sempre conteúdo
+    paragraphs = [p for p in '\n'.join(kept).split('\n\n') if p.strip()]
+    end = len(paragraphs)
+    while end > 1 and _is_disclaimer(paragraphs[end - 1]):
+        end -= 1
+    return '\n\n'.join(paragraphs[:end]).strip()
+
+
+def reduce_body(text: str) -> Tuple[str, int]:
+    """
+    Reduz o corpo e informa a economia.
+    
+    Se a redução apagar tudo (ex.: uma mensagem que era só citação), o texto
+    original é mantido.
+    
+    Returns:
+        (texto reduzido, tokens economizados)
+    """
+    reduced = reduce_text(text)
+    if not reduced:
+        return text, 0
+    return reduced, estimate_tokens(text) - estimate_tokens(reduced)
@@ -2,11 +2,88 @@
 Ferramentas para Gmail e Google Calendar
 """
 
-import base64
-from datetime import datetime
-from typing import List, Dict, Any
+import heapq
+import html
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from itertools import islice
+from typing import List, Dict, Any, Optional, Callable, Iterator, Sequence, Tuple, Union
 from abc import ABC, abstractmethod
 
+from .attachments import (
+    attachment_text, find_attachments, find_raw_attachments, is_text_attachment, write_base64url
+)
+from .cache import EventCache, MessageCache
+from .event_time import EventTimes, check_zone, normalize_events
+from .mime import decode_base64url, parse_raw, raw_header
+from .quota import QuotaClient, QuotaLimiter, RetryPolicy, execute_batch, http_status, shared_limiter
+from .records import MISSING, BodyDecoder, EmailRecord, EventRecord, ThreadRecord
+
+
+# Limite de chamadas por requisição em lote imposto pela API do Gmail
+GMAIL_BATCH_LIMIT = 100
+
+# Máximo de IDs por página aceito por users().messages().list
+GMAIL_PAGE_LIMIT = 500
+
+# Máximo de eventos por página aceito por events().list
+CALENDAR_PAGE_LIMIT = 2500
+
+# Máximo de agendas por consulta aceito por freebusy().query
+FREEBUSY_CALENDAR_LIMIT = 50
+
+# Modo 'metadata': só os cabeçalhos usados e uma máscara de resposta parcial
+METADATA_HEADERS = ['Subject', 'From', 'Date']
+METADATA_FIELDS = 'id,threadId,labelIds,snippet,internalDate,historyId,payload/headers'
+
+# Motores de extração do corpo (ver GmailTool.__init__)
+BODY_ENGINES = ('json', 'raw')
+
+
+# Datas aceitas nos filtros after/before
+DateFilter = Optional[Union[date, datetime, str]]
+
+
+def build_query(query: Optional[str] = None, after: DateFilter = None, before: DateFilter = None) -> str:
+    """
+    Monta uma busca na sintaxe do Gmail combinando o texto livre com janelas de data.
+    
+    Datas viram segundos desde a época (after:1700000000), que o Gmail interpreta
+    sem ambiguidade de fuso horário; datas sem hora contam a partir da meia-noite local.
+    Textos são repassados como estão (ex.: '2024/01/31').
+    """
+    terms = [query] if query else []
+    for operator, value in (('after', after), ('before', before)):
+        if value is None:
+            continue
+        if isinstance(value, datetime):
+            value = int(value.timestamp())
+        elif isinstance(value, date):
+            value = int(datetime.combine(value, datetime.min.time()).timestamp())
+        terms.append(f'{operator}:{value}')
+    return ' '.join(terms)
+
+
+def _list_params(query: Optional[str], label_ids: Optional[Sequence[str]], after: DateFilter,
+                 before: DateFilter, include_spam_trash: bool) -> Dict[str, Any]:
+    """Converte os filtros da ferramenta nos parâmetros de users().messages().list."""
+    params: Dict[str, Any] = {}
+    if label_ids:
+        params['labelIds'] = list(label_ids)
+    q = build_query(query, after, before)
+    if q:
+        params['q'] = q
+    if include_spam_trash:
+        params['includeSpamTrash'] = True
+    return params
+
+
+def _get_method(format: str) -> str:
+    """Método da API (para a cota) usado por _get_request no formato pedido."""
+    return 'threads.get' if format == 'thread' else 'messages.get'
+
 
 class Tool(ABC):
     """Classe base para ferramentas."""
@@ -21,107 +98,869 @@ class Tool(ABC):
         pass
 
 
-class GmailTool(Tool):
+class GmailTool(QuotaClient, Tool):
     """Ferramenta para ler e-mails do Gmail."""
     
-    def __init__(self, gmail_service):
+    def __init__(self, gmail_service, batch_size: int = 50, workers: int = 1,
+                 service_factory: Optional[Callable[[], Any]] = None, cache: Optional[MessageCache] = None,
+                 body_bytes: Optional[int] = None, reduce_bodies: bool = False, engine: str = 'json',
+                 attachment_text_bytes: Optional[int] = None, limiter: Optional[QuotaLimiter] = None,
+                 retry: Optional[RetryPolicy] = None):
+        """
+        Inicializa a ferramenta.
+        
+        Args:
+            gmail_service: Serviço autenticado da API do Gmail
+            batch_size: Número de mensagens por requisição em lote (1 desativa o lote)
+            workers: Número de threads para buscar mensagens em paralelo
+            service_factory: Cria um novo serviço do Gmail para cada thread (obrigatório
+                se workers > 1, pois o transporte httplib2 não é thread-safe)
+            cache: Cache local consultado antes de buscar mensagens na API
+            body_bytes: Máximo de bytes do corpo decodificados por mensagem (None = tudo)
+            reduce_bodies: Remove citações, assinaturas e avisos legais do corpo e
+                informa a economia em 'tokens_saved'
+            engine: Como o corpo é obtido: 'json' percorre o payload da API
+                (format='full'); 'raw' baixa a mensagem RFC 822 uma vez
+                (format='raw') e a interpreta com o parser da biblioteca padrão
+            attachment_text_bytes: Se definido, anexos de texto pequenos ganham um
+                trecho 'text' de até esse número de bytes (None = só metadados)
+            limiter: Cota em unidades do Gmail (padrão: shared_limiter('gmail'), 250
+                unidades/s divididas por todas as ferramentas e threads do processo)
+            retry: Novas tentativas com recuo nos erros 429/403/5xx (padrão: RetryPolicy())
+        """
         super().__init__(
             name="read_gmail",
             description="Lê os e-mails mais recentes da caixa de entrada do Gmail"
         )
+        if workers > 1 and service_factory is None:
+            raise ValueError("service_factory é obrigatório quando workers > 1")
+        if engine not in BODY_ENGINES:
+            raise ValueError(f"Motor de extração inválido: {engine}")
+        
         self.gmail_service = gmail_service
+        self.batch_size = batch_size
+        self.workers = workers
+        self.service_factory = service_factory
+        self.limiter = limiter or shared_limiter('gmail')
+        self.retry = retry or RetryPolicy()
+        self.cache = cache
+        self.body_bytes = body_bytes
+        self.reduce_bodies = reduce_bodies
+        self.engine = engine
+        self.attachment_text_bytes = attachment_text_bytes
+        self._decoder = None
+        self._local = threading.local()
+        self._executor = None
+        self._executor_workers = 0
+        self._executor_lock = threading.Lock()
+        self._prefetcher = None
     
-    def execute(self, max_results: int = 5) -> List[Dict[str, Any]]:
-        """Executa a leitura dos e-mails."""
+    def execute(self, max_results: int = 5, batch_size: Optional[int] = None,
+                workers: Optional[int] = None, format: str = 'full', query: Optional[str] = None,
+                label_ids: Optional[Sequence[str]] = ('INBOX',), after: DateFilter = None,
+                before: DateFilter = None, include_spam_trash: bool = False) -> List[EmailRecord]:
+        """
+        Executa a leitura dos e-mails.
+        
+        Os filtros são aplicados pelo próprio Gmail na listagem, então mensagens
+        irrelevantes nunca são baixadas.
+        
+        Args:
+            max_results: Número máximo de e-mails para ler
+            batch_size: Sobrescreve o tamanho do lote configurado na ferramenta
+            workers: Sobrescreve o número de threads configurado na ferramenta
+            format: 'full' (com corpo) ou 'metadata' (só cabeçalhos e snippet; o
+                corpo pode ser carregado depois com load_bodies)
+            query: Busca na sintaxe do Gmail, ex.: 'from:chefe@empresa.com is:unread'
+            label_ids: Rótulos exigidos (todos); None ou vazio busca em todos os e-mails
+            after: Só e-mails recebidos a partir desta data (date, datetime ou texto do Gmail)
+            before: Só e-mails recebidos antes desta data
+            include_spam_trash: Inclui mensagens de SPAM e TRASH
+        
+        Returns:
+            Lista de EmailRecord (acessíveis também como dict) na ordem da caixa
+            de entrada; falhas de mensagens individuais vêm como {'id', 'error'}
+        """
+        if format not in ('full', 'metadata'):
+            raise ValueError(f"Formato inválido: {format}")
+        batch_size = self.batch_size if batch_size is None else batch_size
+        workers = self.workers if workers is None else workers
+        params = _list_params(query, label_ids, after, before, include_spam_trash)
         try:
-            results = self.gmail_service.users().messages().list(
-                userId='me', 
-                labelIds=['INBOX'], 
-                maxResults=max_results
-            ).execute()
+            message_ids = self._list_ids(max_results, params)
+            self.sync_cache()
+            messages = self._load_messages(message_ids, batch_size, workers, self._api_format(format))
+            emails = [msg if 'error' in msg else self._parse_message(msg) for msg in messages]
+            return self.load_attachment_texts(emails)
+        except Exception as e:
+            return [{'error': f'Erro ao ler e-mails: {str(e)}'}]
+    
+    def iter_messages(self, query: Optional[str] = None, limit: Optional[int] = None,
+                      format: str = 'metadata', page_size: int = 100,
+                      label_ids: Optional[Sequence[str]] = ('INBOX',), after: DateFilter = None,
+                      before: DateFilter = None, include_spam_trash: bool = False) -> Iterator[EmailRecord]:
+        """
+        Percorre a caixa de entrada página a página, devolvendo um e-mail por vez.
+        
+        Só a página atual e a seguinte ficam em memória, então o consumo é constante
+        mesmo para dezenas de milhares de mensagens. Com service_factory, a página
+        seguinte (listagem e mensagens) é buscada em uma thread própria enquanto a
+        atual é consumida.
+        
+        Args:
+            query: Busca no formato do Gmail (parâmetro q=)
+            limit: Número máximo de e-mails (None percorre tudo)
+            format: 'metadata' (padrão) ou 'full'
+            page_size: IDs por página da listagem (máximo 500)
+            label_ids, after, before, include_spam_trash: Filtros, como em execute
+        
+        Yields:
+            E-mails na ordem da caixa de entrada; falhas individuais vêm como {'id', 'error'}
+        """
+        if format not in ('full', 'metadata'):
+            raise ValueError(f"Formato inválido: {format}")
+        page_size = min(page_size, GMAIL_PAGE_LIMIT)
+        params = _list_params(query, label_ids, after, before, include_spam_trash)
+        remaining = limit
+        
+        def fetch_page(page_token: Optional[str], size: int):
+            service = self._worker_service() if self.service_factory is not None else self.gmail_service
+            response = self._list_page(service, size, page_token, params)
+            message_ids = [msg['id'] for msg in response.get('messages', [])]
+            messages = self._load_messages(message_ids, self.batch_size, self.workers, self._api_format(format),
+                                           service)
+            return messages, response.get('nextPageToken')
+        
+        def page_size_for(remaining: Optional[int]) -> int:
+            return page_size if remaining is None else min(page_size, remaining)
+        
+        self.sync_cache()
+        pending = None
+        page_token = None
+        while remaining is None or remaining > 0:
+            if pending is not None:
+                messages, page_token = pending.result()
+            else:
+                messages, page_token = fetch_page(page_token, page_size_for(remaining))
+            if remaining is not None:
+                remaining -= len(messages)
             
-            messages = results.get('messages', [])
-            emails = []
+            has_more = bool(page_token) and (remaining is None or remaining > 0)
+            pending = None
+            if has_more and self.service_factory is not None:
+                pending = self._get_prefetcher().submit(fetch_page, page_token, page_size_for(remaining))
             
             for msg in messages:
-                msg_data = self.gmail_service.users().messages().get(
-                    userId='me', 
-                    id=msg['id'], 
-                    format='full'
-                ).execute()
-                
-                headers = msg_data['payload'].get('headers', [])
-                subject = next((h['value'] for h in headers if h['name'] == 'Subject'), '(Sem Assunto)')
-                from_ = next((h['value'] for h in headers if h['name'] == 'From'), '(Remetente desconhecido)')
-                body = self._get_email_body(msg_data['payload'])
-                
-                emails.append({
-                    'subject': subject,
-                    'from': from_,
-                    'body': body
-                })
+                yield msg if 'error' in msg else self._parse_message(msg)
+            messages = None
             
+            if not has_more:
+                break
+    
+    def execute_threads(self, max_results: int = 5, query: Optional[str] = None,
+                        label_ids: Optional[Sequence[str]] = ('INBOX',), after: DateFilter = None,
+                        before: DateFilter = None, include_spam_trash: bool = False) -> List[ThreadRecord]:
+        """
+        Lê as conversas mais recentes, uma por registro, via users().threads().
+        
+        Cada conversa custa uma única chamada (em lote, como as mensagens) e vira
+        um registro compacto: o histórico citado nas respostas é removido, então
+        cada linha de texto aparece só uma vez. Os registros têm as mesmas chaves
+        de um e-mail ('subject', 'from', 'body'), mais 'participants' e 'message_count'.
+        
+        Args:
+            max_results: Número máximo de conversas para ler
+            query, label_ids, after, before, include_spam_trash: Filtros, como em execute
+        
+        Returns:
+            Lista de ThreadRecord, da mais recente para a mais antiga
+        """
+        params = _list_params(query, label_ids, after, before, include_spam_trash)
+        try:
+            thread_ids = self._list_ids(max_results, params, resource='threads')
+            threads = self._fetch_messages(thread_ids, self.batch_size, self.workers, 'thread')
+            threads = [thread if 'error' in thread else self._parse_thread(thread) for thread in threads]
+            return self.load_attachment_texts(threads)
+        except Exception as e:
+            return [{'error': f'Erro ao ler conversas: {str(e)}'}]
+    
+    def load_bodies(self, emails: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Carrega o corpo dos e-mails lidos com format='metadata'.
+        
+        Só as mensagens sem 'body' são buscadas (com o corpo); os e-mails
+        são atualizados no lugar e a mesma lista é retornada.
+        """
+        pending = [email for email in emails if 'body' not in email and 'error' not in email]
+        if not pending:
             return emails
+        
+        try:
+            messages = self._load_messages([email['id'] for email in pending], self.batch_size, self.workers,
+                                           self._api_format('full'))
         except Exception as e:
-            return [{'error': f'Erro ao ler e-mails: {str(e)}'}]
+            messages = [{'id': email['id'], 'error': f'Erro ao ler e-mail: {str(e)}'} for email in pending]
+        
+        for email, msg in zip(pending, messages):
+            if 'error' in msg:
+                email['error'] = msg['error']
+            else:
+                email.update(self._parse_message(msg))
+        self.load_attachment_texts(pending)
+        return emails
+    
+    def load_attachment_texts(self, emails: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Extrai o trecho de texto dos anexos de texto pequenos (ver attachment_text_bytes).
+        
+        Só os anexos que ainda não têm 'text' são baixados, em lotes como as
+        mensagens. Os anexos são atualizados no lugar (falhas vão para 'error'
+        do anexo) e a mesma lista é retornada.
+        """
+        if not self.attachment_text_bytes:
+            return emails
+        pending = [attachment for email in emails for attachment in email.get('attachments', ())
+                   if attachment['attachment_id'] and 'text' not in attachment and is_text_attachment(attachment)]
+        if not pending:
+            return emails
+        
+        for attachment, response in zip(pending, self._fetch_attachments(pending)):
+            if 'error' in response:
+                attachment['error'] = response['error']
+                continue
+            data = decode_base64url(response.get('data', ''), self.attachment_text_bytes)
+            attachment['text'] = attachment_text(data, attachment['mime_type'], attachment.get('charset'),
+                                                 final=len(data) < self.attachment_text_bytes,
+                                                 max_chars=self.attachment_text_bytes)
+        return emails
+    
+    def download_attachment(self, attachment: Dict[str, Any], directory: str = '.',
+                            filename: Optional[str] = None) -> str:
+        """
+        Baixa um anexo para o disco, só quando pedido.
+        
+        A API entrega o anexo inteiro em base64url numa única resposta; o conteúdo
+        é decodificado e gravado em blocos, então o arquivo decodificado nunca
+        fica inteiro em memória.
+        
+        Args:
+            attachment: Item de 'attachments' de um e-mail lido com corpo
+            directory: Pasta de destino
+            filename: Nome do arquivo (padrão: o nome do anexo, sem diretórios)
+        
+        Returns:
+            Caminho do arquivo gravado
+        """
+        if not attachment.get('attachment_id'):
+            raise ValueError(f"Anexo sem attachmentId: {attachment['filename']} (leia o e-mail com o motor 'json')")
+        response = self._call(self.gmail_service.users().messages().attachments().get(
+            userId='me',
+            messageId=attachment['message_id'],
+            id=attachment['attachment_id']
+        ), 'messages.attachments.get')
+        # O nome vem do remetente: nunca permite sair da pasta de destino
+        path = os.path.join(directory, os.path.basename(filename or attachment['filename']) or 'anexo')
+        write_base64url(response.pop('data', ''), path)
+        return path
+    
+    def sync_cache(self) -> int:
+        """
+        Atualiza o cache local com as mudanças ocorridas desde a última sincronização.
+        
+        Usa users().history().list a partir do historyId salvo, então o custo é
+        proporcional ao número de mudanças, não ao tamanho da caixa de entrada.
+        Se o historyId expirou (HTTP 404), o cache é descartado e recomeça do zero.
+        
+        Returns:
+            Número de registros de histórico aplicados
+        """
+        if self.cache is None:
+            return 0
+        
+        start_history_id = self.cache.history_id
+        if start_history_id is None:
+            self._reset_cache()
+            return 0
+        
+        applied = 0
+        page_token = None
+        try:
+            while True:
+                response = self._call(self.gmail_service.users().history().list(
+                    userId='me',
+                    startHistoryId=start_history_id,
+                    pageToken=page_token
+                ), 'history.list')
+                
+                for record in response.get('history', []):
+                    applied += 1
+                    deleted = [item['message']['id'] for item in record.get('messagesDeleted', [])]
+                    if deleted:
+                        self.cache.delete_many(deleted)
+                    for item in record.get('labelsAdded', []):
+                        self.cache.update_labels(item['message']['id'], added=item.get('labelIds', []))
+                    for item in record.get('labelsRemoved', []):
+                        self.cache.update_labels(item['message']['id'], removed=item.get('labelIds', []))
+                
+                page_token = response.get('nextPageToken')
+                if not page_token:
+                    break
+        except Exception as e:
+            if http_status(e) != 404:
+                raise
+            self._reset_cache()
+            return 0
+        
+        self.cache.history_id = response['historyId']
+        return applied
+    
+    def _reset_cache(self):
+        """Esvazia o cache e registra o historyId atual da conta como ponto de partida."""
+        profile = self._call(self.gmail_service.users().getProfile(userId='me'), 'getProfile')
+        self.cache.clear()
+        self.cache.history_id = profile['historyId']
+    
+    def _load_messages(self, message_ids: List[str], batch_size: int, workers: int,
+                       format: str = 'full', service=None) -> List[Dict[str, Any]]:
+        """
+        Retorna as mensagens no formato da API, consultando o cache antes da rede.
+        
+        O cache só guarda mensagens completas ('full' ou 'raw'), que também atendem
+        o formato 'metadata'; mensagens 'raw' podem ser reinterpretadas sem nova busca.
+        Quem chama é responsável por sincronizar o cache antes (sync_cache).
+        """
+        if self.cache is None:
+            return self._fetch_messages(message_ids, batch_size, workers, format, service)
+        
+        found = self.cache.get_many(message_ids)
+        missing = [msg_id for msg_id in message_ids if msg_id not in found]
+        fetched = self._fetch_messages(missing, batch_size, workers, format, service)
+        if format in ('full', 'raw'):
+            self.cache.put_many([msg for msg in fetched if 'error' not in msg])
+        
+        found.update((msg['id'], msg) for msg in fetched)
+        return [found[msg_id] for msg_id in message_ids]
+    
+    def _api_format(self, format: str) -> str:
+        """Formato pedido à API: 'full' vira 'raw' quando o motor de extração é o raw."""
+        return 'raw' if format == 'full' and self.engine == 'raw' else format
+    
+    def close(self):
+        """Encerra os pools de threads, se houver (ao terminar de usar a ferramenta)."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+        if self._prefetcher is not None:
+            self._prefetcher.shutdown(wait=True)
+            self._prefetcher = None
+    
+    def _list_ids(self, max_results: int, params: Dict[str, Any], resource: str = 'messages') -> List[str]:
+        """Lista os IDs (de mensagens ou conversas) seguindo nextPageToken até atingir max_results."""
+        ids = []
+        page_token = None
+        while len(ids) < max_results:
+            size = min(max_results - len(ids), GMAIL_PAGE_LIMIT)
+            response = self._list_page(self.gmail_service, size, page_token, params, resource)
+            ids.extend(item['id'] for item in response.get(resource, []))
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
+        return ids
+    
+    def _list_page(self, service, page_size: int, page_token: Optional[str],
+                   params: Dict[str, Any], resource: str = 'messages') -> Dict[str, Any]:
+        """Busca uma página de users().messages().list (ou threads().list) com os filtros de _list_params."""
+        request_params = dict(params, userId='me', maxResults=page_size)
+        if page_token:
+            request_params['pageToken'] = page_token
+        return self._call(getattr(service.users(), resource)().list(**request_params), f'{resource}.list')
     
-    def _get_email_body(self, payload):
-        """Extrai o corpo do e-mail."""
-        if 'parts' in payload:
-            for part in payload['parts']:
-                if part['mimeType'] == 'text/plain':
-                    data = part['body'].get('data')
-                    if data:
-                        return base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore')
-                elif part['mimeType'].startswith('multipart/'):
-                    return self._get_email_body(part)
+    def _fetch_messages(self, message_ids: List[str], batch_size: int, workers: int,
+                        format: str = 'full', service=None) -> List[Dict[str, Any]]:
+        """
+        Busca as mensagens na API, em lotes e/ou em paralelo, preservando a ordem de entrada.
+        
+        As mensagens são divididas em blocos (um lote do Gmail por bloco, ou uma
+        mensagem por bloco sem lote). Com workers > 1 cada bloco é processado por
+        uma thread do pool, usando o serviço próprio daquela thread; sem workers,
+        os blocos usam o serviço informado (por padrão, o da ferramenta).
+        """
+        if batch_size > 1:
+            size = min(batch_size, GMAIL_BATCH_LIMIT)
         else:
-            data = payload['body'].get('data')
-            if data:
-                return base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore')
-        return '(Sem corpo de texto)'
+            size = 1
+        chunks = [message_ids[i:i + size] for i in range(0, len(message_ids), size)]
+        
+        # Sem service_factory não há como dar um transporte próprio a cada thread
+        if workers > 1 and self.service_factory is not None and len(chunks) > 1:
+            executor = self._get_executor(workers)
+            parts = executor.map(lambda chunk: self._fetch_chunk(chunk, None, format), chunks)
+        else:
+            service = service or self.gmail_service
+            parts = (self._fetch_chunk(chunk, service, format) for chunk in chunks)
+        
+        return [msg for part in parts for msg in part]
+    
+    def _fetch_chunk(self, message_ids: List[str], service, format: str) -> List[Dict[str, Any]]:
+        """Busca um bloco de mensagens, convertendo falhas em erros por mensagem."""
+        try:
+            if service is None:
+                service = self._worker_service()
+            if len(message_ids) == 1:
+                return [self._call(self._get_request(service, message_ids[0], format), _get_method(format))]
+            return self._fetch_batch(message_ids, service, format)
+        except Exception as e:
+            return [{'id': msg_id, 'error': f'Erro ao ler e-mail: {str(e)}'} for msg_id in message_ids]
+    
+    def _fetch_batch(self, message_ids: List[str], service, format: str) -> List[Dict[str, Any]]:
+        """
+        Busca as mensagens em uma única requisição em lote do Gmail.
+        
+        Cada lote custa uma única ida e volta HTTP. Erros são tratados por item,
+        então uma mensagem com falha não descarta as demais; só os itens com erro
+        temporário (429, limite de taxa, 5xx) são pedidos de novo.
+        """
+        requests = {msg_id: (lambda msg_id=msg_id: self._get_request(service, msg_id, format))
+                    for msg_id in message_ids}
+        fetched = execute_batch(service, requests, self.limiter.cost(_get_method(format)), self.limiter, self.retry)
+        
+        # Mantém a ordem da caixa de entrada, independente da ordem das respostas
+        return [
+            {'id': msg_id, 'error': f'Erro ao ler e-mail: {str(fetched[msg_id])}'}
+            if isinstance(fetched[msg_id], Exception) else fetched[msg_id]
+            for msg_id in message_ids
+        ]
+    
+    def _fetch_attachments(self, attachments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Busca o conteúdo de anexos em lotes do Gmail, preservando a ordem; falhas viram {'error'}."""
+        size = min(self.batch_size, GMAIL_BATCH_LIMIT) if self.batch_size > 1 else 1
+        service = self.gmail_service
+        method = 'messages.attachments.get'
+        fetched: Dict[str, Any] = {}
+        
+        def request(attachment):
+            return service.users().messages().attachments().get(
+                userId='me', messageId=attachment['message_id'], id=attachment['attachment_id']
+            )
+        
+        for start in range(0, len(attachments), size):
+            chunk = attachments[start:start + size]
+            try:
+                if len(chunk) == 1:
+                    fetched[str(start)] = self._call(request(chunk[0]), method)
+                    continue
+                requests = {str(index): (lambda attachment=attachment: request(attachment))
+                            for index, attachment in enumerate(chunk, start)}
+                fetched.update(execute_batch(service, requests, self.limiter.cost(method), self.limiter, self.retry))
+            except Exception as e:
+                for index in range(start, start + len(chunk)):
+                    fetched[str(index)] = e
+        return [
+            {'error': f'Erro ao ler anexo: {str(fetched[str(index)])}'}
+            if isinstance(fetched[str(index)], Exception) else fetched[str(index)]
+            for index in range(len(attachments))
+        ]
+    
+    def _get_request(self, service, message_id: str, format: str):
+        """Monta o users().messages().get para o formato pedido ('thread' busca a conversa inteira)."""
+        if format == 'thread':
+            return service.users().threads().get(userId='me', id=message_id, format='full')
+        if format == 'metadata':
+            return service.users().messages().get(
+                userId='me',
+                id=message_id,
+                format='metadata',
+                metadataHeaders=METADATA_HEADERS,
+                fields=METADATA_FIELDS
+            )
+        return service.users().messages().get(userId='me', id=message_id, format=format)
+    
+    def _get_executor(self, workers: int) -> ThreadPoolExecutor:
+        """
+        Retorna o pool de threads, recriando-o se o número de workers mudar.
+        
+        Pode ser chamado da thread de busca antecipada de iter_messages: por isso
+        a troca é feita sob lock e só encerra o pool antigo, nunca essa thread.
+        """
+        with self._executor_lock:
+            if self._executor is None or self._executor_workers != workers:
+                if self._executor is not None:
+                    self._executor.shutdown(wait=True)
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='gmail-fetch')
+                self._executor_workers = workers
+            return self._executor
+    
+    def _get_prefetcher(self) -> ThreadPoolExecutor:
+        """Retorna a thread usada para buscar a próxima página em iter_messages."""
+        if self._prefetcher is None:
+            self._prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix='gmail-prefetch')
+        return self._prefetcher
+    
+    def _parse_message(self, msg_data: Dict[str, Any]) -> EmailRecord:
+        """
+        Converte a resposta da API no formato de e-mail retornado pela ferramenta.
+        
+        Respostas no formato 'metadata' não têm corpo, então 'body' e 'attachments'
+        ficam de fora. Respostas no formato 'raw' são interpretadas como RFC 822.
+        O corpo só é decodificado quando lido (ver EmailRecord).
+        """
+        message_id = msg_data.get('id')
+        source = None
+        attachments = MISSING
+        if 'raw' in msg_data:
+            source = parse_raw(msg_data['raw'])
+            headers = [{'name': name, 'value': raw_header(source, name)}
+                       for name in METADATA_HEADERS if name in source]
+            attachments = find_raw_attachments(source, self.attachment_text_bytes)
+        else:
+            payload = msg_data['payload']
+            headers = payload.get('headers', [])
+            if 'body' in payload or 'parts' in payload:
+                source = payload
+                attachments = find_attachments(payload, self.attachment_text_bytes)
+        if source is not None:
+            for attachment in attachments:
+                attachment['message_id'] = message_id
+        
+        subject = next((h['value'] for h in headers if h['name'] == 'Subject'), '(Sem Assunto)')
+        from_ = next((h['value'] for h in headers if h['name'] == 'From'), '(Remetente desconhecido)')
+        date = next((h['value'] for h in headers if h['name'] == 'Date'), '')
+        
+        return EmailRecord(
+            id=message_id,
+            subject=subject,
+            sender=from_,
+            date=date,
+            snippet=html.unescape(msg_data.get('snippet', '')),
+            attachments=attachments,
+            source=source,
+            decoder=self._body_decoder() if source is not None else None
+        )
+    
+    def _parse_thread(self, thread_data: Dict[str, Any]) -> Union[ThreadRecord, Dict[str, Any]]:
+        """
+        Converte uma conversa em um único registro compacto.
+        
+        As mensagens vêm em ordem cronológica. Cada linha do corpo é normalizada
+        (sem marcadores '>' nem espaços) e descartada se já apareceu antes na
+        conversa, o que remove o histórico citado pelas respostas.
+        """
+        messages = [self._parse_message(msg) for msg in thread_data.get('messages', [])]
+        if not messages:
+            return {'id': thread_data.get('id'), 'error': 'Conversa sem mensagens'}
+        
+        seen = set()
+        participants = []
+        sections = []
+        for msg in messages:
+            if msg.sender not in participants:
+                participants.append(msg.sender)
+            
+            lines = []
+            for line in msg.body.splitlines():
+                key = ' '.join(line.lstrip(' >').split())
+                if not key or key in seen:
+                    continue
+                seen.add(key)
+                lines.append(line.rstrip())
+            if lines:
+                sections.append(f"[{msg.sender} - {msg.date}]\n" + '\n'.join(lines))
+        
+        return ThreadRecord(
+            id=thread_data.get('id'),
+            subject=messages[0].subject,
+            sender=', '.join(participants),
+            date=messages[-1].date,
+            snippet=messages[-1].snippet,
+            participants=participants,
+            message_count=len(messages),
+            body='\n\n'.join(sections),
+            attachments=[attachment for msg in messages for attachment in msg.get('attachments', ())],
+            tokens_saved=sum(msg.get('tokens_saved', 0) for msg in messages)
+        )
+    
+    def _body_decoder(self) -> BodyDecoder:
+        """Decodificador de corpos compartilhado, refeito se body_bytes ou reduce_bodies mudarem."""
+        decoder = self._decoder
+        if decoder is None or (decoder.body_bytes, decoder.reduce) != (self.body_bytes, self.reduce_bodies):
+            decoder = self._decoder = BodyDecoder(self.body_bytes, self.reduce_bodies)
+        return decoder
 
 
-class CalendarTool(Tool):
+class CalendarTool(QuotaClient, Tool):
     """Ferramenta para acessar o Google Calendar."""
     
-    def __init__(self, calendar_service):
+    def __init__(self, calendar_service, limiter: Optional[QuotaLimiter] = None,
+                 retry: Optional[RetryPolicy] = None, cache: Optional[EventCache] = None,
+                 calendars: Union[str, Sequence[str]] = 'primary', workers: int = 1,
+                 service_factory: Optional[Callable[[], Any]] = None, tz: Optional[str] = None):
+        """
+        Args:
+            calendar_service: Serviço construído com build('calendar', 'v3', ...)
+            limiter: Cota de consultas (padrão: shared_limiter('calendar'))
+            retry: Novas tentativas com recuo nos erros 429/403/5xx (padrão: RetryPolicy())
+            cache: Cache local dos eventos, sincronizado com syncToken a cada leitura
+            calendars: Agendas lidas: 'primary', 'selected' (as marcadas na lista de
+                agendas do usuário, via calendarList), 'all' ou uma lista de IDs
+            workers: Agendas lidas em paralelo
+            service_factory: Cria um novo serviço do Calendar para cada thread
+                (obrigatório se workers > 1, como no GmailTool)
+            tz: Fuso do usuário, nome IANA como 'America/Sao_Paulo' (None = o fuso
+                local): os horários são exibidos nele e os eventos de dia inteiro
+                começam à meia-noite dele
+        """
         super().__init__(
             name="read_calendar",
             description="Lê os próximos eventos do Google Calendar"
         )
+        if workers > 1 and service_factory is None:
+            raise ValueError("service_factory é obrigatório quando workers > 1")
+        
         self.calendar_service = calendar_service
+        self.limiter = limiter or shared_limiter('calendar')
+        self.retry = retry or RetryPolicy()
+        self.cache = cache
+        self.calendars = calendars
+        self.workers = workers
+        self.service_factory = service_factory
+        self.tz = check_zone(tz)
+        self._local = threading.local()
+        self._executor = None
     
-    def execute(self, max_results: int = 5) -> List[Dict[str, Any]]:
-        """Executa a leitura dos eventos."""
+    def execute(self, max_results: int = 5) -> List[EventRecord]:
+        """
+        Executa a leitura dos próximos eventos de todas as agendas, por ordem de início.
+        
+        Falhas vêm como {'error'}: a de uma agenda no fim da lista, sem descartar
+        as demais; a da leitura inteira como [{'error'}].
+        """
         try:
-            now = datetime.utcnow().isoformat() + 'Z'
-            events_result = self.calendar_service.events().list(
-                calendarId='primary',
-                timeMin=now,
-                maxResults=max_results,
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
-            
-            events = events_result.get('items', [])
-            formatted_events = []
-            
-            for event in events:
-                start = event['start'].get('dateTime', event['start'].get('date'))
-                if 'T' in start:
-                    dt = datetime.fromisoformat(start.replace('Z', '+00:00'))
-                    formatted_time = dt.strftime('%d/%m/%Y às %H:%M')
-                else:
-                    dt = datetime.fromisoformat(start)
-                    formatted_time = dt.strftime('%d/%m/%Y (dia inteiro)')
-                
-                formatted_events.append({
-                    'summary': event['summary'],
-                    'time': formatted_time,
-                    'description': event.get('description', '')
-                })
-            
-            return formatted_events
+            now = datetime.now(timezone.utc)
+            return self._read(lambda calendar_id, service: self._upcoming(calendar_id, service, now, max_results),
+                              max_results)
         except Exception as e:
-            return [{'error': f'Erro ao ler eventos: {str(e)}'}] 
\ No newline at end of file
+            return [{'error': f'Erro ao ler eventos: {str(e)}'}]
+    
+    def events_between(self, start: datetime, end: datetime, sync: bool = True) -> List[EventRecord]:
+        """
+        Eventos que se sobrepõem à janela [start, end), por ordem de início.
+        
+        Com cache, a janela é lida do SQLite (depois de uma sincronização
+        incremental, se sync=True); sem cache, vai à API com timeMin/timeMax.
+        Datas sem fuso são tratadas como UTC.
+        """
+        start, end = _aware(start), _aware(end)
+        return self._read(lambda calendar_id, service: self._window(calendar_id, service, start, end, sync))
+    
+    def events_by_calendar(self, start: datetime, end: datetime, sync: bool = True) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Eventos da janela [start, end) no formato da API, agrupados por agenda.
+        
+        Para análises sobre todos os campos (organizador, participantes...): nada
+        é convertido em EventRecord. Uma agenda que falhar levanta ValueError,
+        em vez de entrar vazia nos totais.
+        """
+        start, end = _aware(start), _aware(end)
+        calendar_ids, results = self._fetch_all(
+            lambda calendar_id, service: self._window(calendar_id, service, start, end, sync)
+        )
+        errors = [error for _, error in results if error]
+        if errors:
+            raise ValueError('; '.join(errors))
+        return {calendar_id: events for calendar_id, (events, _) in zip(calendar_ids, results)}
+    
+    def list_calendars(self) -> List[Dict[str, Any]]:
+        """Agendas da lista do usuário (calendarList), com id, summary, selected, primary..."""
+        calendars, page_token = [], None
+        while True:
+            response = self._call(self.calendar_service.calendarList().list(pageToken=page_token),
+                                  'calendarList.list')
+            calendars.extend(response.get('items', []))
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return calendars
+    
+    def freebusy(self, calendar_ids: Sequence[str], start: datetime, end: datetime) -> Dict[str, Dict[str, Any]]:
+        """
+        Horários ocupados de cada agenda (ou e-mail de outra pessoa) em [start, end).
+        
+        Só os intervalos ocupados trafegam, sem títulos nem detalhes, em consultas
+        de até 50 agendas. Retorna {id: {'busy': [{'start', 'end'}], 'errors'?}},
+        como a resposta de freebusy().query.
+        """
+        start, end = _aware(start), _aware(end)
+        calendar_ids = list(calendar_ids)
+        calendars: Dict[str, Dict[str, Any]] = {}
+        for offset in range(0, len(calendar_ids), FREEBUSY_CALENDAR_LIMIT):
+            chunk = calendar_ids[offset:offset + FREEBUSY_CALENDAR_LIMIT]
+            response = self._call(self.calendar_service.freebusy().query(body={
+                'timeMin': start.isoformat(),
+                'timeMax': end.isoformat(),
+                'items': [{'id': calendar_id} for calendar_id in chunk],
+            }), 'freebusy.query')
+            for calendar_id in chunk:
+                calendars[calendar_id] = response.get('calendars', {}).get(
+                    calendar_id, {'errors': [{'reason': 'notFound'}]}
+                )
+        return calendars
+    
+    def calendar_ids(self) -> List[str]:
+        """Resolve a opção calendars nos IDs das agendas lidas."""
+        if isinstance(self.calendars, str):
+            if self.calendars == 'primary':
+                return ['primary']
+            if self.calendars not in ('selected', 'all'):
+                raise ValueError(f"Opção de agendas inválida: {self.calendars}")
+            return [calendar['id'] for calendar in self.list_calendars()
+                    if self.calendars == 'all' or calendar.get('selected') or calendar.get('primary')]
+        return list(self.calendars)
+    
+    def sync_cache(self, calendar_id: str = 'primary', service=None) -> int:
+        """
+        Aplica ao cache os eventos criados, alterados ou cancelados desde o último nextSyncToken.
+        
+        Na primeira vez lista a agenda inteira. Se o syncToken expirou (HTTP 410),
+        o cache da agenda é descartado e a sincronização completa é refeita.
+        
+        Returns:
+            Número de eventos aplicados
+        """
+        if self.cache is None:
+            return 0
+        service = service or self.calendar_service
+        token = self.cache.sync_token(calendar_id)
+        if token is not None:
+            try:
+                return self._sync_pages(calendar_id, service, token)
+            except Exception as e:
+                if http_status(e) != 410:
+                    raise
+        self.cache.clear(calendar_id)
+        return self._sync_pages(calendar_id, service, None)
+    
+    def close(self):
+        """Encerra o pool de threads, se houver."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+    
+    def _read(self, fetch: Callable[[str, Any], List[Dict[str, Any]]],
+              limit: Optional[int] = None) -> List[EventRecord]:
+        """
+        Busca cada agenda com fetch(calendar_id, serviço) e intercala os resultados.
+        
+        Cada agenda já vem ordenada por início, então heapq.merge junta as listas
+        sem reordenar tudo e para assim que limit eventos foram produzidos.
+        """
+        calendar_ids, results = self._fetch_all(fetch)
+        
+        # Cada evento é interpretado uma vez: o início serve de chave da intercalação
+        # e vai para o registro. Com várias agendas, cada evento diz de qual veio
+        labeled = len(calendar_ids) > 1
+        streams = [[(times, event, calendar_id if labeled else MISSING)
+                    for times, event in zip(normalize_events(events, self.tz), events)]
+                   for calendar_id, (events, _) in zip(calendar_ids, results)]
+        merged = heapq.merge(*streams, key=_start_key)
+        records = [self._event_record(event, times, calendar) for times, event, calendar in islice(merged, limit)]
+        records.extend({'error': error} for _, error in results if error)
+        return records
+    
+    def _fetch_all(self, fetch: Callable[[str, Any], List[Dict[str, Any]]]
+                   ) -> Tuple[List[str], List[Tuple[List[Dict[str, Any]], Optional[str]]]]:
+        """IDs das agendas e, para cada uma, (eventos, erro); em paralelo se workers > 1."""
+        calendar_ids = self.calendar_ids()
+        
+        def fetch_one(calendar_id: str, service) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+            try:
+                return fetch(calendar_id, service or self._worker_service()), None
+            except Exception as e:
+                return [], f'Erro ao ler a agenda {calendar_id}: {str(e)}'
+        
+        if self.workers > 1 and len(calendar_ids) > 1:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='calendar-fetch')
+            results = list(self._executor.map(lambda calendar_id: fetch_one(calendar_id, None), calendar_ids))
+        else:
+            results = [fetch_one(calendar_id, self.calendar_service) for calendar_id in calendar_ids]
+        return calendar_ids, results
+    
+    def _upcoming(self, calendar_id: str, service, now: datetime, max_results: int) -> List[Dict[str, Any]]:
+        """Os próximos max_results eventos de uma agenda, por ordem de início."""
+        if self.cache is not None:
+            self.sync_cache(calendar_id, service)
+            return self.cache.window(now.timestamp(), limit=max_results, calendar_id=calendar_id)
+        return self._call(service.events().list(
+            calendarId=calendar_id,
+            timeMin=now.isoformat(),
+            maxResults=max_results,
+            singleEvents=True,
+            orderBy='startTime'
+        ), 'events.list').get('items', [])
+    
+    def _window(self, calendar_id: str, service, start: datetime, end: datetime,
+                sync: bool) -> List[Dict[str, Any]]:
+        """Eventos de uma agenda na janela [start, end), por ordem de início."""
+        if self.cache is not None:
+            if sync:
+                self.sync_cache(calendar_id, service)
+            return self.cache.window(start.timestamp(), end.timestamp(), calendar_id=calendar_id)
+        events, page_token = [], None
+        while True:
+            response = self._call(service.events().list(
+                calendarId=calendar_id,
+                timeMin=start.isoformat(),
+                timeMax=end.isoformat(),
+                singleEvents=True,
+                orderBy='startTime',
+                maxResults=CALENDAR_PAGE_LIMIT,
+                pageToken=page_token
+            ), 'events.list')
+            events.extend(response.get('items', []))
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return events
+    
+    def _sync_pages(self, calendar_id: str, service, sync_token: Optional[str]) -> int:
+        """Percorre as páginas de uma sincronização (completa se sync_token for None)."""
+        applied = 0
+        page_token = None
+        while True:
+            # syncToken não aceita timeMin/orderBy: os mesmos parâmetros nas duas formas
+            response = self._call(service.events().list(
+                calendarId=calendar_id,
+                singleEvents=True,
+                maxResults=CALENDAR_PAGE_LIMIT,
+                syncToken=sync_token,
+                pageToken=page_token
+            ), 'events.list')
+            applied += self.cache.apply(response.get('items', []), calendar_id, self.tz)
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
+        self.cache.set_sync_token(response['nextSyncToken'], calendar_id)
+        return applied
+    
+    def _event_record(self, event: Dict[str, Any], times: EventTimes, calendar: Any = MISSING) -> EventRecord:
+        """Registro do evento; o texto de 'time' só é formatado quando lido."""
+        start, end, all_day = times
+        return EventRecord(
+            # Em agendas compartilhadas só com disponibilidade, o evento vem sem título
+            summary=event.get('summary', '(sem título)'),
+            description=event.get('description', ''),
+            calendar=calendar,
+            start=start,
+            end=end,
+            all_day=all_day,
+            zone=self.tz
+        )
+
+
+def _start_key(item) -> float:
+    """Início de (horários, evento, agenda): as agendas vêm ordenadas só por ele."""
+    return item[0][0]
+
+
+def _aware(value: datetime) -> datetime:
+    """Datas sem fuso são tratadas como UTC."""
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
@@ -1,13 +1,14 @@
 # main.py
 # Agente de IA para Gmail e Google Calendar usando Gemini
 
-import os
-import pickle
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
 import google.generativeai as genai
 
+from gmail_ai_assistant.auth import default_store
+from gmail_ai_assistant.discovery import build_service
+from gmail_ai_assistant.mime import extract_body
+
 # Escopos necessários para Gmail e Calendar
 SCOPES = [
     'https://www.googleapis.com/auth/gmail.readonly',
@@ -23,31 +24,28 @@ genai.configure(api_key=GEMINI_API_KEY)
 
 def authenticate_google():
     """Autentica com o Google e retorna as credenciais."""
-    creds = None
-    if os.path.exists(TOKEN_FILE):
-        with open(TOKEN_FILE, 'rb') as token:
-            creds = pickle.load(token)
-    # Se não houver credenciais válidas, faz login
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_FILE, SCOPES)
-            creds = flow.run_local_server(port=0)
-        # Salva as credenciais para as próximas execuções
-        with open(TOKEN_FILE, 'wb') as token:
-            pickle.dump(creds, token)
+    with default_store.lock(TOKEN_FILE):
+        creds = default_store.load(TOKEN_FILE)
+        # Se não houver credenciais válidas, faz login
+        if not creds or not creds.valid:
+            if creds and creds.expired and creds.refresh_token:
+                creds.refresh(Request())
+            else:
+                flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_FILE, SCOPES)
+                creds = flow.run_local_server(port=0)
+            # Salva as credenciais (JSON) para as próximas execuções
+            default_store.save(TOKEN_FILE, creds)
     return creds
 
 
 def get_gmail_service(creds):
     """Retorna o serviço do Gmail autenticado."""
-    return build('gmail', 'v1', credentials=creds)
+    return build_service('gmail', 'v1', credentials=creds)
 
 
 def get_calendar_service(creds):
     """Retorna o serviço do Google Calendar autenticado."""
-    return build('calendar', 'v3', credentials=creds)
+    return build_service('calendar', 'v3', credentials=creds)
 
 
 def get_recent_emails(gmail_service, max_results=5):
@@ -67,21 +65,7 @@ def get_recent_emails(gmail_service, max_results=5):
 
 def get_email_body(payload):
     """Extrai o corpo do e-mail, mesmo se multipart."""
-    import base64
-    import quopri
-    if 'parts' in payload:
-        for part in payload['parts']:
-            if part['mimeType'] == 'text/plain':
-                data = part['body'].get('data')
-                if data:
-                    return base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore')
-            elif part['mimeType'].startswith('multipart/'):
-                return get_email_body(part)
-    else:
-        data = payload['body'].get('data')
-        if data:
-            return base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore')
-    return '(Sem corpo de texto)'
+    return extract_body(payload)
 
 
 def summarize_email_with_gemini(email_body, subject):
@@ -119,15 +103,10 @@ def get_upcoming_events(calendar_service, max_results=5):
 
 def format_event_time(event):
     """Formata a data e hora do evento."""
-    start = event['start'].get('dateTime', event['start'].get('date'))
-    if 'T' in start:  # Evento com hora
-        from datetime import datetime
-        dt = datetime.fromisoformat(start.replace('Z', '+00:00'))
-        return dt.strftime('%d/%m/%Y às %H:%M')
-    else:  # Evento sem hora (dia inteiro)
-        from datetime import datetime
-        dt = datetime.fromisoformat(start)
-        return dt.strftime('%d/%m/%Y (dia inteiro)')
+    from gmail_ai_assistant.event_time import display_time, event_times
+    
+    start, _, all_day = event_times(event)
+    return display_time(start, all_day)
 
 
 if __name__ == "__main__":
@@ -136,7 +115,7 @@ if __name__ == "__main__":
     gmail_service = get_gmail_service(creds)
     calendar_service = get_calendar_service(creds)
     print("Autenticação realizada com sucesso!")
-
+    
     print("\nLendo os 5 e-mails mais recentes da caixa de entrada...")
     emails = get_recent_emails(gmail_service, max_results=5)
     for i, email in enumerate(emails, 1):
@@ -150,7 +129,7 @@ if __name__ == "__main__":
         summary = summarize_email_with_gemini(email['body'], email['subject'])
         print(summary)
         print("-" * 50)
-
+    
     print("\n📅 Próximos eventos do Google Calendar:")
     events = get_upcoming_events(calendar_service, max_results=5)
     if not events:
@@ -12,7 +12,7 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/seu-usuario/gmail-ai-assistant",
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "benchmarks.*"]),
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: End Users/Desktop",
@@ -34,7 +34,11 @@ setup(
         "rich",
         "click",
         "python-dotenv",
+        "backports.zoneinfo; python_version < '3.9'",
     ],
+    extras_require={
+        "analytics": ["numpy"],
+    },
     entry_points={
         "console_scripts": [
             "gmail-assistant=gmail_ai_assistant.cli:main",